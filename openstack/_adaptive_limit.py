@@ -0,0 +1,210 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Client-side limits adapting to the capacity of a service.
+
+The ``rate_limit`` and ``concurrency`` options impose fixed limits, which are
+either too high, resulting in the API rate limiters of the cloud answering
+with 429 or 503, or too low, leaving capacity unused. The
+:class:`AdaptiveLimiter` looks for the limits at which the service keeps up
+with the requests by additive increase and multiplicative decrease (AIMD) of
+the allowed concurrency and rate.
+"""
+
+import collections
+import email.utils
+import threading
+import time
+
+THROTTLE_STATUS_CODES = (429, 503)
+# Seconds of request starts kept to estimate the current rate
+_RATE_WINDOW = 1.0
+
+
+def parse_retry_after(value):
+    """Get the seconds to wait from a ``Retry-After`` header.
+
+    :param str value: Either seconds or an HTTP date.
+    :returns: The seconds, None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+def add_response_hook(hooks, hook):
+    """Add a response hook to the requests hooks of a request.
+
+    :param dict hooks: The ``hooks`` argument of the request, if any.
+    :returns: A new dict of hooks.
+    """
+    hooks = dict(hooks or {})
+    response_hooks = hooks.get('response', [])
+    if callable(response_hooks):
+        response_hooks = [response_hooks]
+    hooks['response'] = list(response_hooks) + [hook]
+    return hooks
+
+
+class AdaptiveLimiter:
+    """Concurrency and rate limit adapting to the responses of a service.
+
+    Every successful response raises the limits a bit: the concurrency by
+    one per ``concurrency`` responses and the rate by ``increase`` requests
+    per second every second. A throttled response (429 or 503) or a response
+    slower than ``latency_target`` multiplies both by ``decrease``. The
+    responses of requests started before a decrease do not decrease the
+    limits again. The ``Retry-After`` of a throttled response holds back all
+    requests until then.
+
+    The limiter is used as the ``rate_semaphore`` of keystoneauth around
+    every attempt of a request, with :meth:`record` as response hook. It is
+    thread-safe and shared by the threads using the same proxy.
+
+    :param int max_concurrency: Upper bound of the concurrency. The
+        concurrency is not limited until the service is overloaded if None.
+    :param float max_rate: Upper bound of the requests per second. The rate
+        is not limited until the service is overloaded if None.
+    :param float latency_target: Seconds after which a response counts as
+        overload. Latency is ignored if None.
+    :param float increase: Additive increase of the limits.
+    :param float decrease: Factor the limits are multiplied with on overload.
+    :param float min_rate: Lower bound of the requests per second.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=None,
+        max_rate=None,
+        latency_target=None,
+        increase=1.0,
+        decrease=0.5,
+        min_rate=0.1,
+    ):
+        # NOTE: Values from clouds.yaml may be strings
+        self.max_concurrency = (
+            int(max_concurrency) if max_concurrency else None)
+        self.max_rate = float(max_rate) if max_rate else None
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.min_rate = min_rate
+        self.concurrency = (
+            float(self.max_concurrency) if self.max_concurrency else None)
+        self.rate = self.max_rate
+        self.in_flight = 0
+        self.throttled = 0
+        self._cond = threading.Condition()
+        self._next_start = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._starts = collections.deque()
+
+    def _has_slot(self):
+        return (
+            self.concurrency is None
+            or self.in_flight < max(int(self.concurrency), 1))
+
+    def __enter__(self):
+        with self._cond:
+            self._cond.wait_for(self._has_slot)
+            self.in_flight += 1
+            now = time.monotonic()
+            start = max(now, self._blocked_until, self._next_start)
+            if self.rate:
+                self._next_start = start + 1.0 / self.rate
+            self._starts.append(start)
+            while self._starts and self._starts[0] < now - _RATE_WINDOW:
+                self._starts.popleft()
+        if start > now:
+            time.sleep(start - now)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def _current_rate(self):
+        return max(len(self._starts) / _RATE_WINDOW, self.min_rate)
+
+    def _decrease(self, started):
+        if started < self._last_decrease:
+            # Sent before the limits were decreased, the overload is
+            # already accounted for.
+            return
+        self._last_decrease = time.monotonic()
+        self.concurrency = max(
+            (self.concurrency or self.in_flight) * self.decrease, 1.0)
+        self.rate = max(
+            (self.rate or self._current_rate()) * self.decrease,
+            self.min_rate)
+
+    def _increase(self):
+        if self.concurrency is not None:
+            self.concurrency += self.increase / self.concurrency
+            if self.max_concurrency:
+                self.concurrency = min(
+                    self.concurrency, self.max_concurrency)
+            self._cond.notify()
+        if self.rate is not None:
+            self.rate += self.increase / self.rate
+            if self.max_rate:
+                self.rate = min(self.rate, self.max_rate)
+
+    def record(self, response, *args, **kwargs):
+        """Adapt the limits to a response.
+
+        Has the signature of a requests response hook.
+        """
+        elapsed = response.elapsed.total_seconds()
+        started = time.monotonic() - elapsed
+        with self._cond:
+            if response.status_code in THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                retry_after = parse_retry_after(
+                    response.headers.get('Retry-After'))
+                if retry_after:
+                    self._blocked_until = max(
+                        self._blocked_until, time.monotonic() + retry_after)
+                self._decrease(started)
+            elif (self.latency_target is not None
+                    and elapsed > self.latency_target):
+                self._decrease(started)
+            elif response.status_code < 500:
+                self._increase()
+
+    def get_stats(self):
+        """Get the current limits.
+
+        :returns: A dict of the ``concurrency`` and ``rate`` limits (None
+            when not limited), the requests ``in_flight``, the amount of
+            ``throttled`` responses and the seconds requests are held back
+            for (``blocked``).
+        """
+        with self._cond:
+            return {
+                'concurrency': (
+                    int(self.concurrency)
+                    if self.concurrency is not None else None),
+                'rate': self.rate,
+                'in_flight': self.in_flight,
+                'throttled': self.throttled,
+                'blocked': max(self._blocked_until - time.monotonic(), 0.0),
+            }
@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Running calls on many resources and waiting for their status.
+
+The calls run in the executor of the connection. The resources whose call
+finished and which wait for a status are polled together on an interval.
+"""
+
+import abc
+import concurrent.futures
+import time
+
+
+class BatchRunner(metaclass=abc.ABCMeta):
+    """Base class of the batches of calls.
+
+    Subclasses start the calls in :meth:`_submit` with :meth:`_start`, get
+    the outcome of every call in :meth:`_call_done` or :meth:`_call_failed`
+    and check the resources waiting for a status in :meth:`_poll`.
+
+    :param proxy: The :class:`~openstack.proxy.Proxy` of the service.
+    """
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        # Item of the running calls by future
+        self._futures = {}
+
+    def _start(self, item, call, *args, **kwargs):
+        """Run a call for an item in the executor of the connection."""
+        executor = self.proxy._connection._pool_executor
+        self._futures[executor.submit(call, *args, **kwargs)] = item
+
+    @abc.abstractmethod
+    def _submit(self):
+        """Start the calls that can run, within the concurrency."""
+
+    @abc.abstractmethod
+    def _call_done(self, item):
+        """Process the item whose call succeeded."""
+
+    @abc.abstractmethod
+    def _call_failed(self, item, error):
+        """Process the item whose call raised an error."""
+
+    @abc.abstractmethod
+    def _poll(self):
+        """Check the status of all items waiting for one."""
+
+    @abc.abstractmethod
+    def _is_waiting(self):
+        """Whether any item waits for a status."""
+
+    @abc.abstractmethod
+    def _is_finished(self):
+        """Whether all items succeeded or failed."""
+
+    @abc.abstractmethod
+    def _time_out(self):
+        """Fail all items which did not finish in time."""
+
+    def _collect(self, timeout):
+        """Process the calls finishing within the timeout."""
+        if not self._futures:
+            return
+        done, _ = concurrent.futures.wait(
+            self._futures, timeout=timeout,
+            return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            item = self._futures.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                self._call_failed(item, e)
+            else:
+                self._call_done(item)
+
+    def run(self, interval=2, timeout=None):
+        """Run the calls of all items and wait for their status.
+
+        Items not finished after ``timeout`` seconds are failed by
+        :meth:`_time_out`, the calls already running are finished first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        next_poll = time.monotonic() + interval
+        while True:
+            self._submit()
+            if self._is_finished():
+                return
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            waiting = self._is_waiting()
+            if waiting and now >= next_poll:
+                self._poll()
+                next_poll = now + interval
+                continue
+
+            wait = next_poll - now if waiting else None
+            if deadline is not None:
+                wait = deadline - now if wait is None else min(
+                    wait, deadline - now)
+            if self._futures:
+                self._collect(wait)
+            else:
+                time.sleep(wait or 0)
+
+        while self._futures:
+            self._collect(None)
+        self._time_out()
@@ -0,0 +1,132 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Fast failure of requests to endpoints which stopped responding.
+
+When a service hangs, every request to it waits for the timeout and the
+retries, and threads pile up behind it. A :class:`CircuitBreaker` opens
+after a number of consecutive failures and rejects the requests to the
+endpoint right away while open. After a while it lets a single probe request
+through (half-open), which closes it again on success.
+"""
+
+import threading
+import time
+
+from keystoneauth1 import exceptions as ks_exc
+
+from openstack import exceptions
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+#: Exceptions counting as failures of the endpoint
+FAILURE_EXCEPTIONS = (ks_exc.ConnectTimeout, ks_exc.ConnectFailure)
+
+
+class CircuitBreaker:
+    """Circuit breaker of an endpoint.
+
+    :param str endpoint: The endpoint, used in messages.
+    :param int threshold: Amount of consecutive timeouts, connection
+        failures or 5xx responses after which the circuit opens.
+    :param float reset_timeout: Seconds the circuit stays open before a
+        probe request is let through.
+    :param on_transition: Callable called with the endpoint, the old and the
+        new state on every change of state.
+    """
+
+    def __init__(self, endpoint, threshold, reset_timeout=30.0,
+                 on_transition=None):
+        self.endpoint = endpoint
+        self.threshold = int(threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.on_transition = on_transition
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        old, self.state = self.state, state
+        return (old, state) if old != state else None
+
+    def _notify(self, transition):
+        if transition and self.on_transition is not None:
+            self.on_transition(self.endpoint, *transition)
+
+    def before_request(self):
+        """Check whether a request may be sent.
+
+        :raises: :class:`~openstack.exceptions.CircuitOpenException` if the
+            circuit is open or a probe request is in progress.
+        """
+        transition = None
+        with self._lock:
+            if self.state == OPEN:
+                remaining = (
+                    self._opened_at + self.reset_timeout - time.monotonic())
+                if remaining > 0:
+                    raise exceptions.CircuitOpenException(
+                        'Endpoint {0} failed {1} times in a row, not sending '
+                        'requests for {2:.1f} seconds'.format(
+                            self.endpoint, self.failures, remaining),
+                        endpoint=self.endpoint, retry_after=remaining)
+                transition = self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    raise exceptions.CircuitOpenException(
+                        'Endpoint {0} is being probed after failures'.format(
+                            self.endpoint),
+                        endpoint=self.endpoint)
+                self._probing = True
+        self._notify(transition)
+
+    def record_success(self):
+        """Record a request which succeeded."""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            transition = self._set_state(CLOSED)
+        self._notify(transition)
+
+    def record_failure(self):
+        """Record a request which timed out or failed on the server side."""
+        transition = None
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+                transition = self._set_state(OPEN)
+        self._notify(transition)
+
+    def record(self, response=None, exc=None):
+        """Record the outcome of a request.
+
+        :param response: The response, if any.
+        :param exc: The exception raised by the request, if any. Exceptions
+            other than timeouts and connection failures do not count.
+        """
+        if response is not None:
+            if response.status_code >= 500:
+                self.record_failure()
+            else:
+                self.record_success()
+        elif isinstance(exc, FAILURE_EXCEPTIONS):
+            self.record_failure()
+        else:
+            with self._lock:
+                # The probe did not tell anything, allow another one
+                self._probing = False
@@ -0,0 +1,363 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Resource level engine for the project cleanup.
+
+During the identification phase of
+:meth:`~openstack.connection.Connection.project_cleanup` services register
+every resource they want to delete in a :class:`ResourceCleanupGraph`
+together with the IDs of the resources that must be gone first. The graph is
+then executed: independent resources are deleted concurrently (with a
+per-service concurrency limit), deletions which need to be awaited are
+polled in batches with a single list call per resource type and the
+progress is reported to the status queue.
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+from openstack import _log
+
+DEFAULT_CONCURRENCY = 5
+
+_PENDING = 'pending'
+_READY = 'ready'
+_RUNNING = 'running'
+_WAITING = 'waiting'
+_DONE = 'done'
+_FAILED = 'failed'
+_SKIPPED = 'skipped'
+
+
+class CleanupProgress(collections.namedtuple(
+        'CleanupProgress',
+        ['total', 'deleted', 'failed', 'skipped', 'elapsed', 'eta'])):
+    """A named tuple describing the progress of the project cleanup.
+
+    It is put into the ``status_queue`` of
+    :meth:`~openstack.connection.Connection.project_cleanup` every time the
+    amount of processed resources changes during a real (not dry) run.
+
+    :ivar ~.total: Total amount of resources scheduled for deletion.
+    :ivar ~.deleted: Amount of resources which are confirmed to be deleted.
+    :ivar ~.failed: Amount of resources which could not be deleted.
+    :ivar ~.skipped: Amount of resources which were not attempted, because
+        some resource they depend on could not be deleted.
+    :ivar ~.elapsed: Seconds since the deletion started.
+    :ivar ~.eta: Estimated amount of seconds until the cleanup completes or
+        ``None`` if it can not be estimated yet.
+    """
+    __slots__ = ()
+
+    @property
+    def processed(self):
+        return self.deleted + self.failed + self.skipped
+
+
+class _Node:
+
+    __slots__ = ('id', 'service', 'obj', 'del_fn', 'depends_on',
+                 'wait_list_fn', 'is_barrier', 'state', 'deleted_at')
+
+    def __init__(self, node_id, service, obj=None, del_fn=None,
+                 wait_list_fn=None, is_barrier=False):
+        self.id = node_id
+        self.service = service
+        self.obj = obj
+        self.del_fn = del_fn
+        self.depends_on = set()
+        self.wait_list_fn = wait_list_fn
+        self.is_barrier = is_barrier
+        self.state = _PENDING
+        self.deleted_at = None
+
+
+def _normalize_service(service):
+    return service.replace('-', '_') if service else service
+
+
+class ResourceCleanupGraph:
+    """Dependency graph of the resources identified for deletion.
+
+    Nodes are keyed by the resource ID. Dependencies on IDs which are not
+    registered in the graph are ignored, since such resources are not going
+    to be deleted by the cleanup (or are already gone).
+
+    Every service gets a barrier node (see :meth:`barrier`), which completes
+    once all resources of the service are processed. Barriers are used to
+    order services which do not track dependencies between their resources
+    individually.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}
+        self._service_order = []
+        self.log = _log.setup_logging('openstack.project_cleanup')
+
+    def __len__(self):
+        return sum(1 for node in self._nodes.values() if not node.is_barrier)
+
+    def __contains__(self, res_id):
+        node = self._nodes.get(res_id)
+        return node is not None and not node.is_barrier
+
+    @staticmethod
+    def barrier(service):
+        """Return the ID of the barrier node of the service."""
+        return 'service:%s' % _normalize_service(service)
+
+    def add(self, service, obj, del_fn, depends_on=None,
+            wait_list_fn=None):
+        """Register resource for deletion.
+
+        Registering the same resource again extends its dependencies.
+
+        :param str service: Service type the resource belongs to.
+        :param obj: The resource to delete. Must have an ``id``.
+        :param del_fn: Callable which is invoked with ``obj`` to delete it.
+        :param depends_on: Iterable of resource IDs (or service barriers)
+            which must be deleted before this resource.
+        :param wait_list_fn: Optional callable returning the currently
+            existing resources of the same kind. If given, the resource is
+            only treated as deleted once it disappears from that list.
+            Resources of the same kind and service are polled together.
+        """
+        service = _normalize_service(service)
+        with self._lock:
+            node = self._nodes.get(obj.id)
+            if node is None:
+                node = _Node(obj.id, service, obj, del_fn, wait_list_fn)
+                self._nodes[obj.id] = node
+            if depends_on:
+                node.depends_on.update(
+                    dep for dep in depends_on if dep and dep != obj.id)
+        return node
+
+    def add_service_dependency(self, before, after):
+        """Let all resources of ``after`` wait for the ``before`` service."""
+        self._service_order.append(
+            (_normalize_service(before), _normalize_service(after)))
+
+    def _build(self):
+        """Resolve barriers and dependencies into adjacency lists."""
+        services = set(node.service for node in self._nodes.values())
+        for before, after in self._service_order:
+            services.update((before, after))
+        for service in services:
+            barrier = self.barrier(service)
+            if barrier not in self._nodes:
+                self._nodes[barrier] = _Node(
+                    barrier, service, is_barrier=True)
+        for node in list(self._nodes.values()):
+            if not node.is_barrier:
+                self._nodes[self.barrier(node.service)].depends_on.add(
+                    node.id)
+        for before, after in self._service_order:
+            barrier = self.barrier(before)
+            for node in self._nodes.values():
+                if node.service == after and not node.is_barrier:
+                    node.depends_on.add(barrier)
+
+        dependents = collections.defaultdict(list)
+        in_degree = {}
+        for node in self._nodes.values():
+            deps = set(dep for dep in node.depends_on if dep in self._nodes)
+            node.depends_on = deps
+            in_degree[node.id] = len(deps)
+            for dep in deps:
+                dependents[dep].append(node.id)
+        return dependents, in_degree
+
+    def run(self, executor, concurrency=None, status_queue=None,
+            timeout=120, interval=2):
+        """Delete the registered resources.
+
+        :param executor: A :class:`concurrent.futures.Executor` used to run
+            the deletions.
+        :param concurrency: Maximum amount of concurrent deletions per
+            service. Either a single int or a dict with service types as keys.
+            Defaults to :data:`DEFAULT_CONCURRENCY`.
+        :param queue status_queue: Optional queue to put
+            :class:`CleanupProgress` records into.
+        :param int timeout: Seconds to wait for a single resource to
+            disappear. It is also the time after which the deletions still
+            running fail if no deletion finished in the meantime.
+        :param int interval: Seconds between the polls of the deletions
+            being awaited.
+        :returns: :class:`CleanupProgress` of the finished run.
+        """
+        dependents, in_degree = self._build()
+        limits = self._get_limits(concurrency)
+        total = len(self)
+        counters = collections.Counter()
+        ready = collections.defaultdict(collections.deque)
+        running = {}
+        running_per_service = collections.Counter()
+        waiting = collections.defaultdict(list)
+        start = time.monotonic()
+        last_poll = start
+        last_progress = start
+        last_reported = None
+
+        def finish(node, state):
+            node.state = state
+            if not node.is_barrier:
+                counters[state] += 1
+            for dep_id in dependents[node.id]:
+                dep = self._nodes[dep_id]
+                if dep.state != _PENDING:
+                    continue
+                if state == _DONE or dep.is_barrier:
+                    in_degree[dep_id] -= 1
+                    if in_degree[dep_id] == 0:
+                        release(dep)
+                else:
+                    self.log.warning(
+                        'Skipping deletion of %s since %s could not be '
+                        'deleted', dep.obj or dep.id, node.obj or node.id)
+                    finish(dep, _SKIPPED)
+
+        def release(node):
+            if node.is_barrier:
+                finish(node, _DONE)
+            else:
+                node.state = _READY
+                ready[node.service].append(node)
+
+        def report():
+            nonlocal last_reported
+            elapsed = time.monotonic() - start
+            counts = (counters[_DONE], counters[_FAILED], counters[_SKIPPED])
+            processed = sum(counts)
+            eta = None
+            if processed >= total:
+                eta = 0
+            elif processed:
+                eta = elapsed / processed * (total - processed)
+            progress = CleanupProgress(total, *counts, elapsed, eta)
+            if status_queue is not None and counts != last_reported:
+                status_queue.put(progress)
+            last_reported = counts
+            return progress
+
+        for node_id, degree in in_degree.items():
+            if degree == 0 and self._nodes[node_id].state == _PENDING:
+                release(self._nodes[node_id])
+
+        while True:
+            # Start as many deletions as allowed
+            for service, nodes in ready.items():
+                limit = limits.get(service, limits[None])
+                while nodes and running_per_service[service] < limit:
+                    node = nodes.popleft()
+                    node.state = _RUNNING
+                    running_per_service[service] += 1
+                    running[executor.submit(node.del_fn, node.obj)] = node
+
+            if not running and not any(waiting.values()):
+                break
+
+            if running:
+                completed, _ = concurrent.futures.wait(
+                    running, timeout=interval,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+            else:
+                completed = set()
+                time.sleep(interval)
+
+            now = time.monotonic()
+            if completed:
+                last_progress = now
+            for future in completed:
+                node = running.pop(future)
+                running_per_service[node.service] -= 1
+                try:
+                    future.result()
+                except Exception as e:
+                    self.log.exception(
+                        'Cannot delete resource %s: %s', node.obj, str(e))
+                    finish(node, _FAILED)
+                    continue
+                if node.wait_list_fn:
+                    node.state = _WAITING
+                    node.deleted_at = now
+                    waiting[(node.service, type(node.obj))].append(node)
+                else:
+                    finish(node, _DONE)
+
+            if now - last_poll >= interval:
+                last_poll = now
+                self._poll_waiting(waiting, finish, timeout)
+
+            if running and now - last_progress > timeout:
+                # The deletions hang, they cannot be interrupted but nothing
+                # waits for them anymore
+                for future, node in list(running.items()):
+                    future.cancel()
+                    del running[future]
+                    running_per_service[node.service] -= 1
+                    self.log.error(
+                        'Timeout waiting for the deletion of %s', node.obj)
+                    finish(node, _FAILED)
+                last_progress = now
+
+            report()
+
+        # Whatever is left is blocked by dependencies which can never be
+        # satisfied (i.e. a dependency cycle)
+        for node in self._nodes.values():
+            if node.state == _PENDING and not node.is_barrier:
+                self.log.warning(
+                    'Resource %s was not processed by the cleanup', node.obj)
+                node.state = _SKIPPED
+                counters[_SKIPPED] += 1
+        return report()
+
+    def _poll_waiting(self, waiting, finish, timeout):
+        """Check the deletions being awaited with one list per kind."""
+        now = time.monotonic()
+        for key, nodes in waiting.items():
+            if not nodes:
+                continue
+            try:
+                existing = set(res.id for res in nodes[0].wait_list_fn())
+            except Exception as e:
+                self.log.debug(
+                    'Cannot check deletion of %s resources: %s', key[1], e)
+                existing = None
+            remaining = []
+            for node in nodes:
+                if existing is not None and node.id not in existing:
+                    finish(node, _DONE)
+                elif now - node.deleted_at > timeout:
+                    self.log.error(
+                        'Timeout waiting for %s to be deleted', node.obj)
+                    finish(node, _FAILED)
+                else:
+                    remaining.append(node)
+            waiting[key] = remaining
+
+    @staticmethod
+    def _get_limits(concurrency):
+        if isinstance(concurrency, dict):
+            limits = {
+                _normalize_service(k): max(int(v), 1)
+                for k, v in concurrency.items()}
+            limits.setdefault(None, DEFAULT_CONCURRENCY)
+        elif concurrency:
+            limits = {None: max(int(concurrency), 1)}
+        else:
+            limits = {None: DEFAULT_CONCURRENCY}
+        return limits
@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Sizing and utilisation of the HTTP connection pools.
+
+requests keeps a pool of connections per host in the transport adapters
+mounted on its session. The default adapters keep at most 10 connections per
+host, requests running concurrently beyond that open connections which are
+discarded afterwards ("connection pool is full"). The helpers here mount
+adapters with configured pool sizes and report how the pools are used.
+"""
+
+import threading
+import urllib.parse
+
+from keystoneauth1 import session as ks_session
+import requests
+from requests import adapters as requests_adapters
+
+_shared_sessions = {}
+_shared_lock = threading.Lock()
+
+
+def make_adapter(connections=None, maxsize=None):
+    """Create a transport adapter with the given pool sizes.
+
+    :param int connections: Amount of hosts to keep a pool for.
+    :param int maxsize: Amount of connections kept per host.
+    """
+    return ks_session.TCPKeepAliveAdapter(
+        pool_connections=connections or requests_adapters.DEFAULT_POOLSIZE,
+        pool_maxsize=maxsize or requests_adapters.DEFAULT_POOLSIZE)
+
+
+def mount(requests_session, prefixes, connections=None, maxsize=None):
+    """Mount an adapter with the given pool sizes for the URL prefixes."""
+    adapter = make_adapter(connections, maxsize)
+    for prefix in prefixes:
+        requests_session.mount(prefix, adapter)
+
+
+def make_session(connections=None, maxsize=None):
+    """Create a requests session with the given pool sizes."""
+    requests_session = requests.Session()
+    mount(requests_session, ('https://', 'http://'), connections, maxsize)
+    return requests_session
+
+
+def get_endpoint_prefix(url):
+    """Get the scheme and host part of an URL an adapter is mounted for."""
+    parsed = urllib.parse.urlparse(url)
+    return '{0}://{1}/'.format(parsed.scheme, parsed.netloc)
+
+
+def get_shared_session(key, factory):
+    """Get the requests session shared by the connections with the key.
+
+    :param key: Identifier of the cloud region.
+    :param factory: Callable creating the session when there is none yet.
+    """
+    with _shared_lock:
+        if key not in _shared_sessions:
+            _shared_sessions[key] = factory()
+        return _shared_sessions[key]
+
+
+def _get_pool_stats(pool):
+    # NOTE: urllib3 fills the queue of a pool with None placeholders up to
+    # its maxsize, the queue size is the amount of connections not in use.
+    queue = pool.pool
+    maxsize = queue.maxsize if queue is not None else 0
+    available = queue.qsize() if queue is not None else 0
+    return {
+        'maxsize': maxsize,
+        'in_use': maxsize - available,
+        'created': pool.num_connections,
+        'requests': pool.num_requests,
+    }
+
+
+def get_pool_stats(requests_session, url=None):
+    """Get the utilisation of the connection pools of a requests session.
+
+    :param requests_session: A :class:`requests.Session`.
+    :param str url: Only report the pool serving this URL.
+    :returns: A dict of ``maxsize``, ``in_use``, ``created`` and
+        ``requests`` by the ``scheme://host:port`` of the pool.
+    """
+    stats = {}
+    for adapter in set(requests_session.adapters.values()):
+        poolmanager = getattr(adapter, 'poolmanager', None)
+        if poolmanager is None:
+            continue
+        for pool_key in list(poolmanager.pools.keys()):
+            pool = poolmanager.pools.get(pool_key)
+            if pool is None:
+                continue
+            name = '{0}://{1}:{2}'.format(pool.scheme, pool.host, pool.port)
+            # Pools of the same host in different adapters are summed up
+            for key, value in _get_pool_stats(pool).items():
+                stats.setdefault(name, {}).setdefault(key, 0)
+                stats[name][key] += value
+    if url is not None:
+        parsed = urllib.parse.urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        name = '{0}://{1}:{2}'.format(parsed.scheme, parsed.hostname, port)
+        return {name: stats[name]} if name in stats else {}
+    return stats
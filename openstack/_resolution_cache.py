@@ -0,0 +1,135 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Per-connection cache of resolved resource names.
+
+Looking up a resource by its name usually costs two round trips: a ``GET``
+by ID which fails followed by a filtered list. The :class:`ResolutionCache`
+remembers which ID a name was resolved to (or that nothing was found) so
+that repeated lookups of the same name need a single ``GET`` (or no request
+at all for the names known to be missing).
+
+Entries are grouped into namespaces. :meth:`~openstack.resource.Resource.find`
+uses the resource class as the namespace, the cloud layer uses the resource
+name (e.g. ``image``). Creating, updating or deleting a resource through the
+proxy invalidates the namespaces of that resource type.
+"""
+
+import re
+import threading
+import time
+
+MISSING = object()
+"""Marker returned by :meth:`ResolutionCache.get` for negative entries."""
+
+_FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
+_ALL_CAP_RE = re.compile('([a-z0-9])([A-Z])')
+
+
+def _get_resource_name(resource_type):
+    """Get the cloud layer name of the resource type (i.e. ``server``)."""
+    name = getattr(resource_type, 'resource_key', None)
+    if not name:
+        name = _ALL_CAP_RE.sub(
+            r'\1_\2', _FIRST_CAP_RE.sub(r'\1_\2', resource_type.__name__))
+    return name.lower()
+
+
+def make_key(name_or_id, *args, **kwargs):
+    """Build the key of an entry from the lookup arguments."""
+    return (
+        name_or_id,
+        repr(args),
+        repr(sorted(kwargs.items(), key=lambda item: item[0])),
+    )
+
+
+class ResolutionCache:
+    """Cache of the name to ID resolutions.
+
+    :param float ttl: Seconds the resolved IDs are kept. ``-1`` means the
+        entries never expire and ``0`` disables the cache.
+    :param float negative_ttl: Seconds the failed resolutions are kept. Same
+        semantics as ``ttl``, defaults to ``ttl``.
+    """
+
+    def __init__(self, ttl=0, negative_ttl=None):
+        self.ttl = float(ttl or 0)
+        self.negative_ttl = (
+            self.ttl if negative_ttl is None else float(negative_ttl))
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @property
+    def enabled(self):
+        return bool(self.ttl or self.negative_ttl)
+
+    def get(self, namespace, key):
+        """Get the cached ID.
+
+        :returns: The ID, :data:`MISSING` when the name is known not to
+            exist or ``None`` when there is no valid entry.
+        """
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if not entries or key not in entries:
+                return None
+            value, expires = entries[key]
+            if expires is not None and expires < time.monotonic():
+                del entries[key]
+                return None
+            return value
+
+    def set(self, namespace, key, value):
+        """Remember the resolved ID."""
+        self._set(namespace, key, value, self.ttl)
+
+    def set_missing(self, namespace, key):
+        """Remember that nothing was found for the key."""
+        self._set(namespace, key, MISSING, self.negative_ttl)
+
+    def _set(self, namespace, key, value, ttl):
+        if not ttl:
+            return
+        expires = None if ttl < 0 else time.monotonic() + ttl
+        with self._lock:
+            self._entries.setdefault(namespace, {})[key] = (value, expires)
+
+    def discard(self, namespace, key):
+        """Drop a single entry, i.e. when it turned out to be stale."""
+        with self._lock:
+            self._entries.get(namespace, {}).pop(key, None)
+
+    def invalidate(self, resource_type=None):
+        """Drop the entries related to the resource type.
+
+        :param resource_type: A :class:`~openstack.resource.Resource`
+            subclass. Entries of the related classes and the cloud layer
+            entries with the matching resource name are dropped. When not
+            given the whole cache is cleared.
+        """
+        with self._lock:
+            if resource_type is None:
+                self._entries.clear()
+                return
+            name = _get_resource_name(resource_type)
+            for namespace in list(self._entries):
+                if isinstance(namespace, type):
+                    related = (
+                        issubclass(namespace, resource_type)
+                        or issubclass(resource_type, namespace))
+                else:
+                    related = (
+                        namespace == name
+                        or namespace.endswith('_' + name))
+                if related:
+                    del self._entries[namespace]
@@ -0,0 +1,160 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Refresh of the token before it expires.
+
+keystoneauth notices that a token expires when a request needs it: the
+request re-authenticates synchronously while all the other threads needing
+a token wait. The :class:`TokenRefresher` re-authenticates in a background
+thread a margin before the token expires instead.
+"""
+
+import datetime
+import threading
+import time
+
+from openstack import _log
+
+# Seconds between the checks for a token when there is none yet
+_IDLE_INTERVAL = 60.0
+# Seconds to wait before retrying a failed refresh at most
+_RETRY_INTERVAL = 30.0
+
+
+def _get_remaining(auth_ref):
+    """Get the seconds until a token expires, None if it does not."""
+    expires = getattr(auth_ref, 'expires', None)
+    if expires is None:
+        return None
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=datetime.timezone.utc)
+    return expires.timestamp() - time.time()
+
+
+class TokenRefresher:
+    """Re-authenticate in the background before the token expires.
+
+    The new token is fetched without holding the lock of the auth plugin, so
+    requests keep using the current token meanwhile, and then replaces it at
+    once. The time of the refresh is set when a token is first seen, tokens
+    living shorter than the margin are refreshed halfway and expired ones at
+    once. A failed refresh is retried. If the token expires meanwhile,
+    keystoneauth re-authenticates on the next request as without refresher.
+
+    :param session: The :class:`~keystoneauth1.session.Session` whose
+        auth plugin to refresh.
+    :param float margin: Seconds before the expiration of the token to
+        refresh it. Should exceed the two minutes before the expiration at
+        which keystoneauth re-authenticates by itself.
+    :param on_refresh: Callable called after every refresh, i.e. to store
+        the new token in the auth cache.
+    """
+
+    def __init__(self, session, margin, on_refresh=None):
+        self.session = session
+        self.margin = float(margin)
+        self.on_refresh = on_refresh
+        self.log = _log.setup_logging('openstack.token_refresh')
+        self.refreshed = 0
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._failed = False
+        self._last_ref = None
+        # The token the time of the next refresh was set for
+        self._planned_ref = None
+        self._refresh_at = None
+
+    @property
+    def _auth(self):
+        return getattr(self.session, 'auth', None)
+
+    def _get_auth_ref(self):
+        return getattr(self._auth, 'auth_ref', None)
+
+    def start(self):
+        """Start the background thread, if it does not run yet."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='openstack-token-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread.
+
+        Does not wait for a refresh in progress.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+
+    def wake(self):
+        """Check the token again, i.e. after it was changed."""
+        self._wakeup.set()
+
+    def get_delay(self):
+        """Get the seconds until the next refresh."""
+        auth_ref = self._get_auth_ref()
+        remaining = _get_remaining(auth_ref)
+        if remaining is None:
+            return _IDLE_INTERVAL
+        if self._failed:
+            if remaining <= 0:
+                return _RETRY_INTERVAL
+            return min(max(remaining / 2, 1.0), _RETRY_INTERVAL)
+        if auth_ref is not self._planned_ref:
+            delay = remaining - self.margin
+            if auth_ref is self._last_ref:
+                # Tokens living shorter than the margin are refreshed halfway
+                delay = max(delay, remaining / 2)
+            self._planned_ref = auth_ref
+            self._refresh_at = time.monotonic() + max(delay, 0.0)
+        return max(self._refresh_at - time.monotonic(), 0.0)
+
+    def refresh(self):
+        """Fetch a new token and swap it in."""
+        auth = self._auth
+        if auth is None or getattr(auth, 'auth_ref', None) is None:
+            return
+        auth_ref = auth.get_auth_ref(self.session)
+        # NOTE: A single assignment, requests see either the old or the new
+        # token.
+        auth.auth_ref = auth_ref
+        self._last_ref = auth_ref
+        self.refreshed += 1
+        if self.on_refresh is not None:
+            self.on_refresh()
+
+    def _run(self):
+        delay = self.get_delay()
+        while True:
+            woken = self._wakeup.wait(delay)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+            if woken or (
+                not self._failed
+                and self._get_auth_ref() is not self._planned_ref
+            ):
+                # The token may have changed meanwhile
+                delay = self.get_delay()
+                if delay > 0:
+                    continue
+            try:
+                self.refresh()
+            except Exception as e:
+                self.log.warning('Cannot refresh token: %s', e)
+                self._failed = True
+            else:
+                self._failed = False
+            delay = self.get_delay()
@@ -0,0 +1,257 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Enrollment of many bare metal nodes at once.
+
+Every node goes through the stages of :data:`STAGES` on its own, a node
+does not wait for the others to finish a stage. The calls of a stage run
+in the executor of the connection, at most a given amount of them at once.
+The nodes waiting for a provision state are polled together.
+"""
+
+import time
+
+from openstack import _batch
+from openstack import exceptions
+
+#: The stages of the enrollment of a node, in order.
+STAGES = (
+    'create', 'manage', 'validate', 'ports', 'traits', 'provide', 'deploy',
+)
+
+# Stages needed to reach a provision state
+_STAGES_FOR_STATE = {
+    'enroll': ('create', 'validate', 'ports', 'traits'),
+    'manageable': (
+        'create', 'manage', 'validate', 'ports', 'traits'),
+    'available': (
+        'create', 'manage', 'validate', 'ports', 'traits', 'provide'),
+    'active': STAGES,
+}
+# Provision states reached after a stage
+_STAGE_STATES = {
+    'manage': 'manageable',
+    'provide': 'available',
+    'deploy': 'active',
+}
+# Keys of the nodes given which are not node attributes
+_EXTRA_KEYS = ('ports', 'traits', 'config_drive', 'deploy_steps')
+
+PENDING = 'pending'
+RUNNING = 'running'
+WAITING = 'waiting'
+SUCCESS = 'success'
+FAILED = 'failed'
+
+
+class NodeEnrollment:
+    """The enrollment of a node in a batch and its state.
+
+    :ivar node: The :class:`~openstack.baremetal.v1.node.Node`, once
+        created.
+    :ivar str status: One of ``pending``, ``running`` (a call of the stage
+        is in progress), ``waiting`` (for the provision state of the stage),
+        ``success`` or ``failed``.
+    :ivar str stage: The current stage, or the one that failed.
+    :ivar dict durations: Seconds every finished stage took, by stage.
+    :ivar error: The exception the failed stage raised, if any.
+    """
+
+    def __init__(self, attrs, stages):
+        self.attrs = {
+            k: v for k, v in attrs.items() if k not in _EXTRA_KEYS}
+        self.ports = [
+            {'address': p} if isinstance(p, str) else dict(p)
+            for p in attrs.get('ports') or ()]
+        self.traits = attrs.get('traits')
+        self.config_drive = attrs.get('config_drive')
+        self.deploy_steps = attrs.get('deploy_steps')
+        self.stages = [
+            s for s in stages
+            if (s != 'ports' or self.ports)
+            and (s != 'traits' or self.traits is not None)]
+        self.node = None
+        self.status = PENDING
+        self.stage = None
+        self.durations = {}
+        self.error = None
+        self._started = None
+
+    def __repr__(self):
+        return '<NodeEnrollment {node} {stage} {status}>'.format(
+            node=self.node.id if self.node else self.attrs.get('name'),
+            stage=self.stage, status=self.status)
+
+    @property
+    def next_stage(self):
+        """The stage to run next, None when all stages are done."""
+        if self.stage is None:
+            return self.stages[0] if self.stages else None
+        index = self.stages.index(self.stage) + 1
+        return self.stages[index] if index < len(self.stages) else None
+
+    def start(self, stage):
+        self.stage = stage
+        self.status = RUNNING
+        self._started = time.monotonic()
+
+    def finish(self):
+        """Mark the current stage as done."""
+        self.durations[self.stage] = time.monotonic() - self._started
+        self.status = SUCCESS if self.next_stage is None else PENDING
+
+    def fail(self, error):
+        self.error = error
+        self.status = FAILED
+
+
+class BatchEnrollment(_batch.BatchRunner):
+    """Run the enrollment of several nodes.
+
+    :param proxy: The bare metal :class:`~openstack.baremetal.v1._proxy.Proxy`.
+    :param enrollments: List of :class:`NodeEnrollment`.
+    :param dict concurrency: Amount of calls of each stage running at once,
+        by stage.
+    :param lock_timeout: Seconds to wait for the reservation of a node to be
+        released after a conflict.
+    :param int conflict_retries: Times a call failing with a conflict is
+        retried.
+    :param bool validate_for_deploy: Validate the interfaces needed to
+        deploy the nodes, not only the power one.
+    """
+
+    def __init__(
+        self, proxy, enrollments, concurrency, lock_timeout=600,
+        conflict_retries=3, validate_for_deploy=False,
+    ):
+        super().__init__(proxy)
+        self.enrollments = enrollments
+        self.concurrency = concurrency
+        self.lock_timeout = lock_timeout
+        self.conflict_retries = conflict_retries
+        if validate_for_deploy:
+            self.interfaces = ('boot', 'deploy', 'management', 'power')
+        else:
+            self.interfaces = ('power',)
+
+    def _retry_conflicts(self, item, call, *args, **kwargs):
+        # NOTE: The proxy retries conflicts already, these are the ones left
+        # after that, e.g. because a conductor holds the node for long.
+        for attempt in range(self.conflict_retries + 1):
+            try:
+                return call(*args, **kwargs)
+            except exceptions.ConflictException:
+                if attempt == self.conflict_retries or item.node is None:
+                    raise
+                self.proxy.log.debug(
+                    "Conflict for node %s, waiting for its reservation",
+                    item.node.id)
+                item.node = self.proxy.wait_for_node_reservation(
+                    item.node, timeout=self.lock_timeout)
+
+    def _run_stage(self, item):
+        proxy = self.proxy
+        stage = item.stage
+        if stage == 'create':
+            item.node = proxy.create_node(
+                provision_state='enroll', **item.attrs)
+        elif stage == 'manage':
+            item.node = self._retry_conflicts(
+                item, proxy.set_node_provision_state, item.node, 'manage')
+        elif stage == 'validate':
+            self._retry_conflicts(
+                item, proxy.validate_node, item.node,
+                required=self.interfaces)
+        elif stage == 'ports':
+            for port in item.ports:
+                self._retry_conflicts(
+                    item, proxy.create_port, node_id=item.node.id, **port)
+        elif stage == 'traits':
+            self._retry_conflicts(
+                item, proxy.set_node_traits, item.node, item.traits)
+        elif stage == 'provide':
+            item.node = self._retry_conflicts(
+                item, proxy.set_node_provision_state, item.node, 'provide')
+        elif stage == 'deploy':
+            item.node = self._retry_conflicts(
+                item, proxy.set_node_provision_state, item.node, 'active',
+                config_drive=item.config_drive,
+                deploy_steps=item.deploy_steps)
+
+    def _submit(self):
+        """Start the next stage of the nodes, within the concurrency."""
+        running = {}
+        for item in self._futures.values():
+            running[item.stage] = running.get(item.stage, 0) + 1
+        for item in self.enrollments:
+            if item.status != PENDING:
+                continue
+            stage = item.next_stage
+            if running.get(stage, 0) >= self.concurrency[stage]:
+                continue
+            running[stage] = running.get(stage, 0) + 1
+            item.start(stage)
+            self._start(item, self._run_stage, item)
+
+    def _call_done(self, item):
+        if item.stage in _STAGE_STATES:
+            item.status = WAITING
+        else:
+            item.finish()
+
+    def _call_failed(self, item, error):
+        self.proxy.log.debug(
+            "Stage %(stage)s failed for node %(node)s",
+            {'stage': item.stage, 'node': item}, exc_info=True)
+        item.fail(error)
+
+    def _poll(self):
+        """Check the provision state of all nodes waiting for one."""
+        waiting = [item for item in self.enrollments
+                   if item.status == WAITING]
+        if not waiting:
+            return
+        nodes = self.proxy._poll_nodes([item.node for item in waiting])
+        for item, node in zip(waiting, nodes):
+            # NOTE: The nodes polled only have few fields, the node of the
+            # enrollment is fetched again once it is done waiting.
+            try:
+                if node._check_state_reached(
+                        self.proxy, _STAGE_STATES[item.stage]):
+                    item.node = self.proxy.get_node(node)
+                    item.finish()
+            except exceptions.ResourceFailure as e:
+                item.node = self.proxy.get_node(node)
+                item.fail(e)
+
+    def _is_waiting(self):
+        return any(item.status == WAITING for item in self.enrollments)
+
+    def _is_finished(self):
+        return all(item.status in (SUCCESS, FAILED)
+                   for item in self.enrollments)
+
+    def _time_out(self):
+        for item in self.enrollments:
+            if item.status in (PENDING, RUNNING, WAITING):
+                item.fail(exceptions.ResourceTimeout(
+                    "Timeout enrolling node in stage {stage}".format(
+                        stage=item.stage or item.next_stage)))
+
+    def run(self, interval=2, timeout=None):
+        """Run all stages of all nodes.
+
+        Nodes still being enrolled after ``timeout`` seconds fail with a
+        :class:`~openstack.exceptions.ResourceTimeout`, the calls already
+        running are finished first.
+        """
+        super().run(interval=interval, timeout=timeout)
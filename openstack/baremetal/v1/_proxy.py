@@ -11,6 +11,7 @@
 # under the License.
 
 from openstack.baremetal.v1 import _common
+from openstack.baremetal.v1 import _enroll
 from openstack.baremetal.v1 import allocation as _allocation
 from openstack.baremetal.v1 import chassis as _chassis
 from openstack.baremetal.v1 import conductor as _conductor
@@ -25,11 +26,25 @@ from openstack import exceptions
 from openstack import proxy
 from openstack import utils
 
+# Fields telling whether a node reached a provision state
+_WAIT_FIELDS = (
+    'id', 'name', 'provision_state', 'last_error', 'power_state',
+    'reservation',
+)
+# Amount of nodes waited for, above which they are polled with one listing
+_WAIT_LIST_THRESHOLD = 10
+# Nodes listed per node waited for at most, the nodes are fetched one by
+# one when the listing returns more
+_WAIT_LIST_RATIO = 4
+
 
 class Proxy(proxy.Proxy):
 
     retriable_status_codes = _common.RETRIABLE_STATUS_CODES
 
+    # Amount of nodes the last listing of _poll_nodes returned, at least
+    _node_list_size = None
+
     _resource_registry = {
         "allocation": _allocation.Allocation,
         "chassis": _chassis.Chassis,
@@ -484,7 +499,7 @@ class Proxy(proxy.Proxy):
                     "Timeout waiting for nodes %(nodes)s to reach "
                     "target state '%(state)s'" % {'nodes': log_nodes,
                                                   'state': expected_state}):
-                nodes = [self.get_node(n) for n in remaining]
+                nodes = self._poll_nodes(remaining)
                 remaining = []
                 for n in nodes:
                     try:
@@ -501,9 +516,11 @@ class Proxy(proxy.Proxy):
 
                 if not remaining:
                     if fail:
-                        return finished
+                        return self._get_nodes(finished)
                     else:
-                        return _node.WaitResult(finished, failed, [])
+                        return _node.WaitResult(
+                            self._get_nodes(finished),
+                            self._get_nodes(failed), [])
 
                 self.log.debug(
                     'Still waiting for nodes %(nodes)s to reach state '
@@ -514,7 +531,123 @@ class Proxy(proxy.Proxy):
             if fail:
                 raise
             else:
-                return _node.WaitResult(finished, failed, remaining)
+                return _node.WaitResult(
+                    self._get_nodes(finished), self._get_nodes(failed),
+                    self._get_nodes(remaining))
+
+    def _get_nodes(self, nodes):
+        """Fetch all fields of the nodes polled with few of them."""
+        return [self.get_node(n) for n in nodes]
+
+    def _poll_nodes(self, nodes):
+        """Get the current state of the nodes being waited for.
+
+        Only the fields needed to tell whether a node reached a state are
+        fetched. Few nodes are fetched one by one, more with a single
+        listing of all nodes instead of a request per node. The listing is
+        given up for the nodes being fetched one by one when it returns many
+        more nodes than are waited for, i.e. in a large deployment.
+
+        :param nodes: List of nodes - name, ID or
+            :class:`~openstack.baremetal.v1.node.Node` instance.
+        :returns: List of :class:`~openstack.baremetal.v1.node.Node`, in the
+            order of ``nodes``.
+        """
+        limit = len(nodes) * _WAIT_LIST_RATIO
+        if len(nodes) <= _WAIT_LIST_THRESHOLD or (
+            self._node_list_size is not None
+            and self._node_list_size > limit
+        ):
+            return [self.get_node(n, fields=_WAIT_FIELDS) for n in nodes]
+
+        listed = {}
+        count = 0
+        # NOTE: Ironic cannot filter a listing by node IDs, the listing is
+        # cut after one more node than the limit instead.
+        for n in self.nodes(fields=_WAIT_FIELDS, limit=limit + 1):
+            count += 1
+            listed[n.id] = n
+            if n.name:
+                listed[n.name] = n
+            if count > limit:
+                break
+        self._node_list_size = count
+        result = []
+        for n in nodes:
+            key = n.id if isinstance(n, _node.Node) else n
+            # NOTE: The listing may not show every node, e.g. because of
+            # its owner
+            found = listed.get(key)
+            if found is None:
+                found = self.get_node(n, fields=_WAIT_FIELDS)
+            result.append(found)
+        return result
+
+    def enroll_nodes(self, nodes, provision_state='available',
+                     concurrency=10, lock_timeout=600, conflict_retries=3,
+                     interval=2, timeout=None):
+        """Enroll many nodes and bring them into a provision state.
+
+        Every node goes through these stages on its own, skipping the ones
+        not needed for ``provision_state``: the node is created in the
+        ``enroll`` state, made ``manageable``, validated, its ports are
+        created, its traits set, it is made ``available`` and deployed.
+        The nodes waiting for a provision state are polled together, see
+        :meth:`wait_for_nodes_provision_state`.
+
+        :param nodes: List of dicts with the attributes to create the nodes
+            with, see :meth:`create_node`. They can also have ``ports``, a
+            list of MAC addresses or of dicts with the attributes of the
+            ports, ``traits``, a list of traits to set, and the
+            ``config_drive`` and ``deploy_steps`` to deploy the node with.
+        :param provision_state: The provision state to bring the nodes
+            into, one of ``enroll``, ``manageable``, ``available`` (the
+            default), which goes through cleaning, or ``active``, which
+            deploys the nodes. Nodes are validated for deployment only when
+            deploying them.
+        :param concurrency: Amount of calls of a stage running at once. An
+            int, or a dict by stage. The stages are ``create``, ``manage``,
+            ``validate``, ``ports``, ``traits``, ``provide`` and ``deploy``.
+        :param lock_timeout: Seconds to wait for the reservation of a node to
+            be released after a conflict.
+        :param int conflict_retries: Times a call failing with a conflict is
+            retried after waiting for the reservation of the node.
+        :param interval: Seconds between the polls of the nodes waiting for a
+            provision state.
+        :param timeout: Seconds to enroll the nodes in. Nodes still being
+            enrolled then fail with
+            :class:`~openstack.exceptions.ResourceTimeout`. The value of
+            ``None`` (the default) means no client-side timeout.
+
+        :returns: A list of
+            :class:`~openstack.baremetal.v1._enroll.NodeEnrollment` reporting
+            the stages done for every node, in the order of ``nodes``. Nodes
+            failing a stage are left as they are.
+        :raises: ValueError if ``provision_state`` or ``concurrency`` is
+            invalid.
+        """
+        try:
+            stages = _enroll._STAGES_FOR_STATE[provision_state]
+        except KeyError:
+            raise ValueError(
+                'Provision state must be one of %s, got %s'
+                % (', '.join(_enroll._STAGES_FOR_STATE), provision_state))
+        if isinstance(concurrency, int):
+            concurrency = dict.fromkeys(_enroll.STAGES, concurrency)
+        else:
+            concurrency = dict(
+                dict.fromkeys(_enroll.STAGES, 10), **concurrency)
+        if min(concurrency.values()) < 1:
+            raise ValueError('Concurrency must be at least 1')
+
+        enrollments = [_enroll.NodeEnrollment(attrs, stages)
+                       for attrs in nodes]
+        batch = _enroll.BatchEnrollment(
+            self, enrollments, concurrency, lock_timeout=lock_timeout,
+            conflict_retries=conflict_retries,
+            validate_for_deploy=provision_state == 'active')
+        batch.run(interval=interval, timeout=timeout)
+        return enrollments
 
     def set_node_power_state(self, node, target, wait=False, timeout=None):
         """Run an action modifying node's power state.
@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import functools
+
 from openstack.block_storage import _base_proxy
 from openstack.block_storage.v3 import availability_zone
 from openstack.block_storage.v3 import backup as _backup
@@ -1507,7 +1510,9 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
     def _get_cleanup_dependencies(self):
         return {
             'block_storage': {
-                'before': []
+                'before': [],
+                # Volumes wait only for the servers they are attached to
+                'per_resource': ['compute'],
             }
         }
 
@@ -1517,7 +1522,8 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
         client_status_queue=None,
         identified_resources=None,
         filters=None,
-        resource_evaluation_fn=None
+        resource_evaluation_fn=None,
+        cleanup_graph=None,
     ):
         # It is not possible to delete backup if there are dependent backups.
         # In order to be able to do cleanup those is required to have multiple
@@ -1538,6 +1544,38 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
                     identified_resources=identified_resources,
                     filters=filters,
                     resource_evaluation_fn=resource_evaluation_fn)
+        elif cleanup_graph is not None:
+            # Incremental backups are chained per volume, so every backup
+            # must wait for the next younger backup of the same volume.
+            youngest_backup = {}
+            # Volumes with a backup which is kept
+            kept_backups = set()
+            for obj in self.backups(
+                    details=True, sort_key='created_at', sort_dir='desc'
+            ):
+                if obj.has_dependent_backups and (
+                    obj.volume_id in kept_backups
+                    or obj.volume_id not in youngest_backup
+                ):
+                    # A younger backup depending on it is kept
+                    kept_backups.add(obj.volume_id)
+                    continue
+                need_delete = self._service_cleanup_del_res(
+                    self.delete_backup,
+                    obj,
+                    dry_run=dry_run,
+                    client_status_queue=client_status_queue,
+                    identified_resources=identified_resources,
+                    filters=filters,
+                    resource_evaluation_fn=resource_evaluation_fn,
+                    cleanup_graph=cleanup_graph,
+                    depends_on=[youngest_backup.get(obj.volume_id)],
+                    wait_list_fn=functools.partial(
+                        self.backups, details=False))
+                if need_delete:
+                    youngest_backup[obj.volume_id] = obj.id
+                else:
+                    kept_backups.add(obj.volume_id)
         else:
             # Set initial iterations conditions
             need_backup_iteration = True
@@ -1577,6 +1615,7 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
                         pass
 
         snapshots = []
+        volume_snapshots = collections.defaultdict(list)
         for obj in self.snapshots(details=False):
             need_delete = self._service_cleanup_del_res(
                 self.delete_snapshot,
@@ -1585,19 +1624,29 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph,
+                wait_list_fn=functools.partial(
+                    self.snapshots, details=False))
             if not dry_run and need_delete:
                 snapshots.append(obj)
+                volume_snapshots[obj.volume_id].append(obj.id)
 
-        # Before deleting volumes need to wait for snapshots to be deleted
-        for obj in snapshots:
-            try:
-                self.wait_for_delete(obj)
-            except exceptions.SDKException:
-                # Well, did our best, still try further
-                pass
+        if cleanup_graph is None:
+            # Before deleting volumes need to wait for snapshots to be deleted
+            for obj in snapshots:
+                try:
+                    self.wait_for_delete(obj)
+                except exceptions.SDKException:
+                    # Well, did our best, still try further
+                    pass
 
         for obj in self.volumes(details=True):
+            # Volume can be deleted once its snapshots are gone and the
+            # servers it is attached to are deleted
+            depends_on = volume_snapshots[obj.id] + [
+                attachment.get('server_id')
+                for attachment in obj.attachments or []]
             self._service_cleanup_del_res(
                 self.delete_volume,
                 obj,
@@ -1605,4 +1654,6 @@ class Proxy(_base_proxy.BaseBlockStorageProxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph,
+                depends_on=depends_on)
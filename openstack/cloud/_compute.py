@@ -14,6 +14,9 @@
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
 import base64
+import collections
+import concurrent.futures
+import datetime
 import functools
 import operator
 import threading
@@ -29,6 +32,32 @@ from openstack.compute.v2 import server as _server
 from openstack import exceptions
 from openstack import utils
 
+# Arguments of create_server which are applied once the server is ACTIVE
+_SERVER_POST_CREATE_ARGS = (
+    'auto_ip', 'ips', 'ip_pool', 'reuse_ips', 'nat_destination')
+# Tolerated clock skew between the client and the compute service when
+# polling servers with ``changes-since``
+_CHANGES_SINCE_SKEW = 600
+
+
+class ServerBatchResult(collections.namedtuple('ServerBatchResult',
+                                               ['success', 'failure'])):
+    """A named tuple representing a result of creating several servers.
+
+    :ivar ~.success: a list of the created compute ``Server`` objects.
+    :ivar ~.failure: a list of ``(spec, exception)`` tuples for every server
+        which could not be created (or did not become ACTIVE).
+    """
+    __slots__ = ()
+
+
+def _copy_server_spec(spec):
+    # create_server modifies the nics in place
+    spec = dict(spec)
+    if isinstance(spec.get('nics'), list):
+        spec['nics'] = [dict(nic) for nic in spec['nics']]
+    return spec
+
 
 class ComputeCloudMixin:
 
@@ -770,6 +799,286 @@ class ComputeCloudMixin:
         :returns: The created compute ``Server`` object.
         :raises: OpenStackCloudException on operation error.
         """
+        kwargs = self._get_create_server_kwargs(
+            name, image=image, flavor=flavor, root_volume=root_volume,
+            terminate_volume=terminate_volume, network=network,
+            boot_from_volume=boot_from_volume, volume_size=volume_size,
+            boot_volume=boot_volume, volumes=volumes, group=group,
+            **kwargs)
+
+        server = self.compute.create_server(**kwargs)
+        # TODO(mordred) We're only testing this in functional tests. We need
+        # to add unit tests for this too.
+        admin_pass = server.admin_password or kwargs.get('admin_pass')
+        if not wait:
+            # This is a direct get call to skip the list_servers
+            # cache which has absolutely no chance of containing the
+            # new server.
+            # Only do this if we're not going to wait for the server
+            # to complete booting, because the only reason we do it
+            # is to get a server record that is the return value from
+            # get/list rather than the return value of create. If we're
+            # going to do the wait loop below, this is a waste of a call
+            server = self.compute.get_server(server.id)
+            if server.status == 'ERROR':
+                raise exc.OpenStackCloudCreateException(
+                    resource='server', resource_id=server.id)
+            server = meta.add_server_interfaces(self, server)
+
+        else:
+            server = self.wait_for_server(
+                server,
+                auto_ip=auto_ip, ips=ips, ip_pool=ip_pool,
+                reuse=reuse_ips, timeout=timeout,
+                nat_destination=nat_destination,
+            )
+
+        server.admin_password = admin_pass
+        return server
+
+    def create_servers(self, specs, concurrency=5, wait=True, timeout=180):
+        """Create several virtual server instances.
+
+        Names of images, flavors, networks, server groups and volumes are
+        resolved once for the whole batch. Identical specs are created with a
+        single request using ``min_count``/``max_count`` (note that Nova then
+        names the servers according to its multi instance name template),
+        others are submitted in parallel. All servers are awaited with a
+        single poller and the floating IPs are attached in parallel.
+
+        :param specs: A list of dicts with the arguments of
+            :meth:`create_server` (except ``wait`` and ``timeout``) for every
+            server to create.
+        :param int concurrency: Maximum amount of concurrent requests.
+        :param bool wait: Wait for all servers to become ACTIVE and to get
+            their IP addresses. Defaults to True.
+        :param int timeout: Seconds to wait for the whole batch.
+        :returns: A :class:`ServerBatchResult` with the created servers and
+            the failures per server.
+        """
+        start = time.time()
+        specs = [_copy_server_spec(spec) for spec in specs]
+        self._resolve_server_specs(specs)
+
+        # Group identical specs, they can be created with one request
+        groups = []
+        for index, spec in enumerate(specs):
+            for group in groups:
+                if (
+                    'min_count' not in spec and 'max_count' not in spec
+                    and specs[group[0]] == spec
+                ):
+                    group.append(index)
+                    break
+            else:
+                groups.append([index])
+
+        success = {}
+        failure = []
+        created = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(concurrency, 1)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._create_server_group, specs[group[0]], len(group)
+                ): group
+                for group in groups
+            }
+            for future in concurrent.futures.as_completed(futures):
+                group = futures[future]
+                try:
+                    servers = future.result()
+                except Exception as e:
+                    failure.extend((specs[index], e) for index in group)
+                    continue
+                for index, server in zip(group, servers):
+                    created.append((index, server))
+                for index in group[len(servers):]:
+                    failure.append((specs[index], exc.OpenStackCloudException(
+                        'Server was not found after multiple create')))
+
+            if not wait:
+                servers = self._get_created_servers(created, start)
+                for index, server in created:
+                    server = servers.get(server.id, server)
+                    if server.status == 'ERROR':
+                        failure.append((
+                            specs[index],
+                            exc.OpenStackCloudCreateException(
+                                resource='server', resource_id=server.id)))
+                        continue
+                    success[index] = executor.submit(
+                        meta.add_server_interfaces, self, server)
+            else:
+                finished = self._wait_for_servers(
+                    [server for index, server in created], start, timeout)
+                for index, server in created:
+                    if server.id not in finished:
+                        failure.append((
+                            specs[index],
+                            exc.OpenStackCloudTimeout(
+                                'Timeout waiting for the server to come up.')))
+                        continue
+                    success[index] = executor.submit(
+                        self._get_active_created_server,
+                        finished[server.id], specs[index],
+                        max(timeout - int(time.time() - start), 1))
+
+            admin_passwords = {
+                server.id: server.admin_password
+                for index, server in created}
+            result = []
+            for index in sorted(success):
+                try:
+                    server = success[index].result()
+                except Exception as e:
+                    failure.append((specs[index], e))
+                    continue
+                if server is None:
+                    failure.append((specs[index], exc.OpenStackCloudException(
+                        'Server did not become ACTIVE')))
+                    continue
+                server.admin_password = admin_passwords.get(server.id)
+                result.append(server)
+        return ServerBatchResult(result, failure)
+
+    def _resolve_server_specs(self, specs):
+        """Resolve names referenced by server specs once for all of them."""
+        resolved = {}
+
+        def _resolve(kind, value, getter):
+            if not value or not isinstance(value, str):
+                return value
+            if (kind, value) not in resolved:
+                resolved[(kind, value)] = getter(value)
+            return resolved[(kind, value)] or value
+
+        get_flavor = functools.partial(self.get_flavor, get_extra=False)
+        default_network = None
+        for spec in specs:
+            spec['image'] = _resolve(
+                'image', spec.get('image'), self.get_image)
+            spec['flavor'] = _resolve(
+                'flavor', spec.get('flavor'), get_flavor)
+            for key in ('boot_volume', 'root_volume'):
+                if spec.get(key):
+                    spec[key] = _resolve('volume', spec[key], self.get_volume)
+            if spec.get('volumes'):
+                spec['volumes'] = [
+                    _resolve('volume', volume, self.get_volume)
+                    for volume in spec['volumes']]
+            if spec.get('group'):
+                spec['group'] = _resolve(
+                    'group', spec['group'], self.get_server_group)
+            network = spec.get('network')
+            if isinstance(network, list):
+                spec['network'] = [
+                    _resolve('network', net, self.get_network)
+                    for net in network]
+            elif network:
+                spec['network'] = _resolve(
+                    'network', network, self.get_network)
+            nics = spec.get('nics')
+            for nic in nics if isinstance(nics, list) else []:
+                if 'net-name' in nic and 'net-id' not in nic:
+                    net = _resolve(
+                        'network', nic['net-name'], self.get_network)
+                    if not isinstance(net, str):
+                        nic.pop('net-name')
+                        nic['net-id'] = net['id']
+            if not network and not nics:
+                if default_network is None:
+                    default_network = self.get_default_network() or False
+                if default_network:
+                    spec['network'] = default_network
+
+    def _create_server_group(self, spec, count):
+        """Create ``count`` servers described by the same spec."""
+        spec = _copy_server_spec(spec)
+        for key in _SERVER_POST_CREATE_ARGS + ('wait', 'timeout'):
+            spec.pop(key, None)
+        kwargs = self._get_create_server_kwargs(**spec)
+        if count == 1:
+            return [self.compute.create_server(**kwargs)]
+        kwargs.update(
+            min_count=count, max_count=count, return_reservation_id=True)
+        reservation = self.compute.create_server(**kwargs)
+        return list(self.compute.servers(
+            reservation_id=reservation.reservation_id))
+
+    def _get_active_created_server(self, server, spec, timeout):
+        """Expand server created in batch and add IPs to it."""
+        if server.status == 'ACTIVE':
+            server = self._expand_server(server, detailed=False, bare=False)
+        return self.get_active_server(
+            server,
+            auto_ip=spec.get('auto_ip', True),
+            ips=spec.get('ips'),
+            ip_pool=spec.get('ip_pool'),
+            reuse=spec.get('reuse_ips', True),
+            wait=True,
+            timeout=timeout,
+            nat_destination=spec.get('nat_destination'))
+
+    def _get_created_servers(self, created, start):
+        """Fetch the freshly created servers with one list call."""
+        since = datetime.datetime.utcfromtimestamp(
+            start - _CHANGES_SINCE_SKEW).isoformat()
+        ids = set(server.id for index, server in created)
+        return {
+            server.id: server
+            for server in self.compute.servers(changes_since=since)
+            if server.id in ids
+        }
+
+    def _wait_for_servers(self, servers, start, timeout):
+        """Wait for servers to reach ACTIVE or ERROR polling them together.
+
+        :returns: dict of server id to the server in its final state. Servers
+            which did not finish within the timeout are not included.
+        """
+        pending = set(server.id for server in servers)
+        finished = {}
+        try:
+            for count in utils.iterate_timeout(
+                    max(timeout - int(time.time() - start), 1),
+                    "Timeout waiting for the servers to come up.",
+                    wait=self._SERVER_AGE or 2):
+                for server in self._get_created_servers(
+                        [(None, server) for server in servers], start
+                ).values():
+                    if (
+                        server.id in pending
+                        and server.status in ('ACTIVE', 'ERROR')
+                    ):
+                        pending.discard(server.id)
+                        finished[server.id] = server
+                if not pending:
+                    break
+        except exc.OpenStackCloudTimeout:
+            pass
+        return finished
+
+    def _get_create_server_kwargs(
+        self,
+        name,
+        image=None,
+        flavor=None,
+        root_volume=None,
+        terminate_volume=False,
+        network=None,
+        boot_from_volume=False,
+        volume_size='50',
+        boot_volume=None,
+        volumes=None,
+        group=None,
+        **kwargs,
+    ):
+        """Return the arguments for the compute create_server call
+
+        See :meth:`create_server` for the description of the parameters.
+        """
         # TODO(shade) Image is optional but flavor is not - yet flavor comes
         # after image in the argument list. Doh.
         if not flavor:
@@ -918,36 +1227,7 @@ class ComputeCloudMixin:
             volumes=volumes, kwargs=kwargs)
 
         kwargs['name'] = name
-
-        server = self.compute.create_server(**kwargs)
-        # TODO(mordred) We're only testing this in functional tests. We need
-        # to add unit tests for this too.
-        admin_pass = server.admin_password or kwargs.get('admin_pass')
-        if not wait:
-            # This is a direct get call to skip the list_servers
-            # cache which has absolutely no chance of containing the
-            # new server.
-            # Only do this if we're not going to wait for the server
-            # to complete booting, because the only reason we do it
-            # is to get a server record that is the return value from
-            # get/list rather than the return value of create. If we're
-            # going to do the wait loop below, this is a waste of a call
-            server = self.compute.get_server(server.id)
-            if server.status == 'ERROR':
-                raise exc.OpenStackCloudCreateException(
-                    resource='server', resource_id=server.id)
-            server = meta.add_server_interfaces(self, server)
-
-        else:
-            server = self.wait_for_server(
-                server,
-                auto_ip=auto_ip, ips=ips, ip_pool=ip_pool,
-                reuse=reuse_ips, timeout=timeout,
-                nat_destination=nat_destination,
-            )
-
-        server.admin_password = admin_pass
-        return server
+        return kwargs
 
     def _get_boot_from_volume_kwargs(
             self, image, boot_from_volume, boot_volume, volume_size,
@@ -20,6 +20,7 @@ import time
 import types  # noqa
 import warnings
 
+from openstack.cloud import _floating_ip_pool
 from openstack.cloud import _utils
 from openstack.cloud import exc
 from openstack.cloud import meta
@@ -53,6 +54,12 @@ class FloatingIPCloudMixin:
         self._floating_network_by_router_run = False
         self._floating_network_by_router_lock = threading.Lock()
 
+        self._floating_ip_pool = None
+        pool_size = int(self.config.config.get('floating_ip_pool_size') or 0)
+        if pool_size > 0:
+            self._floating_ip_pool = _floating_ip_pool.FloatingIPPool(
+                self, pool_size)
+
     def search_floating_ip_pools(self, name=None, filters=None):
         pools = self.list_floating_ip_pools()
         return _utils._filter_list(pools, name, filters)
@@ -274,6 +281,17 @@ class FloatingIPCloudMixin:
         else:
             floating_network_id = self._get_floating_network_id()
 
+        if self._floating_ip_pool:
+            f_ip = self._floating_ip_pool.acquire(floating_network_id)
+            if f_ip:
+                return [f_ip]
+            available_ips = self._floating_ip_pool.get_unattached(
+                floating_network_id, project_id)
+            if available_ips:
+                return available_ips
+            return [self._neutron_create_floating_ip(
+                network_id=floating_network_id, server=server)]
+
         filters = {
             'port': None,
             'network': floating_network_id,
@@ -381,6 +399,33 @@ class FloatingIPCloudMixin:
         )
         return f_ips[0]
 
+    def fill_floating_ip_pool(self, network=None, wait=True):
+        """Pre-allocate floating IPs for the servers created next.
+
+        Requires the ``floating_ip_pool_size`` cloud setting. The pool of the
+        network is topped up to that size, afterwards it is refilled in the
+        background every time a floating IP is taken from it. The floating
+        IPs left in the pool are deleted when the connection is closed.
+
+        :param network: (optional) Name or ID of the external network.
+            Defaults to the first external network.
+        :param wait: (optional) Wait for the floating IPs to be allocated.
+            Defaults to True.
+
+        :raises: ``OpenStackCloudException``, if the pool is not configured.
+        """
+        if not self._floating_ip_pool or not self._use_neutron_floating():
+            raise exc.OpenStackCloudException(
+                "Floating IP pool requires neutron floating IPs and the"
+                " floating_ip_pool_size setting for cloud {cloud}".format(
+                    cloud=self.name))
+        if network:
+            net = self.network.find_network(network, ignore_missing=False)
+            network_id = net['id']
+        else:
+            network_id = self._get_floating_network_id()
+        self._floating_ip_pool.fill(network_id, wait=wait)
+
     def _get_floating_network_id(self):
         # Get first existing external IPv4 network
         networks = self.get_external_ipv4_floating_networks()
@@ -486,7 +531,17 @@ class FloatingIPCloudMixin:
         if port:
             kwargs['port_id'] = port
 
-        fip = self._submit_create_fip(kwargs)
+        fip = None
+        if self._floating_ip_pool and port:
+            # Attach a pre-allocated IP rather than waiting for a new one
+            fip = self._floating_ip_pool.acquire(network_id)
+            if fip:
+                kwargs.pop('floating_network_id')
+                fip = self.network.update_ip(fip, **kwargs)
+        if not fip:
+            fip = self._submit_create_fip(kwargs)
+        if self._floating_ip_pool:
+            self._floating_ip_pool.update(fip)
         fip_id = fip['id']
 
         if port:
@@ -606,6 +661,9 @@ class FloatingIPCloudMixin:
             )
         except exceptions.ResourceNotFound:
             return False
+        finally:
+            if self._floating_ip_pool:
+                self._floating_ip_pool.discard(floating_ip_id)
         return True
 
     def _nova_delete_floating_ip(self, floating_ip_id):
@@ -736,9 +794,12 @@ class FloatingIPCloudMixin:
         if fixed_address is not None:
             floating_ip_args['fixed_ip_address'] = fixed_address
 
-        return self.network.update_ip(
+        fip = self.network.update_ip(
             floating_ip,
             **floating_ip_args)
+        if self._floating_ip_pool:
+            self._floating_ip_pool.update(fip)
+        return fip
 
     def _nova_attach_ip_to_server(self, server_id, floating_ip_id,
                                   fixed_address=None):
@@ -790,10 +851,12 @@ class FloatingIPCloudMixin:
         if f_ip is None or not bool(f_ip.port_id):
             return False
         try:
-            self.network.update_ip(
+            fip = self.network.update_ip(
                 floating_ip_id,
                 port_id=None
             )
+            if self._floating_ip_pool:
+                self._floating_ip_pool.update(fip)
         except exceptions.SDKException:
             raise exceptions.SDKException(
                 ("Error detaching IP {ip} from "
@@ -0,0 +1,181 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+from openstack import _log
+
+
+class FloatingIPPool:
+    """Pre-allocated floating IPs and an indexed view of floating IPs.
+
+    The pool keeps up to ``size`` unattached floating IPs per external
+    network, which are allocated in the background, so that servers can get
+    a floating IP without waiting for its allocation. Floating IPs handed out
+    by :meth:`acquire` are replenished right away.
+
+    The pool also holds a view of all floating IPs indexed by ID and port ID.
+    The view is built from a single listing, kept up to date with the
+    changes made through the cloud layer and fetched again once it is older
+    than ``index_age`` seconds.
+
+    :param cloud: The connection to allocate floating IPs with.
+    :param int size: Amount of unattached floating IPs to keep per network.
+    :param float index_age: Seconds after which the floating IPs are listed
+        again.
+    """
+
+    def __init__(self, cloud, size, index_age=5):
+        self._cloud = cloud
+        self.size = int(size)
+        self.index_age = index_age
+        self.log = _log.setup_logging('openstack.fip_pool')
+        self._lock = threading.Lock()
+        self._available = collections.defaultdict(collections.deque)
+        self._allocating = collections.Counter()
+        self._futures = collections.defaultdict(set)
+        self._index = None
+        self._index_time = 0
+        self._by_port = collections.defaultdict(set)
+
+    def acquire(self, network_id):
+        """Take a pre-allocated floating IP of the network.
+
+        Never blocks on the cloud. The pool is refilled in the background.
+
+        :param network_id: ID of the external network.
+        :returns: An unattached floating IP or None if the pool of the
+            network is empty.
+        """
+        with self._lock:
+            try:
+                fip = self._available[network_id].popleft()
+            except IndexError:
+                fip = None
+        self.fill(network_id)
+        return fip
+
+    def fill(self, network_id, wait=False):
+        """Allocate the floating IPs missing in the pool of the network.
+
+        :param network_id: ID of the external network.
+        :param bool wait: Whether to wait for all pending allocations of
+            the network to complete.
+        """
+        with self._lock:
+            missing = (
+                self.size
+                - len(self._available[network_id])
+                - self._allocating[network_id])
+            for _ in range(max(missing, 0)):
+                self._allocating[network_id] += 1
+                future = self._cloud._pool_executor.submit(
+                    self._allocate, network_id)
+                self._futures[network_id].add(future)
+                future.add_done_callback(self._futures[network_id].discard)
+            futures = list(self._futures[network_id])
+        if wait:
+            concurrent.futures.wait(futures)
+
+    def _allocate(self, network_id):
+        try:
+            fip = self._cloud._submit_create_fip(
+                {'floating_network_id': network_id})
+        except Exception as e:
+            self.log.warning(
+                'Cannot pre-allocate floating IP on network %s: %s',
+                network_id, e)
+            with self._lock:
+                self._allocating[network_id] -= 1
+            return
+        with self._lock:
+            self._available[network_id].append(fip)
+            self._allocating[network_id] -= 1
+        self.update(fip)
+
+    def release(self):
+        """Delete the pre-allocated floating IPs which were not handed out."""
+        with self._lock:
+            futures = [f for fs in self._futures.values() for f in fs]
+        concurrent.futures.wait(futures)
+        with self._lock:
+            fips = [fip for pool in self._available.values() for fip in pool]
+            self._available.clear()
+            self._futures.clear()
+        for fip in fips:
+            try:
+                self._cloud.network.delete_ip(fip['id'])
+            except Exception as e:
+                self.log.error(
+                    'FIP LEAK: Cannot delete pre-allocated floating IP %s: '
+                    '%s', fip['id'], e)
+            self.discard(fip['id'])
+
+    def _ensure_index(self):
+        if (self._index is not None
+                and time.monotonic() - self._index_time < self.index_age):
+            return
+        fips = self._cloud._list_floating_ips()
+        with self._lock:
+            self._index = {}
+            self._by_port.clear()
+            for fip in fips:
+                self._add(fip)
+            self._index_time = time.monotonic()
+
+    def _add(self, fip):
+        self._index[fip['id']] = fip
+        if fip['port_id']:
+            self._by_port[fip['port_id']].add(fip['id'])
+
+    def _remove(self, fip_id):
+        old = self._index.pop(fip_id, None)
+        if old is not None and old['port_id']:
+            self._by_port[old['port_id']].discard(fip_id)
+
+    def update(self, fip):
+        """Record a floating IP created or changed through the cloud."""
+        with self._lock:
+            if self._index is not None:
+                self._remove(fip['id'])
+                self._add(fip)
+
+    def discard(self, fip_id):
+        """Forget a deleted floating IP."""
+        with self._lock:
+            if self._index is not None:
+                self._remove(fip_id)
+
+    def get_by_port(self, port_id):
+        """Get the floating IPs attached to the port."""
+        self._ensure_index()
+        with self._lock:
+            return [self._index[i] for i in self._by_port.get(port_id, ())]
+
+    def get_unattached(self, network_id, project_id=None):
+        """Get the unattached floating IPs of the network from the view.
+
+        The pre-allocated floating IPs are not included.
+        """
+        self._ensure_index()
+        with self._lock:
+            pooled = set(
+                fip['id'] for fip in self._available.get(network_id, ()))
+            return [
+                fip for fip in self._index.values()
+                if not fip['port_id']
+                and fip['floating_network_id'] == network_id
+                and (project_id is None or fip['project_id'] == project_id)
+                and fip['id'] not in pooled]
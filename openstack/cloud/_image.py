@@ -118,7 +118,8 @@ class ImageCloudMixin:
         name_or_id,
         output_path=None,
         output_file=None,
-        chunk_size=1024,
+        chunk_size=None,
+        parallel=1,
     ):
         """Download an image by name or ID
 
@@ -129,7 +130,10 @@ class ImageCloudMixin:
             image data to. Only write() will be called on this object. Either
             this or output_path must be specified
         :param int chunk_size: size in bytes to read from the wire and buffer
-            at one time. Defaults to 1024
+            at one time. Defaults to 1 MiB
+        :param int parallel: Amount of parallel Range requests downloading
+            parts of the image to output_path. Every request buffers a part
+            of 16 MiB.
         :returns: When output_path and output_file are not given - the bytes
             comprising the given Image when stream is False, otherwise a
             :class:`requests.Response` instance. When output_path or
@@ -156,7 +160,7 @@ class ImageCloudMixin:
 
         return self.image.download_image(
             image, output=output_file or output_path,
-            chunk_size=chunk_size)
+            chunk_size=chunk_size, parallel=parallel)
 
     def get_image_exclude(self, name_or_id, exclude):
         for image in self.search_images(name_or_id):
@@ -26,6 +26,7 @@ import netifaces
 import sre_constants
 
 from openstack import _log
+from openstack import _resolution_cache
 from openstack.cloud import exc
 
 
@@ -184,6 +185,23 @@ def _get_entity(cloud, resource, name_or_id, filters, **kwargs):
         if get_resource:
             return get_resource(name_or_id)
 
+    cache = None
+    if not callable(resource):
+        cache = getattr(cloud, '_resolution_cache', None)
+    if cache is not None and cache.enabled:
+        cache_key = _resolution_cache.make_key(name_or_id, filters, **kwargs)
+        cached = cache.get(resource, cache_key)
+        if cached is _resolution_cache.MISSING:
+            return None
+        elif cached is not None:
+            entity = _get_entity_by_cached_id(
+                cloud, resource, name_or_id, cached)
+            if entity is not None:
+                return entity
+            cache.discard(resource, cache_key)
+    else:
+        cache = None
+
     search = resource if callable(resource) else getattr(
         cloud, 'search_%ss' % resource, None)
     if search:
@@ -192,7 +210,29 @@ def _get_entity(cloud, resource, name_or_id, filters, **kwargs):
             if len(entities) > 1:
                 raise exc.OpenStackCloudException(
                     "Multiple matches found for %s" % name_or_id)
+            if (cache is not None and entities[0].get('id')
+                    and hasattr(cloud, 'get_%s_by_id' % resource)):
+                cache.set(resource, cache_key, entities[0]['id'])
             return entities[0]
+        if cache is not None:
+            cache.set_missing(resource, cache_key)
+    return None
+
+
+def _get_entity_by_cached_id(cloud, resource, name_or_id, id):
+    """Fetch the entity a name was previously resolved to.
+
+    Returns None if the entity is gone or does not carry the name anymore.
+    """
+    get_resource = getattr(cloud, 'get_%s_by_id' % resource, None)
+    if not get_resource:
+        return None
+    try:
+        entity = get_resource(id)
+    except exc.OpenStackCloudURINotFound:
+        return None
+    if entity and name_or_id in (entity.get('id'), entity.get('name')):
+        return entity
     return None
 
 
@@ -413,8 +413,13 @@ def _get_supplemental_addresses(cloud, server):
                     filters=dict(device_id=server['id'])):
                 # This SHOULD return one and only one FIP - but doing it as a
                 # search/list lets the logic work regardless
-                for fip in cloud.search_floating_ips(
-                        filters=dict(port_id=port['id'])):
+                fip_pool = getattr(cloud, '_floating_ip_pool', None)
+                if fip_pool and cloud._use_neutron_floating():
+                    fips = fip_pool.get_by_port(port['id'])
+                else:
+                    fips = cloud.search_floating_ips(
+                        filters=dict(port_id=port['id']))
+                for fip in fips:
                     fixed_net = fixed_ip_mapping.get(fip['fixed_ip_address'])
                     if fixed_net is None:
                         log = _log.setup_logging('openstack')
@@ -25,7 +25,9 @@ import munch
 import requests.models
 import requestsexceptions
 
+from openstack import _cleanup
 from openstack import _log
+from openstack import _resolution_cache
 from openstack.cloud import _floating_ip
 from openstack.cloud import _object_store
 from openstack.cloud import _utils
@@ -152,6 +154,14 @@ class _OpenStackCloudMixin:
         self._FLOAT_AGE = 0
 
         self._api_cache_keys = set()
+        # Name to ID resolutions of the find calls, disabled unless a
+        # ``resolution`` expiration is configured.
+        resolution_ttl = self.config.get_cache_resource_expiration(
+            'resolution', 0)
+        self._resolution_cache = _resolution_cache.ResolutionCache(
+            ttl=resolution_ttl,
+            negative_ttl=self.config.get_cache_resource_expiration(
+                'resolution.missing', resolution_ttl))
         self._container_cache = dict()
         self._file_hash_cache = dict()
 
@@ -159,8 +169,21 @@ class _OpenStackCloudMixin:
 
         self._raw_clients = {}
 
-        self._local_ipv6 = (
-            _utils.localhost_supports_ipv6() if not self.force_ipv4 else False)
+        # Probing the routing table is deferred until addresses of a server
+        # are actually evaluated.
+        self.__local_ipv6 = None
+
+    @property
+    def _local_ipv6(self):
+        if self.__local_ipv6 is None:
+            self.__local_ipv6 = (
+                _utils.localhost_supports_ipv6()
+                if not self.force_ipv4 else False)
+        return self.__local_ipv6
+
+    @_local_ipv6.setter
+    def _local_ipv6(self, value):
+        self.__local_ipv6 = value
 
     def connect_as(self, **kwargs):
         """Make a new OpenStackCloud object with new auth context.
@@ -830,23 +853,39 @@ class _OpenStackCloudMixin:
         wait_timeout=120,
         status_queue=None,
         filters=None,
-        resource_evaluation_fn=None
+        resource_evaluation_fn=None,
+        concurrency=None,
     ):
         """Cleanup the project resources.
 
         Cleanup all resources in all services, which provide cleanup methods.
 
+        The cleanup is done in two phases. First all services identify the
+        resources to be deleted (services are processed in parallel where
+        there are no dependencies between them). In a real run the identified
+        resources are registered together with their dependencies (i.e. a
+        subnet depends on the ports allocated on it) and afterwards deleted
+        concurrently as soon as all the resources they depend on are gone.
+
         :param bool dry_run: Cleanup or only list identified resources.
         :param int wait_timeout: Maximum amount of time given to each service
-            to comlete the cleanup.
+            to comlete the identification and to every single resource to be
+            deleted.
         :param queue status_queue: a threading queue object used to get current
-            process status. The queue contain processed resources.
+            process status. The queue contain processed resources. During the
+            real run it additionally receives
+            :class:`~openstack._cleanup.CleanupProgress` records every time
+            the amount of deleted resources changes.
         :param dict filters: Additional filters for the cleanup (only resources
             matching all filters will be deleted, if there are no other
             dependencies).
         :param resource_evaluation_fn: A callback function, which will be
             invoked for each resurce and must return True/False depending on
             whether resource need to be deleted or not.
+        :param concurrency: Maximum amount of concurrent deletions per
+            service. The parameter can either be a single int, or it can be a
+            dict with keys as service-type and values as ints. Defaults to
+            None, which means 5 concurrent deletions per service.
         """
         dependencies = {}
         get_dep_fn_name = '_get_cleanup_dependencies'
@@ -873,13 +912,25 @@ class _OpenStackCloudMixin:
                 # implement the service or disable it
                 pass
         dep_graph = utils.TinyDAG()
+        cleanup_graph = _cleanup.ResourceCleanupGraph()
+
+        def _order_services(before, after):
+            dep_graph.add_edge(before, after)
+            # Services listing others in 'per_resource' register explicit
+            # dependencies on the individual resources of those services, so
+            # they do not need to wait for the whole service to be cleaned.
+            per_resource = dependencies.get(after, {}).get('per_resource', [])
+            if before not in per_resource:
+                cleanup_graph.add_service_dependency(before, after)
+
         for k, v in dependencies.items():
             dep_graph.add_node(k)
             for dep in v['before']:
                 dep_graph.add_node(dep)
-                dep_graph.add_edge(k, dep)
+                _order_services(k, dep)
             for dep in v.get('after', []):
-                dep_graph.add_edge(dep, k)
+                dep_graph.add_node(dep)
+                _order_services(dep, k)
 
         cleanup_resources = dict()
 
@@ -896,7 +947,8 @@ class _OpenStackCloudMixin:
                             client_status_queue=status_queue,
                             identified_resources=cleanup_resources,
                             filters=filters,
-                            resource_evaluation_fn=resource_evaluation_fn
+                            resource_evaluation_fn=resource_evaluation_fn,
+                            cleanup_graph=None if dry_run else cleanup_graph,
                         )
             except exceptions.ServiceDisabledException:
                 # same reason as above
@@ -913,7 +965,14 @@ class _OpenStackCloudMixin:
                 message="Timeout waiting for cleanup to finish",
                 wait=1):
             if dep_graph.is_complete():
-                return
+                break
+
+        if not dry_run:
+            cleanup_graph.run(
+                self._pool_executor,
+                concurrency=concurrency,
+                status_queue=status_queue,
+                timeout=wait_timeout)
 
 
 def cleanup_task(graph, service, fn):
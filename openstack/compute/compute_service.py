@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.compute.v2 import _proxy
 from openstack import service_description
 
 
@@ -18,5 +17,5 @@ class ComputeService(service_description.ServiceDescription):
     """The compute service."""
 
     supported_versions = {
-        '2': _proxy.Proxy
+        '2': 'openstack.compute.v2._proxy.Proxy'
     }
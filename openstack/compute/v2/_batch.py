@@ -0,0 +1,242 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Actions on many servers at once.
+
+The actions run in the executor of the connection. They are started in
+turns across the hosts of the servers, so that a busy host does not hold
+back the others. The servers the actions were started on are polled
+together with one listing of the servers changed since the batch started.
+"""
+
+import collections
+import concurrent.futures
+import datetime
+import time
+
+from openstack import _batch
+from openstack.compute.v2 import server as _server
+from openstack import exceptions
+
+# Proxy method and status reached for every action. None means the status
+# of the server before the action.
+ACTIONS = {
+    'start': ('start_server', 'ACTIVE'),
+    'stop': ('stop_server', 'SHUTOFF'),
+    'reboot': ('reboot_server', 'ACTIVE'),
+    'resize': ('resize_server', 'VERIFY_RESIZE'),
+    'migrate': ('migrate_server', 'VERIFY_RESIZE'),
+    'live_migrate': ('live_migrate_server', None),
+    'evacuate': ('evacuate_server', None),
+}
+# Default arguments of the actions
+_ACTION_ARGS = {
+    'reboot': {'reboot_type': 'SOFT'},
+}
+# Tolerated clock skew between the client and the compute service when
+# polling servers with ``changes-since``
+_CHANGES_SINCE_SKEW = 600
+
+
+class BatchActionResult(collections.namedtuple('BatchActionResult',
+                                               ['success', 'failure'])):
+    """A named tuple representing a result of an action on several servers.
+
+    :ivar ~.success: a list of :class:`~openstack.compute.v2.server.Server`
+        objects the action succeeded for.
+    :ivar ~.failure: a list of ``(server, exception)`` tuples for every
+        server the action failed for, did not finish for in time or which
+        could not be found.
+    """
+    __slots__ = ()
+
+
+class BatchAction(_batch.BatchRunner):
+    """Run an action on several servers.
+
+    :param proxy: The compute :class:`~openstack.compute.v2._proxy.Proxy`.
+    :param str action: One of :data:`ACTIONS`.
+    :param servers: List of IDs or
+        :class:`~openstack.compute.v2.server.Server` instances.
+    :param int concurrency: Amount of actions being started at once.
+    :param int host_concurrency: Amount of actions being started at once on
+        the servers of a single host, None for no limit.
+    :param bool wait: Wait for the servers to reach the status of the
+        action.
+    :param bool all_projects: Poll the servers of all projects. None to
+        poll them only when some of the servers belong to another project
+        than the current one.
+    :param dict action_args: Arguments of the proxy method of the action.
+    """
+
+    def __init__(
+        self, proxy, action, servers, concurrency, host_concurrency=None,
+        wait=True, all_projects=None, action_args=None,
+    ):
+        super().__init__(proxy)
+        self.method, self.status = ACTIONS[action]
+        self.servers = servers
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.wait = wait
+        self.all_projects = all_projects
+        self.action_args = dict(_ACTION_ARGS.get(action, {}))
+        self.action_args.update(action_args or {})
+        # Servers to act on by host, hosts in the order of their next turn
+        self._queues = collections.OrderedDict()
+        self._running = collections.Counter()
+        # Status to reach and status before the action by ID of the servers
+        # waited for
+        self._waiting = {}
+        # IDs of the servers waited for seen changing
+        self._changed = set()
+        self._success = {}
+        self._failure = {}
+
+    @staticmethod
+    def _get_host(server):
+        return server.compute_host or server.host_id or ''
+
+    def _load(self):
+        """Fetch the servers not given with their status and host."""
+        executor = self.proxy._connection._pool_executor
+        servers = [
+            self.proxy._get_resource(_server.Server, server)
+            for server in self.servers]
+        futures = {
+            executor.submit(self.proxy.get_server, server): index
+            for index, server in enumerate(servers)
+            if server.status is None}
+        for future in concurrent.futures.as_completed(futures):
+            index = futures[future]
+            try:
+                servers[index] = future.result()
+            except exceptions.SDKException as e:
+                self._failure[servers[index].id] = (servers[index], e)
+        for server in servers:
+            if server.id in self._failure:
+                continue
+            self._queues.setdefault(
+                self._get_host(server), collections.deque()).append(server)
+        return servers
+
+    def _act(self, server):
+        getattr(self.proxy, self.method)(server, **self.action_args)
+
+    def _submit(self):
+        """Start the actions in turns across hosts, within the concurrency."""
+        started = True
+        while started and len(self._futures) < self.concurrency:
+            started = False
+            for host in list(self._queues):
+                if len(self._futures) >= self.concurrency:
+                    break
+                if (
+                    self.host_concurrency
+                    and self._running[host] >= self.host_concurrency
+                ):
+                    continue
+                queue = self._queues.pop(host)
+                server = queue.popleft()
+                if queue:
+                    # The host gets its next turn after the others
+                    self._queues[host] = queue
+                self._running[host] += 1
+                self._start((server, host), self._act, server)
+                started = True
+
+    def _call_done(self, item):
+        server, host = item
+        self._running[host] -= 1
+        if self.wait:
+            self._waiting[server.id] = (
+                self.status or server.status, server.status)
+        else:
+            self._success[server.id] = server
+
+    def _call_failed(self, item, error):
+        server, host = item
+        self._running[host] -= 1
+        self.proxy.log.debug(
+            "Action %(method)s failed for server %(server)s",
+            {'method': self.method, 'server': server.id}, exc_info=True)
+        self._failure[server.id] = (server, error)
+
+    def _fail(self, server, message):
+        del self._waiting[server.id]
+        self._failure[server.id] = (
+            server, exceptions.ResourceFailure(message.format(
+                id=server.id, status=server.status)))
+
+    def _poll(self):
+        """Check the status of all servers waited for."""
+        for server in self.proxy.servers(
+            changes_since=self._since, all_projects=self.all_projects,
+        ):
+            if server.id not in self._waiting:
+                continue
+            status, previous = self._waiting[server.id]
+            if server.status in ('ERROR', 'DELETED'):
+                self._fail(server, "Server {id} went to {status}")
+            elif server.task_state or server.status != previous:
+                if server.status == status and not server.task_state:
+                    del self._waiting[server.id]
+                    self._success[server.id] = server
+                else:
+                    self._changed.add(server.id)
+            elif status != previous and (
+                server.fault or server.id in self._changed
+            ):
+                # The action ended without reaching its status, e.g. a
+                # resize for which no host was found.
+                self._fail(server, "Server {id} went back to {status}")
+            elif server.status == status:
+                del self._waiting[server.id]
+                self._success[server.id] = server
+
+    def _is_waiting(self):
+        return bool(self._waiting)
+
+    def _is_finished(self):
+        return not (self._queues or self._futures or self._waiting)
+
+    def _time_out(self):
+        for server in self._servers:
+            if server.id not in self._success and (
+                server.id not in self._failure
+            ):
+                self._failure[server.id] = (
+                    server, exceptions.ResourceTimeout(
+                        "Timeout waiting for the action on server "
+                        "{id}".format(id=server.id)))
+
+    def run(self, interval=2, timeout=None):
+        """Run the action on all servers.
+
+        Servers the action did not finish for after ``timeout`` seconds fail
+        with a :class:`~openstack.exceptions.ResourceTimeout`, the actions
+        already being started are finished first.
+
+        :returns: A :class:`BatchActionResult`, in the order of the servers.
+        """
+        self._since = datetime.datetime.utcfromtimestamp(
+            time.time() - _CHANGES_SINCE_SKEW).isoformat()
+        servers = self._servers = self._load()
+        if self.all_projects is None:
+            project_id = self.proxy.get_project_id()
+            self.all_projects = any(
+                server.project_id and server.project_id != project_id
+                for server in servers)
+        super().run(interval=interval, timeout=timeout)
+        return BatchActionResult(
+            [self._success[s.id] for s in servers if s.id in self._success],
+            [self._failure[s.id] for s in servers if s.id in self._failure])
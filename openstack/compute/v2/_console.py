@@ -0,0 +1,157 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Following the console output of servers.
+
+The compute API only returns the last lines of a console log, not the
+output after an offset. Every poll asks for about as many lines as the
+log grew by last time, plus the last lines already seen, which are then
+found in the output to tell the new lines from the old ones. When they
+are not found the log grew more, and twice as many lines are asked for.
+"""
+
+import heapq
+import time
+
+from openstack.compute.v2 import server as _server
+from openstack import exceptions
+
+# Amount of the last lines seen looked for in the next output
+_ANCHOR_LINES = 5
+# Lines asked for at least when polling
+_MIN_LENGTH = 20
+# Lines asked for at most before asking for the whole log
+_MAX_LENGTH = 10000
+# Factor the interval grows by while there is no new output
+_BACKOFF = 1.5
+
+
+def _find(lines, anchor):
+    """Return the index after the last occurrence of anchor in lines."""
+    for end in range(len(lines), len(anchor) - 1, -1):
+        if lines[end - len(anchor):end] == anchor:
+            return end
+    return None
+
+
+class ConsoleTail:
+    """Follow the console output of a server.
+
+    :param proxy: The compute :class:`~openstack.compute.v2._proxy.Proxy`.
+    :param server: The :class:`~openstack.compute.v2.server.Server`.
+    :param int lines: Amount of the last lines of the log to start with,
+        None for the whole log.
+    :param interval: Seconds between polls while there is new output.
+    :param max_interval: Seconds between polls at most, the interval grows
+        up to it while there is no new output.
+    """
+
+    def __init__(self, proxy, server, lines=None, interval=2,
+                 max_interval=30):
+        self.proxy = proxy
+        self.server = server
+        self.lines = lines
+        self.min_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.interval = interval
+        self.next_poll = 0
+        # The last complete lines seen, None before the first poll
+        self._anchor = None
+        self._growth = 0
+
+    def _fetch(self, length):
+        """Return the complete lines and the amount of lines returned.
+
+        The compute service returns the last ``length`` parts of the log
+        split on newlines, the last one being empty when the log ends with
+        a newline. They are counted the same way.
+        """
+        output = self.proxy.get_server_console_output(
+            self.server, length=length)
+        parts = (output.get('output') or '').split('\n')
+        # The last line may still be written to, it is returned once
+        # complete.
+        return parts[:-1], len(parts)
+
+    def poll(self):
+        """Fetch the lines added to the log since the last poll.
+
+        :returns: A list of the new lines.
+        """
+        if self._anchor is None:
+            # One more part for the line after the last complete one
+            new, _ = self._fetch(
+                None if self.lines is None else self.lines + 1)
+        else:
+            length = None
+            if self._anchor:
+                length = max(self._growth * 2, _MIN_LENGTH) + _ANCHOR_LINES
+            while True:
+                lines, count = self._fetch(length)
+                end = _find(lines, self._anchor)
+                if end is not None:
+                    new = lines[end:]
+                    break
+                if length is None or count < length:
+                    # The whole log is there without the lines seen, the
+                    # log was cleared or rotated
+                    new = lines
+                    break
+                length *= 2
+                if length > _MAX_LENGTH:
+                    length = None
+
+        self._anchor = ((self._anchor or []) + new)[-_ANCHOR_LINES:]
+        self._growth = len(new)
+        if new:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * _BACKOFF, self.max_interval)
+        self.next_poll = time.monotonic() + self.interval
+        return new
+
+
+def follow_servers(proxy, servers, follow=True, lines=None, interval=2,
+                   max_interval=30, timeout=None):
+    """Yield the lines of the console output of servers.
+
+    Every server is polled on its own interval, the one due first next.
+    Servers which are deleted stop being followed.
+
+    :returns: A generator of ``(server, line)`` tuples.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    tails = [
+        ConsoleTail(proxy, proxy._get_resource(_server.Server, server),
+                    lines=lines, interval=interval, max_interval=max_interval)
+        for server in servers]
+    # Ordered by the time of their next poll, then their index
+    queue = [(0, index) for index in range(len(tails))]
+    while queue:
+        next_poll, index = heapq.heappop(queue)
+        tail = tails[index]
+        wait = next_poll - time.monotonic()
+        if deadline is not None and next_poll > deadline:
+            return
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            new = tail.poll()
+        except exceptions.ResourceNotFound:
+            proxy.log.debug(
+                "Server %s is gone, stop following its console",
+                tail.server.id)
+            continue
+        for line in new:
+            yield tail.server, line
+        if follow:
+            heapq.heappush(queue, (tail.next_poll, index))
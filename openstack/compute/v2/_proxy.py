@@ -10,9 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
+import functools
 import warnings
 
 from openstack.block_storage.v3 import volume as _volume
+from openstack.compute.v2 import _batch
+from openstack.compute.v2 import _console
 from openstack.compute.v2 import aggregate as _aggregate
 from openstack.compute.v2 import availability_zone
 from openstack.compute.v2 import extension
@@ -42,6 +46,25 @@ from openstack import resource
 from openstack import utils
 
 
+# Totals of a usage, summed up over its pages
+_USAGE_TOTALS = (
+    'total_hours', 'total_local_gb_usage', 'total_memory_mb_usage',
+    'total_vcpus_usage',
+)
+
+
+def _add_usage_totals(totals, page, project_id=None):
+    """Add the totals of a page of a usage to the usage of its project."""
+    project_id = page.project_id or project_id
+    usage = totals.get(project_id)
+    if usage is None:
+        usage = totals[project_id] = _usage.Usage(
+            project_id=project_id, start=page.start, stop=page.stop,
+            **{key: 0 for key in _USAGE_TOTALS})
+    for key in _USAGE_TOTALS:
+        setattr(usage, key, getattr(usage, key) + (getattr(page, key) or 0))
+
+
 class Proxy(proxy.Proxy):
     _resource_registry = {
         "aggregate": _aggregate.Aggregate,
@@ -2029,6 +2052,90 @@ class Proxy(proxy.Proxy):
         res = self._get_resource(_usage.Usage, project.id)
         return res.fetch(self, **query)
 
+    def server_usages(self, project, start=None, end=None, limit=1000):
+        """Get the usage of the servers of a project, a page at a time.
+
+        Only a page of the usage is held at once, unlike :meth:`get_usage`.
+
+        :param project: ID or instance of
+            :class:`~openstack.identity.project.Project` of the project for
+            which the usage should be retrieved.
+        :param datetime.datetime start: Usage range start date.
+        :param datetime.datetime end: Usage range end date.
+        :param int limit: Amount of servers per page.
+        :returns: A generator of compute ``ServerUsage`` objects.
+        """
+        project = self._get_resource(_project.Project, project)
+        query = self._get_usage_query(start, end)
+        res = self._get_resource(_usage.Usage, project.id)
+        for page in res.iter_pages(self, limit=limit, **query):
+            for server_usage in page.server_usages or ():
+                yield server_usage
+
+    def usage_totals(self, projects=None, start=None, end=None,
+                     limit=1000, concurrency=10):
+        """Get the total usage of projects.
+
+        The totals are summed up a page of servers at a time, so only the
+        totals are held for every project.
+
+        :param projects: List of IDs or instances of
+            :class:`~openstack.identity.project.Project` of the projects for
+            which the usage should be retrieved. Their pages are fetched in
+            parallel. The value of ``None`` (the default) means all projects
+            with a usage, listed together.
+        :param datetime.datetime start: Usage range start date.
+        :param datetime.datetime end: Usage range end date.
+        :param int limit: Amount of servers per page.
+        :param int concurrency: Amount of projects fetched at once.
+        :returns: A dict of compute ``Usage`` objects without their
+            ``server_usages`` by project ID.
+        :raises: ValueError if ``concurrency`` is invalid.
+        """
+        if concurrency < 1:
+            raise ValueError('Concurrency must be at least 1')
+        query = self._get_usage_query(start, end)
+        if projects is None:
+            totals = {}
+            pages = self._list(
+                _usage.Usage, detailed=False, limit=limit, **query)
+            for page in pages:
+                _add_usage_totals(totals, page)
+            return totals
+
+        def _project_totals(project):
+            totals = {}
+            res = self._get_resource(_usage.Usage, project)
+            for page in res.iter_pages(self, limit=limit, **dict(query)):
+                _add_usage_totals(totals, page, project_id=project)
+            return totals
+
+        project_ids = [
+            self._get_resource(_project.Project, project).id
+            for project in projects]
+        executor = self._connection._pool_executor
+        totals = {}
+        futures = set()
+        for project_id in project_ids:
+            if len(futures) >= concurrency:
+                done, futures = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    totals.update(future.result())
+            futures.add(executor.submit(_project_totals, project_id))
+        for future in concurrent.futures.as_completed(futures):
+            totals.update(future.result())
+        return totals
+
+    @staticmethod
+    def _get_usage_query(start, end):
+        query = {}
+        if start is not None:
+            query['start'] = start.isoformat()
+        if end is not None:
+            query['end'] = end.isoformat()
+        return query
+
     # ========== Server consoles ==========
 
     def create_server_remote_console(self, server, **attrs):
@@ -2067,6 +2174,60 @@ class Proxy(proxy.Proxy):
         server = self._get_resource(_server.Server, server)
         return server.get_console_output(self, length=length)
 
+    def tail_console_output(self, server, follow=True, lines=None,
+                            interval=2, max_interval=30, timeout=None):
+        """Return the lines of the console output of a server as they come.
+
+        Only the lines added since the last poll are fetched, about as many
+        as were added the time before. The server is polled every
+        ``interval`` seconds while it writes to its console, and less often,
+        up to every ``max_interval`` seconds, while it does not.
+
+        :param server: Either the ID of a server or a
+            :class:`~openstack.compute.v2.server.Server` instance.
+        :param bool follow: Keep polling for new lines. When False only the
+            current lines are returned.
+        :param int lines: Amount of the last lines of the log to start with.
+            The whole log by default.
+        :param interval: Seconds between polls while there is new output.
+        :param max_interval: Seconds between polls at most.
+        :param timeout: Seconds to follow the output for. The value of
+            ``None`` (the default) means until the server is deleted.
+        :returns: A generator of the lines, without their line break. The
+            last line is only returned once complete.
+        """
+        for _, line in _console.follow_servers(
+            self, [server], follow=follow, lines=lines, interval=interval,
+            max_interval=max_interval, timeout=timeout,
+        ):
+            yield line
+
+    def tail_console_outputs(self, servers, follow=True, lines=None,
+                             interval=2, max_interval=30, timeout=None):
+        """Return the lines of the console output of many servers.
+
+        The servers are followed as with :meth:`tail_console_output`, each
+        on its own interval, from the thread consuming the generator.
+        Servers which are deleted stop being followed.
+
+        :param servers: List of IDs of servers or
+            :class:`~openstack.compute.v2.server.Server` instances.
+        :param bool follow: Keep polling for new lines. When False only the
+            current lines are returned.
+        :param int lines: Amount of the last lines of the logs to start
+            with. The whole logs by default.
+        :param interval: Seconds between polls of a server while there is
+            new output.
+        :param max_interval: Seconds between polls of a server at most.
+        :param timeout: Seconds to follow the output for. The value of
+            ``None`` (the default) means until all servers are deleted.
+        :returns: A generator of ``(server, line)`` tuples, the server being
+            a :class:`~openstack.compute.v2.server.Server` instance.
+        """
+        return _console.follow_servers(
+            self, servers, follow=follow, lines=lines, interval=interval,
+            max_interval=max_interval, timeout=timeout)
+
     def create_console(self, server, console_type, console_protocol=None):
         """Create a remote console on the server.
 
@@ -2218,6 +2379,68 @@ class Proxy(proxy.Proxy):
 
     # ========== Utilities ==========
 
+    def batch_action(
+        self, servers, action, concurrency=10, host_concurrency=None,
+        wait=True, all_projects=None, interval=2, timeout=600,
+        **action_args
+    ):
+        """Run an action on many servers at once.
+
+        The actions are started in parallel, in turns across the hosts of
+        the servers so that every host gets its share of the concurrency.
+        The servers are then polled together, with one listing of the
+        servers changed since the batch started per ``interval``. A failure
+        of the action on a server does not stop the batch. A server fails
+        when it goes to ``ERROR`` or ``DELETED``, or when it is back to its
+        status before the action while the action should have changed it,
+        like a resize for which no host was found.
+
+        :param servers: List of IDs of servers or
+            :class:`~openstack.compute.v2.server.Server` instances. The
+            servers given by ID, or without their status, are fetched first.
+        :param str action: The action, one of ``start``, ``stop``,
+            ``reboot``, ``resize``, ``migrate``, ``live_migrate`` and
+            ``evacuate``. The servers are waited for to become ``ACTIVE``,
+            ``SHUTOFF``, ``ACTIVE``, ``VERIFY_RESIZE``, ``VERIFY_RESIZE`` or
+            to return to their status before the action.
+        :param int concurrency: Amount of actions being started at once.
+        :param int host_concurrency: Amount of actions being started at once
+            on the servers of a single host. The value of ``None`` (the
+            default) means no limit.
+        :param bool wait: Wait for the servers to reach the status of the
+            action. Defaults to True.
+        :param bool all_projects: Whether the servers belong to other
+            projects, so that they are polled across all projects. The value
+            of ``None`` (the default) means they are when some of them
+            belong to another project than the current one.
+        :param interval: Seconds between the polls of the servers.
+        :param timeout: Seconds to run the batch in. Servers the action did
+            not finish for then fail with
+            :class:`~openstack.exceptions.ResourceTimeout`. Defaults to 600,
+            ``None`` means no client-side timeout.
+        :param action_args: Arguments of the method of the proxy running
+            the action, for example ``reboot_type`` (``SOFT`` by default) of
+            :meth:`reboot_server` or ``flavor`` of :meth:`resize_server`.
+
+        :returns: A :class:`~openstack.compute.v2._batch.BatchActionResult`
+            with the servers the action succeeded for and a
+            ``(server, exception)`` tuple for every failure, in the order of
+            ``servers``.
+        :raises: ValueError if ``action`` or ``concurrency`` is invalid.
+        """
+        if action not in _batch.ACTIONS:
+            raise ValueError(
+                'Action must be one of %s, got %s'
+                % (', '.join(_batch.ACTIONS), action))
+        if concurrency < 1:
+            raise ValueError('Concurrency must be at least 1')
+
+        batch = _batch.BatchAction(
+            self, action, servers, concurrency,
+            host_concurrency=host_concurrency, wait=wait,
+            all_projects=all_projects, action_args=action_args)
+        return batch.run(interval=interval, timeout=timeout)
+
     def wait_for_server(
         self, server, status='ACTIVE', failures=None, interval=2, wait=120,
     ):
@@ -2273,7 +2496,8 @@ class Proxy(proxy.Proxy):
 
     def _service_cleanup(self, dry_run=True, client_status_queue=None,
                          identified_resources=None,
-                         filters=None, resource_evaluation_fn=None):
+                         filters=None, resource_evaluation_fn=None,
+                         cleanup_graph=None):
         servers = []
         for obj in self.servers():
             need_delete = self._service_cleanup_del_res(
@@ -2283,7 +2507,9 @@ class Proxy(proxy.Proxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph,
+                wait_list_fn=functools.partial(self.servers, details=False))
             if not dry_run and need_delete:
                 # In the dry run we identified, that server will go. To propely
                 # identify consequences we need to tell others, that the port
@@ -2292,6 +2518,9 @@ class Proxy(proxy.Proxy):
                     identified_resources[port.id] = port
                 servers.append(obj)
 
+        if cleanup_graph is not None:
+            # Servers are awaited by the cleanup graph
+            return
         # We actually need to wait for servers to really disappear, since they
         # might be still holding ports on the subnet
         for server in servers:
@@ -190,6 +190,9 @@ class Server(resource.Resource, metadata.MetadataMixin, tag.TagMixin):
     #: that will all have the same reservation_id. By default, it appears
     #: in the response for administrative users only.
     reservation_id = resource.Body('OS-EXT-SRV-ATTR:reservation_id')
+    #: Whether only the reservation id should be returned when creating
+    #: servers (useful together with ``min_count`` and ``max_count``).
+    return_reservation_id = resource.Body('return_reservation_id', type=bool)
     #: The root device name for the instance By default, it appears in the
     #: response for administrative users only.
     root_device_name = resource.Body('OS-EXT-SRV-ATTR:root_device_name')
@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import urllib.parse
+
+from openstack import exceptions
 from openstack import resource
 
 
@@ -100,3 +103,45 @@ class Usage(resource.Resource):
     stop = resource.Body('stop')
 
     _max_microversion = '2.75'
+
+    def iter_pages(self, session, limit=None, **params):
+        """Fetch the usage of the project a page of servers at a time.
+
+        The pages are fetched as they are consumed, following the links to
+        the next page returned by the server (microversion 2.40 and newer).
+
+        :param session: The session to use for making this request.
+        :type session: :class:`~keystoneauth1.adapter.Adapter`
+        :param int limit: Amount of servers per page.
+        :param dict params: Additional query parameters, like ``start`` and
+            ``end``.
+        :returns: A generator of :class:`Usage`, one per page, with the
+            usage of the servers of the page. The totals are the ones of
+            these servers only.
+        """
+        session = self._get_session(session)
+        microversion = self._get_microversion(session, action='fetch')
+        request = self._prepare_request()
+        if limit is not None:
+            params['limit'] = limit
+        while True:
+            response = session.get(
+                request.url, microversion=microversion, params=params)
+            exceptions.raise_from_response(response)
+            data = response.json()
+            yield Usage.existing(
+                microversion=microversion,
+                connection=session._get_connection(),
+                **data[self.resource_key])
+
+            next_link = None
+            for link in data.get('tenant_usage_links') or ():
+                if link.get('rel') == 'next' and 'href' in link:
+                    next_link = link['href']
+            if not next_link:
+                return
+            query = urllib.parse.parse_qs(
+                urllib.parse.urlparse(next_link).query)
+            if 'marker' not in query:
+                return
+            params['marker'] = query['marker'][0]
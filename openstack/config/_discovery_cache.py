@@ -0,0 +1,154 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Version discovery cache persisted on disk.
+
+keystoneauth keeps the version discovery documents it fetched in a dict
+keyed by the discovery URL. :class:`DiscoveryCache` is a drop-in replacement
+of that dict which additionally stores the documents in a JSON file, so that
+new processes talking to the same clouds can skip the discovery requests.
+"""
+
+import collections.abc
+import json
+import os
+import tempfile
+import threading
+import time
+
+from keystoneauth1 import discover
+
+from openstack import _log
+
+FILE_NAME = 'discovery.json'
+_FORMAT_VERSION = 1
+
+
+class _CachedDiscover(discover.Discover):
+    """Discovery results restored from the cache without any request."""
+
+    def __init__(self, url, data):
+        # NOTE: Discover.__init__ fetches the document, only set the
+        # attributes it would set.
+        self._url = url
+        self._data = data
+
+
+class DiscoveryCache(collections.abc.MutableMapping):
+    """Discovery cache stored in a file.
+
+    :param str path: Path of the JSON file holding the cache.
+    :param float ttl: Seconds the persisted documents are considered valid.
+        ``-1`` means they never expire.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = float(ttl)
+        self.log = _log.setup_logging('openstack.config')
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._persisted = None
+
+    def _is_fresh(self, entry, now):
+        return self.ttl < 0 or now - entry['timestamp'] < self.ttl
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.log.debug(
+                'Ignoring unreadable discovery cache %s: %s', self.path, e)
+            return {}
+        if (not isinstance(content, dict)
+                or content.get('version') != _FORMAT_VERSION):
+            return {}
+        now = time.time()
+        return {
+            url: entry for url, entry in content.get('entries', {}).items()
+            if self._is_fresh(entry, now)
+        }
+
+    def _load(self):
+        if self._persisted is None:
+            self._persisted = self._read()
+        return self._persisted
+
+    def _write(self, update=None, remove=None):
+        # Merge with the current content of the file, other processes may
+        # have added entries in the meantime.
+        entries = self._read()
+        entries.update(update or {})
+        for url in remove or ():
+            entries.pop(url, None)
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix='.discovery.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(
+                        {'version': _FORMAT_VERSION, 'entries': entries}, f)
+                # Readers see either the old or the new file, never a
+                # partially written one.
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.log.debug(
+                'Cannot write discovery cache %s: %s', self.path, e)
+        self._persisted = entries
+
+    def __getitem__(self, url):
+        with self._lock:
+            if url in self._memory:
+                return self._memory[url]
+            entry = self._load().get(url)
+            if entry is None or not self._is_fresh(entry, time.time()):
+                raise KeyError(url)
+            disc = _CachedDiscover(url, entry['data'])
+            self._memory[url] = disc
+            return disc
+
+    def __setitem__(self, url, disc):
+        with self._lock:
+            self._memory[url] = disc
+            entry = self._load().get(url)
+            # keystoneauth stores the result again on every lookup, only
+            # write the documents which are not persisted yet.
+            if entry is not None and self._is_fresh(entry, time.time()):
+                return
+            data = getattr(disc, '_data', None)
+            if data is None:
+                return
+            self._write(update={
+                url: {'timestamp': time.time(), 'data': data}})
+
+    def __delitem__(self, url):
+        with self._lock:
+            if url not in self._memory and url not in self._load():
+                raise KeyError(url)
+            self._memory.pop(url, None)
+            self._write(remove=[url])
+
+    def __iter__(self):
+        with self._lock:
+            urls = set(self._memory) | set(self._load())
+        return iter(urls)
+
+    def __len__(self):
+        return len(list(iter(self)))
@@ -0,0 +1,177 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Storage backends of the authentication state cache.
+
+The authentication state (token) of a cloud region is stored under the
+cache ID of its auth plugin so that the consequent processes can reuse it.
+``keyring`` is handled by :class:`~openstack.config.cloud_region.CloudRegion`
+itself, the other backends implement :class:`AuthCacheBackend`.
+"""
+
+import abc
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+
+from keystoneauth1 import access
+
+from openstack import _log
+from openstack import exceptions
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+KEYRING = 'keyring'
+
+
+class AuthCacheBackend(metaclass=abc.ABCMeta):
+    """Base class of the authentication state cache backends.
+
+    :param str cache_path: The cache path of the configuration.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.log = _log.setup_logging('openstack.config')
+
+    @abc.abstractmethod
+    def get(self, cache_id):
+        """Get the stored authentication state or None."""
+
+    @abc.abstractmethod
+    def set(self, cache_id, state):
+        """Store the authentication state."""
+
+    @abc.abstractmethod
+    def delete(self, cache_id):
+        """Forget the authentication state."""
+
+
+class FileAuthCache(AuthCacheBackend):
+    """Authentication states stored in files readable by the user only.
+
+    Every state is stored in its own file named after the hash of the cache
+    ID in the ``auth`` directory of the cache path. States of tokens which
+    are about to expire are not returned.
+
+    :param str cache_path: The cache path of the configuration.
+    :param int stale_duration: Seconds before the expiration of a token in
+        which it is not reused anymore.
+    """
+
+    def __init__(self, cache_path=None, stale_duration=30):
+        super(FileAuthCache, self).__init__(cache_path)
+        if not cache_path:
+            raise exceptions.ConfigException(
+                'The file auth cache requires the cache path to be set')
+        self.directory = os.path.join(cache_path, 'auth')
+        self.stale_duration = stale_duration
+
+    def _get_path(self, cache_id):
+        return os.path.join(
+            self.directory, hashlib.sha256(cache_id.encode()).hexdigest())
+
+    @contextlib.contextmanager
+    def _locked(self, path, exclusive):
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _is_expired(self, state):
+        try:
+            data = json.loads(state)
+            auth_ref = access.create(
+                body=data['body'], auth_token=data['auth_token'])
+        except (ValueError, KeyError, TypeError):
+            return True
+        return auth_ref.will_expire_soon(stale_duration=self.stale_duration)
+
+    def get(self, cache_id):
+        path = self._get_path(cache_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with self._locked(path, exclusive=False):
+                with open(path) as f:
+                    state = f.read()
+        except OSError as e:
+            self.log.debug('Failed to read auth from %s: %s', path, e)
+            return None
+        if self._is_expired(state):
+            self.delete(cache_id)
+            return None
+        return state
+
+    def set(self, cache_id, state):
+        path = self._get_path(cache_id)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with self._locked(path, exclusive=True):
+                # mkstemp creates the file with 0600 permissions
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        f.write(state)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            self.log.debug('Failed to write auth to %s: %s', path, e)
+
+    def delete(self, cache_id):
+        path = self._get_path(cache_id)
+        try:
+            with self._locked(path, exclusive=True):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.log.debug('Failed to delete auth in %s: %s', path, e)
+
+
+_BACKENDS = {
+    'file': FileAuthCache,
+}
+
+
+def get_backend(name, cache_path=None):
+    """Get the authentication state cache backend.
+
+    :param str name: ``file`` or the import path of an
+        :class:`AuthCacheBackend` subclass, e.g.
+        ``mypackage.auth_cache.MemcachedAuthCache``.
+    :param str cache_path: The cache path of the configuration.
+    :returns: An :class:`AuthCacheBackend` instance.
+    """
+    backend_class = _BACKENDS.get(name)
+    if backend_class is None:
+        module_name, _, class_name = name.rpartition('.')
+        try:
+            backend_class = getattr(
+                importlib.import_module(module_name), class_name)
+        except (ValueError, ImportError, AttributeError):
+            raise exceptions.ConfigException(
+                'Unknown auth cache backend {name}'.format(name=name))
+    return backend_class(cache_path=cache_path)
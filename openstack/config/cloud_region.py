@@ -13,9 +13,11 @@
 # under the License.
 
 import copy
+import hashlib
 import os.path
 import urllib
 import warnings
+import weakref
 
 try:
     import keyring
@@ -24,6 +26,7 @@ except ImportError:
 
 from keystoneauth1 import discover
 import keystoneauth1.exceptions.catalog
+from keystoneauth1 import loading as ks_loading
 from keystoneauth1.loading import adapter as ks_load_adap
 from keystoneauth1 import session as ks_session
 import os_service_types
@@ -41,12 +44,15 @@ try:
 except ImportError:
     influxdb = None
 
+from openstack import _adaptive_limit
+from openstack import _http_pool
 from openstack import _log
+from openstack.config import _discovery_cache
 from openstack.config import _util
+from openstack.config import auth_cache
 from openstack.config import defaults as config_defaults
 from openstack import exceptions
 from openstack import proxy
-from openstack import version as openstack_version
 
 
 _logger = _log.setup_logging('openstack')
@@ -57,6 +63,14 @@ SCOPE_KEYS = {
     'system_scope'
 }
 
+# Auth keys identifying the user and project of a connection
+_IDENTITY_AUTH_KEYS = (
+    'user_id', 'username', 'user_domain_id', 'user_domain_name',
+    'project_id', 'project_name', 'project_domain_id', 'project_domain_name',
+    'domain_id', 'domain_name', 'system_scope', 'application_credential_id',
+    'application_credential_name',
+)
+
 # Sentinel for nonexistence
 _ENOENT = object()
 
@@ -205,6 +219,20 @@ def from_conf(conf, session=None, service_types=None, **kwargs):
         session=session, config=config_dict, **kwargs)
 
 
+# All the living regions by id, their sessions must not be shared with a
+# forked child process.
+_regions = weakref.WeakValueDictionary()
+
+
+def _reset_regions_after_fork():
+    for region in list(_regions.values()):
+        region._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_regions_after_fork)
+
+
 class CloudRegion:
     # TODO(efried): Doc the rest of the kwargs
     """The configuration for a Region of an OpenStack Cloud.
@@ -243,7 +271,7 @@ class CloudRegion:
                  statsd_host=None, statsd_port=None, statsd_prefix=None,
                  influxdb_config=None,
                  collector_registry=None,
-                 cache_auth=False):
+                 cache_auth=False, cache_auth_backend=auth_cache.KEYRING):
         self._name = name
         self.config = _util.normalize_keys(config)
         # NOTE(efried): For backward compatibility: a) continue to accept the
@@ -256,18 +284,24 @@ class CloudRegion:
         self._force_ipv4 = force_ipv4
         self._auth = auth_plugin
         self._cache_auth = cache_auth
+        self._auth_cache = None
+        if cache_auth and cache_auth_backend != auth_cache.KEYRING:
+            self._auth_cache = auth_cache.get_backend(
+                cache_auth_backend, cache_path)
         self.load_auth_from_cache()
         self._openstack_config = openstack_config
         self._keystone_session = session
         self._session_constructor = session_constructor or ks_session.Session
         self._app_name = app_name
         self._app_version = app_version
-        self._discovery_cache = discovery_cache or None
         self._cache_expiration_time = cache_expiration_time
         self._cache_expirations = cache_expirations or {}
         self._cache_path = cache_path
         self._cache_class = cache_class
         self._cache_arguments = cache_arguments
+        self._discovery_cache = discovery_cache
+        if self._discovery_cache is None:
+            self._discovery_cache = self._get_persistent_discovery_cache()
         self._password_callback = password_callback
         self._statsd_host = statsd_host
         self._statsd_port = statsd_port
@@ -278,6 +312,53 @@ class CloudRegion:
         self._collector_registry = collector_registry
 
         self._service_type_manager = os_service_types.ServiceTypes()
+        _regions[id(self)] = self
+
+    def __getstate__(self):
+        """Get a lightweight recipe of the region for pickling.
+
+        Sessions, caches and metric clients are left out. The auth plugin is
+        rebuilt from the config when unpickling and reuses the current token.
+        """
+        if self._auth is None and self._keystone_session is not None:
+            raise exceptions.SDKException(
+                'A region created from an existing session cannot be '
+                'pickled')
+        state = self.__dict__.copy()
+        for key in (
+            '_keystone_session', '_openstack_config', '_password_callback',
+            '_statsd_client', '_influxdb_client', '_collector_registry',
+            '_discovery_cache', '_service_type_manager',
+        ):
+            state[key] = None
+        state['_auth'] = None
+        if self._auth is not None:
+            state['_auth_state'] = self._auth.get_auth_state()
+        return state
+
+    def __setstate__(self, state):
+        has_auth = '_auth_state' in state
+        auth_state = state.pop('_auth_state', None)
+        self.__dict__.update(state)
+        if has_auth:
+            plugin_loader = ks_loading.get_plugin_loader(
+                self.config['auth_type'])
+            self._auth = plugin_loader.load_from_options(
+                **self.config['auth'])
+            if auth_state:
+                self._auth.set_auth_state(auth_state)
+        self._discovery_cache = self._get_persistent_discovery_cache()
+        self._service_type_manager = os_service_types.ServiceTypes()
+        _regions[id(self)] = self
+
+    def _reset_after_fork(self):
+        """Drop the connections inherited from the parent process."""
+        session = self._keystone_session
+        requests_session = getattr(session, 'session', None)
+        if requests_session is None:
+            return
+        for adapter in requests_session.adapters.values():
+            adapter.close()
 
     def __getattr__(self, key):
         """Return arbitrary attributes."""
@@ -564,7 +645,9 @@ class CloudRegion:
         return self._auth
 
     def skip_auth_cache(self):
-        return not keyring or not self._auth or not self._cache_auth
+        if not self._auth or not self._cache_auth:
+            return True
+        return self._auth_cache is None and not keyring
 
     def load_auth_from_cache(self):
         if self.skip_auth_cache():
@@ -576,6 +659,14 @@ class CloudRegion:
         if not cache_id:
             return
 
+        if self._auth_cache is not None:
+            state = self._auth_cache.get(cache_id)
+            if not state:
+                return
+            self.log.debug('Reusing authentication from auth cache')
+            self._auth.set_auth_state(state)
+            return
+
         try:
             state = keyring.get_password('openstacksdk', cache_id)
         except RuntimeError:  # the fail backend raises this
@@ -592,6 +683,11 @@ class CloudRegion:
         cache_id = self._auth.get_cache_id()
         state = self._auth.get_auth_state()
 
+        if self._auth_cache is not None:
+            if cache_id and state:
+                self._auth_cache.set(cache_id, state)
+            return
+
         try:
             keyring.set_password('openstacksdk', cache_id, state)
         except RuntimeError:  # the fail backend raises this
@@ -611,6 +707,10 @@ class CloudRegion:
         :class:`~openstack.config.cloud_region.CloudRegion` it may be
         desirable.
         """
+        # NOTE: Resolving the version is expensive when running from a source
+        # tree, so do it only when a session is actually created.
+        from openstack import version as openstack_version
+
         self._keystone_session.additional_user_agent.append(
             ('openstacksdk', openstack_version.__version__))
 
@@ -629,13 +729,26 @@ class CloudRegion:
                     "Turning off SSL warnings for {full_name}"
                     " since verify=False".format(full_name=self.full_name))
             requestsexceptions.squelch_warnings(insecure_requests=not verify)
+            connections, maxsize = self.get_http_pool_size()
+            session_kwargs = {}
+            if self.get_share_pools():
+                # Connections to the same cloud region share the HTTP
+                # connection pools
+                session_kwargs['session'] = _http_pool.get_shared_session(
+                    self._get_session_pool_key(),
+                    lambda: _http_pool.make_session(connections, maxsize))
             self._keystone_session = self._session_constructor(
                 auth=self._auth,
                 verify=verify,
                 cert=cert,
                 timeout=self.config.get('api_timeout'),
                 collect_timing=self.config.get('timing'),
-                discovery_cache=self._discovery_cache)
+                discovery_cache=self._discovery_cache,
+                **session_kwargs)
+            if (connections or maxsize) and not session_kwargs:
+                _http_pool.mount(
+                    self._keystone_session.session, ('https://', 'http://'),
+                    connections, maxsize)
             self.insert_user_agent()
             # Using old keystoneauth with new os-client-config fails if
             # we pass in app_name and app_version. Those are not essential,
@@ -768,6 +881,12 @@ class CloudRegion:
             'prometheus_histogram', self.get_prometheus_histogram())
         kwargs.setdefault('influxdb_config', self._influxdb_config)
         kwargs.setdefault('influxdb_client', self.get_influxdb_client())
+        http_pool_size = self.get_http_pool_size(service_type)
+        if http_pool_size != self.get_http_pool_size():
+            kwargs.setdefault('http_pool_size', http_pool_size)
+        circuit_breaker = self.get_circuit_breaker(service_type)
+        if circuit_breaker:
+            kwargs.setdefault('circuit_breaker', circuit_breaker)
         endpoint_override = self.get_endpoint(service_type)
         version = version_request.version
         min_api_version = (
@@ -786,6 +905,19 @@ class CloudRegion:
                 endpoint_override = self._get_hardcoded_endpoint(
                     service_type, constructor)
 
+        rate_limit = self.get_rate_limit(service_type)
+        concurrency = self.get_concurrency(service_type)
+        if self.get_adaptive_rate_limit(service_type):
+            kwargs.setdefault(
+                'adaptive_limiter', _adaptive_limit.AdaptiveLimiter(
+                    max_concurrency=concurrency,
+                    max_rate=rate_limit,
+                    latency_target=self.get_adaptive_latency_target(
+                        service_type)))
+            # The configured limits are the upper bounds of the adaptive
+            # limits instead of fixed limits.
+            rate_limit = concurrency = None
+
         client = constructor(
             session=self.get_session(),
             service_type=self.get_service_type(service_type),
@@ -796,8 +928,8 @@ class CloudRegion:
             max_version=max_api_version,
             endpoint_override=endpoint_override,
             default_microversion=version_request.default_microversion,
-            rate_limit=self.get_rate_limit(service_type),
-            concurrency=self.get_concurrency(service_type),
+            rate_limit=rate_limit,
+            concurrency=concurrency,
             **kwargs)
         if version_request.default_microversion:
             default_microversion = version_request.default_microversion
@@ -919,6 +1051,18 @@ class CloudRegion:
             return default
         return float(self._cache_expirations[resource])
 
+    def _get_persistent_discovery_cache(self):
+        """Get the on-disk discovery cache if enabled in the cache config.
+
+        The ``discovery`` expiration defines for how many seconds the version
+        discovery documents are reused by new processes.
+        """
+        ttl = self.get_cache_resource_expiration('discovery', 0)
+        if not ttl or not self._cache_path:
+            return None
+        return _discovery_cache.DiscoveryCache(
+            os.path.join(self._cache_path, _discovery_cache.FILE_NAME), ttl)
+
     def requires_floating_ip(self):
         """Return whether or not this cloud requires floating ips.
 
@@ -1033,6 +1177,94 @@ class CloudRegion:
         return self._get_service_config(
             'concurrency', service_type=service_type)
 
+    def get_token_refresh_margin(self):
+        """Get the seconds before its expiration to refresh the token at.
+
+        :returns: The seconds, None if the token is not refreshed in the
+            background.
+        """
+        value = self.config.get('token_refresh_margin')
+        return float(value) if value else None
+
+    def get_adaptive_rate_limit(self, service_type=None):
+        """Whether the limits of the service adapt to its responses."""
+        value = self._get_service_config(
+            'adaptive_rate_limit', service_type=service_type)
+        if isinstance(value, str):
+            return value.lower() == 'true'
+        return bool(value)
+
+    def get_adaptive_latency_target(self, service_type=None):
+        """Get the seconds after which a response counts as overload."""
+        value = self._get_service_config(
+            'adaptive_latency_target', service_type=service_type)
+        return float(value) if value else None
+
+    def get_circuit_breaker(self, service_type=None):
+        """Get the settings of the circuit breakers of the service.
+
+        :returns: A tuple of the amount of consecutive failures opening the
+            circuit and of the seconds it stays open, None when circuit
+            breakers are not enabled.
+        """
+        threshold = self._get_service_config(
+            'circuit_breaker_threshold', service_type=service_type)
+        if not threshold:
+            return None
+        # NOTE: Not a *_timeout option, those are taken for api_timeout
+        reset_after = self._get_service_config(
+            'circuit_breaker_reset_after', service_type=service_type)
+        return int(threshold), float(reset_after or 30)
+
+    def get_http_pool_size(self, service_type=None):
+        """Get the size of the HTTP connection pools.
+
+        :param service_type: Get the size configured for the service with
+            ``<service_type>_http_pool_connections`` and
+            ``<service_type>_http_pool_maxsize``. Falls back to the global
+            ``http_pool_connections`` and ``http_pool_maxsize``.
+        :returns: A tuple of the amount of pools (hosts) and of the
+            connections kept per pool, None when not configured.
+        """
+        sizes = []
+        for key in ('http_pool_connections', 'http_pool_maxsize'):
+            if service_type:
+                value = self._get_config(
+                    key, service_type, fallback_to_unprefixed=True)
+            else:
+                value = self.config.get(key)
+            sizes.append(int(value) if value else None)
+        return tuple(sizes)
+
+    def get_pool_executor_size(self):
+        """Get the amount of threads running background tasks."""
+        return int(self.config.get('pool_executor_size') or 5)
+
+    def get_share_pools(self):
+        """Whether connections share executor and HTTP pools."""
+        value = self.config.get('share_pools', False)
+        if isinstance(value, str):
+            return value.lower() == 'true'
+        return bool(value)
+
+    def _get_pool_key(self):
+        # NOTE: Not using self.name which may need a session
+        return (
+            self._name,
+            self.get_region_name(),
+            self.config.get('auth', {}).get('auth_url'),
+        )
+
+    def _get_session_pool_key(self):
+        # NOTE: The session keeps cookies, it is only shared by the
+        # connections with the same identity.
+        auth = self.config.get('auth', {})
+        identity = tuple(auth.get(key) for key in _IDENTITY_AUTH_KEYS)
+        token = auth.get('token')
+        if token:
+            token = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        return self._get_pool_key() + identity + (token,)
+
     def get_statsd_client(self):
         if not statsd:
             if self._statsd_host:
@@ -22,6 +22,7 @@ import json
 import os
 import re
 import sys
+import threading
 import warnings
 
 import appdirs
@@ -31,6 +32,7 @@ import yaml
 
 from openstack import _log
 from openstack.config import _util
+from openstack.config import auth_cache
 from openstack.config import cloud_region
 from openstack.config import defaults
 from openstack.config import vendors
@@ -82,6 +84,12 @@ BOOL_KEYS = ('insecure', 'cache')
 
 FORMAT_EXCLUSIONS = frozenset(['password'])
 
+# Parsed config files and auth plugin loaders shared by all the
+# OpenStackConfig instances of the process.
+_parsed_files = {}
+_auth_loaders = {}
+_cache_lock = threading.Lock()
+
 
 def get_boolean(value):
     if value is None:
@@ -107,6 +115,39 @@ def _auth_update(old_dict, new_dict_source):
     return old_dict
 
 
+def _load_parsed_file(path):
+    """Parse a YAML or JSON file, reusing the result while it is unchanged.
+
+    The parsed content is cached for the process until the file is modified
+    or replaced. A copy is returned so callers are free to change it.
+    """
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    with _cache_lock:
+        cached = _parsed_files.get(path)
+    if cached is not None and cached[0] == key:
+        return copy.deepcopy(cached[1])
+    with open(path, 'r') as f:
+        if path.endswith('json'):
+            data = json.load(f)
+        else:
+            data = yaml.safe_load(f)
+    with _cache_lock:
+        _parsed_files[path] = (key, data)
+    return copy.deepcopy(data)
+
+
+def _get_plugin_loader(auth_type):
+    """Get the keystoneauth plugin loader, looking it up once per type."""
+    with _cache_lock:
+        plugin_loader = _auth_loaders.get(auth_type)
+    if plugin_loader is None:
+        plugin_loader = loading.get_plugin_loader(auth_type)
+        with _cache_lock:
+            _auth_loaders[auth_type] = plugin_loader
+    return plugin_loader
+
+
 def _fix_argv(argv):
     # Transform any _ characters in arg names to - so that we don't
     # have to throw billions of compat argparse arguments around all
@@ -158,6 +199,7 @@ class OpenStackConfig:
         self._app_name = app_name
         self._app_version = app_version
         self._load_envvars = load_envvars
+        self._profile_templates = {}
 
         if load_yaml_config:
             # "if config_files" is not sufficient to process empty list
@@ -270,6 +312,7 @@ class OpenStackConfig:
             self.default_cloud = 'defaults'
 
         self._cache_auth = False
+        self._cache_auth_backend = auth_cache.KEYRING
         self._cache_expiration_time = 0
         self._cache_path = CACHE_PATH
         self._cache_class = 'dogpile.cache.null'
@@ -281,6 +324,8 @@ class OpenStackConfig:
 
             self._cache_auth = get_boolean(
                 cache_settings.get('auth', self._cache_auth))
+            self._cache_auth_backend = cache_settings.get(
+                'auth_backend', self._cache_auth_backend)
 
             # expiration_time used to be 'max_age' but the dogpile setting
             # is expiration_time. Support max_age for backwards compat.
@@ -406,11 +451,7 @@ class OpenStackConfig:
         for path in filelist:
             if os.path.exists(path):
                 try:
-                    with open(path, 'r') as f:
-                        if path.endswith('json'):
-                            return path, json.load(f)
-                        else:
-                            return path, yaml.safe_load(f)
+                    return path, _load_parsed_file(path)
                 except IOError as e:
                     if e.errno == errno.EACCES:
                         # Can't access file so let's continue to the next
@@ -512,9 +553,7 @@ class OpenStackConfig:
         if profile:
             our_cloud['profile'] = profile
 
-        # Get the defaults
-        cloud.update(self.defaults)
-        self._expand_vendor_profile(name, cloud, our_cloud)
+        cloud.update(self._get_profile_template(name, our_cloud))
 
         if 'auth' not in cloud:
             cloud['auth'] = dict()
@@ -525,6 +564,21 @@ class OpenStackConfig:
 
         return cloud
 
+    def _get_profile_template(self, name, our_cloud):
+        """Get the defaults merged with the vendor profile of the cloud.
+
+        The template is built once per cloud and profile, consequent calls
+        (i.e. for every region of the cloud) get a copy of it.
+        """
+        key = (name, our_cloud.get('profile', our_cloud.get('cloud')))
+        template = self._profile_templates.get(key)
+        if template is None:
+            # Get the defaults
+            template = dict(self.defaults)
+            self._expand_vendor_profile(name, template, our_cloud)
+            self._profile_templates[key] = template
+        return copy.deepcopy(template)
+
     def _expand_vendor_profile(self, name, cloud, our_cloud):
         # Expand a profile if it exists. 'cloud' is an old confusing name
         # for this.
@@ -932,7 +986,7 @@ class OpenStackConfig:
             # That it does not exist in keystoneauth is irrelvant- it not
             # doing what they want causes them sorrow.
             config['auth_type'] = 'admin_token'
-        return loading.get_plugin_loader(config['auth_type'])
+        return _get_plugin_loader(config['auth_type'])
 
     def _validate_auth(self, config, loader):
         # May throw a keystoneauth1.exceptions.NoMatchingPlugin
@@ -1182,6 +1236,7 @@ class OpenStackConfig:
             app_name=self._app_name,
             app_version=self._app_version,
             cache_auth=self._cache_auth,
+            cache_auth_backend=self._cache_auth_backend,
             cache_expiration_time=self._cache_expiration_time,
             cache_expirations=self._cache_expirations,
             cache_path=self._cache_path,
@@ -1288,6 +1343,7 @@ class OpenStackConfig:
             auth_plugin=auth_plugin,
             openstack_config=self,
             cache_auth=self._cache_auth,
+            cache_auth_backend=self._cache_auth_backend,
             cache_expiration_time=self._cache_expiration_time,
             cache_expirations=self._cache_expirations,
             cache_path=self._cache_path,
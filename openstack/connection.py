@@ -175,8 +175,27 @@ try to find it and if that fails, you would create it::
 
 Additional information about the services can be found in the
 :ref:`service-proxies` documentation.
+
+Multiple processes
+~~~~~~~~~~~~~~~~~~
+
+A Connection can be pickled, i.e. to be sent to a process pool. Only its
+config and current token are serialised, the copy connects again on first
+use. Connections are also safe to use after ``os.fork()``, the child does
+not reuse the HTTP connections and threads of the parent.
+
+CPU bound processing of resources can be spread over the cores with
+:meth:`~openstack.connection.Connection.map_processes`::
+
+    def summarize(conn, server):
+        return server.name, len(server.addresses)
+
+    summary = conn.map_processes(summarize, conn.compute.servers())
 """
 import concurrent.futures
+import functools
+import os
+import threading
 import warnings
 import weakref
 
@@ -189,8 +208,10 @@ except ImportError:
 import keystoneauth1.exceptions
 import requestsexceptions
 
+from openstack import _http_pool
 from openstack import _log
 from openstack import _services_mixin
+from openstack import _token_refresh
 from openstack.cloud import _accelerator
 from openstack.cloud import _baremetal
 from openstack.cloud import _block_storage
@@ -254,6 +275,90 @@ def from_config(cloud=None, config=None, options=None, **kwargs):
     return Connection(config=config)
 
 
+# Connections whose executors must be replaced in a forked child process.
+_connections = weakref.WeakSet()
+# Executors shared by the connections to the same cloud region.
+_shared_executors = {}
+_shared_executors_lock = threading.Lock()
+# The connection of a worker process of Connection.map_processes.
+_worker_connection = None
+
+
+class _PoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    """A thread pool executor counting its running and pending tasks."""
+
+    def __init__(self, max_workers=None, **kwargs):
+        super(_PoolExecutor, self).__init__(
+            max_workers=max_workers, **kwargs)
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._pending = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._stats_lock:
+            self._pending += 1
+        try:
+            future = super(_PoolExecutor, self).submit(
+                self._run, fn, args, kwargs)
+        except Exception:
+            with self._stats_lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._cancelled)
+        return future
+
+    def _run(self, fn, args, kwargs):
+        with self._stats_lock:
+            self._pending -= 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._stats_lock:
+                self._active -= 1
+
+    def _cancelled(self, future):
+        if future.cancelled():
+            with self._stats_lock:
+                self._pending -= 1
+
+    def get_stats(self):
+        """Get the ``max_workers`` and the ``active`` and ``pending`` tasks."""
+        with self._stats_lock:
+            return {
+                'max_workers': self.max_workers,
+                'active': self._active,
+                'pending': self._pending,
+            }
+
+
+def _get_shared_executor(key, max_workers):
+    with _shared_executors_lock:
+        if key not in _shared_executors:
+            _shared_executors[key] = _PoolExecutor(max_workers=max_workers)
+        return _shared_executors[key]
+
+
+def _reset_connections_after_fork():
+    _shared_executors.clear()
+    for conn in list(_connections):
+        conn._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_connections_after_fork)
+
+
+def _init_worker(conn):
+    global _worker_connection
+    _worker_connection = conn
+
+
+def _call_in_worker(fn, item):
+    return fn(_worker_connection, item)
+
+
 class Connection(
     _services_mixin.ServicesMixin,
     _cloud._OpenStackCloudMixin,
@@ -393,8 +498,10 @@ class Connection(
                     **kwargs)
 
         self._session = None
+        self._token_refresher = None
         self._proxies = {}
         self.__pool_executor = pool_executor
+        self.__shared_pool_executor = False
         self._global_request_id = global_request_id
         self.use_direct_get = use_direct_get
         self.strict_mode = strict
@@ -454,6 +561,36 @@ class Connection(
             self.config._influxdb_config['additional_metric_tags'] = \
                 self.config.config['additional_metric_tags']
 
+        _connections.add(self)
+
+    def __getstate__(self):
+        # NOTE: Only the recipe of the connection is pickled, the session and
+        # proxies are built again on first use in the other process.
+        return {
+            'config': self.config,
+            'extra_services': list(self._extra_services.values()),
+            'strict': self.strict_mode,
+            'use_direct_get': self.use_direct_get,
+            'global_request_id': self._global_request_id,
+            'strict_proxies': self._strict_proxies,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _reset_after_fork(self):
+        """Drop the threads and resources inherited from the parent."""
+        # Threads of the executor do not exist in the child
+        self.__pool_executor = None
+        self.__shared_pool_executor = False
+        if self._token_refresher is not None:
+            # Its thread does not exist in the child
+            self._token_refresher.start()
+        if self._floating_ip_pool:
+            # Pre-allocated floating IPs belong to the parent
+            self._floating_ip_pool = type(self._floating_ip_pool)(
+                self, self._floating_ip_pool.size)
+
     def __del__(self):
         # try to force release of resources and save authorization
         self.close()
@@ -466,8 +603,19 @@ class Connection(
             # backwards compatibility for folks trying to just pass
             # conn.session to a Resource method's session argument.
             self.session._sdk_connection = weakref.proxy(self)
+            self._start_token_refresh()
         return self._session
 
+    def _start_token_refresh(self):
+        margin = self.config.get_token_refresh_margin()
+        if not margin or self._token_refresher is not None:
+            return
+        # NOTE: The refresher must not reference the connection, which
+        # stops it when garbage collected.
+        self._token_refresher = _token_refresh.TokenRefresher(
+            self._session, margin, on_refresh=self.config.set_auth_cache)
+        self._token_refresher.start()
+
     def add_service(self, service):
         """Add a service to the Connection.
 
@@ -519,20 +667,113 @@ class Connection(
                  argument is missing, etc.
         """
         try:
-            return self.session.get_token()
+            token = self.session.get_token()
         except keystoneauth1.exceptions.ClientException as e:
             raise exceptions.SDKException(e)
+        if self._token_refresher is not None:
+            # Schedule the refresh of the new token
+            self._token_refresher.wake()
+        return token
 
     @property
     def _pool_executor(self):
         if not self.__pool_executor:
-            self.__pool_executor = concurrent.futures.ThreadPoolExecutor(
-                max_workers=5)
+            max_workers = self.config.get_pool_executor_size()
+            if self.config.get_share_pools():
+                self.__pool_executor = _get_shared_executor(
+                    self.config._get_pool_key(), max_workers)
+                self.__shared_pool_executor = True
+            else:
+                self.__pool_executor = _PoolExecutor(max_workers=max_workers)
         return self.__pool_executor
 
+    def get_pool_stats(self):
+        """Get the utilisation of the executor and HTTP connection pools.
+
+        :returns: A dict with the ``executor`` stats (``max_workers``,
+            ``active`` and ``pending`` tasks, empty until the executor is
+            used or when it was passed to the connection) and the ``http``
+            stats of the connection pools by ``scheme://host:port``
+            (``maxsize``, ``in_use``, ``created`` connections and
+            ``requests`` sent).
+        """
+        executor_stats = {}
+        executor = self.__pool_executor
+        if isinstance(executor, _PoolExecutor):
+            executor_stats = executor.get_stats()
+        http_stats = {}
+        requests_session = getattr(self.session, 'session', None)
+        if requests_session is not None:
+            http_stats = _http_pool.get_pool_stats(requests_session)
+        return {'executor': executor_stats, 'http': http_stats}
+
+    def get_rate_limits(self):
+        """Get the current limits of the services with adaptive limits.
+
+        Only the services used so far are included.
+
+        :returns: A dict of the ``concurrency``, ``rate``, ``in_flight``,
+            ``throttled`` and ``blocked`` stats by service type.
+        """
+        return {
+            service_type: proxy._adaptive_limiter.get_stats()
+            for service_type, proxy in list(self._proxies.items())
+            if getattr(proxy, '_adaptive_limiter', None) is not None
+        }
+
+    def get_circuit_breakers(self):
+        """Get the state of the circuit breakers of the services.
+
+        Only the services and endpoints used so far are included.
+
+        :returns: A dict by service type of dicts by endpoint of the
+            ``state`` (``closed``, ``open`` or ``half_open``) and the
+            consecutive ``failures``.
+        """
+        result = {}
+        for service_type, proxy in list(self._proxies.items()):
+            breakers = getattr(proxy, '_circuit_breakers', None)
+            if breakers:
+                result[service_type] = {
+                    endpoint: {
+                        'state': breaker.state,
+                        'failures': breaker.failures,
+                    }
+                    for endpoint, breaker in list(breakers.items())
+                }
+        return result
+
+    def map_processes(self, fn, items, max_workers=None, chunksize=1):
+        """Call a function for every item in a pool of worker processes.
+
+        Spreads CPU bound processing, i.e. of large listings, over the
+        available cores. Each worker process gets a copy of the connection
+        (its config and token) which connects on first use.
+
+        :param fn: A picklable callable, i.e. a module level function. It is
+            called as ``fn(conn, item)`` with the connection of the worker.
+        :param items: An iterable of picklable items, i.e. resources.
+        :param int max_workers: Amount of worker processes. Defaults to the
+            number of processors.
+        :param int chunksize: Amount of items sent to a worker at once.
+        :returns: A list with the results in the order of the items.
+        """
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as executor:
+            return list(executor.map(
+                functools.partial(_call_in_worker, fn), items,
+                chunksize=chunksize))
+
     def close(self):
         """Release any resources held open."""
-        if self.__pool_executor:
+        if self._token_refresher is not None:
+            self._token_refresher.stop()
+        if self._floating_ip_pool:
+            self._floating_ip_pool.release()
+        if self.__pool_executor and not self.__shared_pool_executor:
             self.__pool_executor.shutdown()
         self.config.set_auth_cache()
 
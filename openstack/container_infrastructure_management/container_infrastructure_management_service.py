@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.container_infrastructure_management.v1 import _proxy
 from openstack import service_description
 
 
@@ -20,5 +19,5 @@ class ContainerInfrastructureManagementService(
     """The container infrastructure management service."""
 
     supported_versions = {
-        '1': _proxy.Proxy,
+        '1': 'openstack.container_infrastructure_management.v1._proxy.Proxy',
     }
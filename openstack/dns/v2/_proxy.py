@@ -542,7 +542,8 @@ class Proxy(proxy.Proxy):
 
     def _service_cleanup(self, dry_run=True, client_status_queue=False,
                          identified_resources=None,
-                         filters=None, resource_evaluation_fn=None):
+                         filters=None, resource_evaluation_fn=None,
+                         cleanup_graph=None):
         # Delete all zones
         for obj in self.zones():
             self._service_cleanup_del_res(
@@ -552,7 +553,8 @@ class Proxy(proxy.Proxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph)
         # Unset all floatingIPs
         # NOTE: FloatingIPs are not cleaned when filters are set
         for obj in self.floating_ips():
@@ -563,4 +565,5 @@ class Proxy(proxy.Proxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph)
@@ -267,3 +267,12 @@ class ServiceDisabledException(ConfigException):
 
 class ServiceDiscoveryException(SDKException):
     """The service cannot be discovered."""
+
+
+class CircuitOpenException(SDKException):
+    """Requests to an endpoint fail fast after repeated failures."""
+
+    def __init__(self, message=None, endpoint=None, retry_after=None):
+        super(CircuitOpenException, self).__init__(message)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
@@ -10,8 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.identity.v2 import _proxy as _proxy_v2
-from openstack.identity.v3 import _proxy as _proxy_v3
 from openstack import service_description
 
 
@@ -19,6 +17,6 @@ class IdentityService(service_description.ServiceDescription):
     """The identity service."""
 
     supported_versions = {
-        '2': _proxy_v2.Proxy,
-        '3': _proxy_v3.Proxy,
+        '2': 'openstack.identity.v2._proxy.Proxy',
+        '3': 'openstack.identity.v3._proxy.Proxy',
     }
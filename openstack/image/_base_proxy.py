@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import abc
+import copy
 import os
 
 
@@ -33,6 +34,9 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
     _SHADE_IMAGE_SHA256_KEY = 'owner_specified.shade.sha256'
     _SHADE_IMAGE_OBJECT_KEY = 'owner_specified.shade.object'
 
+    # The os_hash_algo of Glance by default
+    _CONTENT_HASH_ALGORITHM = 'sha512'
+
     # ====== IMAGES ======
     def create_image(
         self, name, filename=None,
@@ -48,6 +52,9 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         tags=None,
         all_stores=None,
         all_stores_must_succeed=None,
+        hash_while_uploading=False,
+        deduplicate=False,
+        content_sources=None,
         **kwargs,
     ):
         """Upload an image.
@@ -113,6 +120,26 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
             the stores where the data has been correctly uploaded.
             Default is True.
             Implies ``use_import`` equals ``True``.
+        :param bool hash_while_uploading: If true and neither md5 nor sha256
+            are given, calculate them while uploading the data instead of
+            reading it beforehand, and set them on the image afterwards.
+            The data is read once, but an existing image of the same name
+            cannot be compared with it and is replaced. Allows validating
+            the checksum of file-like data. Not used with the task API.
+            Default is False.
+        :param bool deduplicate: If true, look for images with the same data
+            before uploading it, see :meth:`find_images_by_content`. When
+            there is one, the image is created with a ``web-download`` import
+            from a temporary URL of the copy of the data kept in the object
+            store, if there is such a copy, or else the existing image is
+            returned, with its own name. The data is only uploaded if neither
+            is possible. Needs ``filename`` or binary ``data`` to hash.
+            Default is False.
+        :param content_sources: List of
+            :class:`~openstack.connection.Connection` to other regions or
+            clouds to look for images with the same data in, when there are
+            none in this one. Their images are reused only through a
+            ``web-download`` import. Implies ``deduplicate``.
 
         Additional kwargs will be passed to the image creation as additional
         metadata for the image and will have all values converted to string
@@ -147,11 +174,27 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         if not filename and not data:
             name, filename = self._get_name_and_filename(
                 name, self._connection.config.config['image_format'])
-        if validate_checksum and data and not isinstance(data, bytes):
+        deduplicate = (deduplicate or content_sources) and (filename or data)
+        hash_value = None
+        if deduplicate:
+            if data and not isinstance(data, bytes):
+                raise exceptions.SDKException(
+                    'Deduplicating images is not possible when data is not '
+                    'a direct binary object')
+            (data_md5, data_sha256, hash_value) = self._get_content_hashes(
+                filename, data)
+            md5 = md5 or data_md5
+            sha256 = sha256 or data_sha256
+        hash_while_uploading = (
+            hash_while_uploading
+            and not (md5 or sha256)
+            and not self._connection.image_api_use_tasks)
+        if (validate_checksum and data and not isinstance(data, bytes)
+                and not hash_while_uploading):
             raise exceptions.SDKException(
                 'Validating checksum is not possible when data is not a '
                 'direct binary object')
-        if not (md5 or sha256) and validate_checksum:
+        if validate_checksum and not (md5 or sha256 or hash_while_uploading):
             if filename:
                 (md5, sha256) = utils._get_file_hashes(filename)
             elif data and isinstance(data, bytes):
@@ -203,6 +246,14 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         if tags:
             image_kwargs['tags'] = tags
 
+        if deduplicate:
+            image = self._reuse_image_content(
+                name, md5=md5, sha256=sha256, hash_value=hash_value,
+                content_sources=content_sources, meta=meta,
+                wait=wait, timeout=timeout, **image_kwargs)
+            if image:
+                self._connection._get_cache(None).invalidate()
+                return image
         if filename or data:
             image = self._upload_image(
                 name, filename=filename, data=data, meta=meta,
@@ -210,8 +261,9 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
                 validate_checksum=validate_checksum,
                 use_import=use_import,
                 stores=stores,
-                all_stores=stores,
-                all_stores_must_succeed=stores,
+                all_stores=all_stores,
+                all_stores_must_succeed=all_stores_must_succeed,
+                hash_while_uploading=hash_while_uploading,
                 **image_kwargs)
         else:
             image_kwargs['name'] = name
@@ -230,6 +282,7 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         stores=None,
         all_stores=None,
         all_stores_must_succeed=None,
+        hash_while_uploading=False,
         **image_kwargs
     ):
         pass
@@ -238,6 +291,98 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
     def _update_image_properties(self, image, meta, properties):
         pass
 
+    @abc.abstractmethod
+    def _import_image_copy(
+        self, source, image, name, meta, wait, timeout, **image_kwargs
+    ):
+        pass
+
+    def _get_content_hashes(self, filename, data):
+        # NOTE: os_hash_value is calculated by Glance, so it can be trusted
+        # more than the hashes in the owner_specified properties.
+        if filename:
+            data = open(filename, 'rb')
+        reader = utils._HashingReader(
+            data, algorithms=('md5', 'sha256', self._CONTENT_HASH_ALGORITHM))
+        try:
+            for _chunk in reader:
+                pass
+        finally:
+            if filename:
+                data.close()
+        return (
+            reader.hexdigest('md5'), reader.hexdigest('sha256'),
+            reader.hexdigest(self._CONTENT_HASH_ALGORITHM))
+
+    def _has_content(self, image, md5=None, sha256=None, hash_value=None):
+        if image.status != 'active':
+            return False
+        if md5 and image.checksum and image.checksum != md5:
+            return False
+        image_hash_value = getattr(image, 'hash_value', None)
+        if (hash_value and image_hash_value
+                and image.hash_algo == self._CONTENT_HASH_ALGORITHM):
+            return image_hash_value == hash_value
+        # NOTE: The owner_specified properties can be set to anything by the
+        # owner of the image, only trust the ones of our own images.
+        if not sha256 or image.owner != self.get_project_id():
+            return False
+        props = image.properties or {}
+        image_sha256 = props.get(
+            self._IMAGE_SHA256_KEY, props.get(self._SHADE_IMAGE_SHA256_KEY))
+        return image_sha256 == sha256
+
+    def find_images_by_content(self, md5=None, sha256=None, hash_value=None):
+        """Find the active images with the given data.
+
+        Images match when Glance calculated the given ``hash_value`` for
+        them, or, for the images of the current project, when their
+        ``owner_specified.openstack.sha256`` property is the given
+        ``sha256``. Images with another md5 checksum never match.
+
+        :param str md5: md5 sum of the image data.
+        :param str sha256: sha256 sum of the image data.
+        :param str hash_value: sha512 sum of the image data, as Glance
+            calculates it for ``os_hash_value``.
+
+        :returns: A list of images with the given data.
+        """
+        if not (sha256 or hash_value):
+            return []
+        # NOTE: The image list is cached when caching is configured
+        return [
+            image for image in self._connection.list_images()
+            if self._has_content(
+                image, md5=md5, sha256=sha256, hash_value=hash_value)
+        ]
+
+    def _reuse_image_content(
+        self, name, md5, sha256, hash_value, content_sources,
+        meta, wait, timeout, **image_kwargs
+    ):
+        local_image = None
+        sources = [self._connection] + list(content_sources or [])
+        for source in sources:
+            images = source.image.find_images_by_content(
+                md5=md5, sha256=sha256, hash_value=hash_value)
+            for image in images:
+                new_image = self._import_image_copy(
+                    source, image, name, meta=meta, wait=wait,
+                    timeout=timeout, **copy.deepcopy(image_kwargs))
+                if new_image:
+                    self.log.debug(
+                        "Image %(name)s imported from the data of image "
+                        "%(id)s", {'name': name, 'id': image.id})
+                    return new_image
+            if source is self._connection and images:
+                local_image = images[0]
+                break
+        if local_image:
+            self.log.debug(
+                "Image %(id)s has the data of image %(name)s, not uploading "
+                "it", {'id': local_image.id, 'name': name})
+        return local_image
+
     def update_image_properties(
             self, image=None, meta=None, **kwargs):
         """
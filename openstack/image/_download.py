@@ -9,11 +9,24 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import concurrent.futures
+import hashlib
 import io
+import os
+import re
+import threading
+import time
 
 from openstack import exceptions
 from openstack import utils
 
+# Size of the buffer the data of an image is read into
+_BUFFER_SIZE = 1024 * 1024
+# Size of the parts downloaded by parallel Range requests, every thread
+# holds one part in memory until it is hashed.
+_PART_SIZE = 16 * 1024 * 1024
+_CONTENT_RANGE = re.compile(r'bytes \d+-\d+/(\d+)')
+
 
 def _verify_checksum(md5, checksum):
     if checksum:
@@ -23,46 +36,269 @@ def _verify_checksum(md5, checksum):
                 "checksum mismatch: %s != %s" % (checksum, digest))
 
 
-class DownloadMixin:
+class _ImageHashes:
+    """The md5 and ``os_hash_algo`` hash of image data, computed at once."""
 
-    def download(self, session, stream=False, output=None, chunk_size=1024):
-        """Download the data contained in an image"""
-        # TODO(briancurtin): This method should probably offload the get
-        # operation into another thread or something of that nature.
-        url = utils.urljoin(self.base_path, self.id, 'file')
-        resp = session.get(url, stream=stream)
+    def __init__(self, hash_algo=None):
+        self.md5 = utils.md5(usedforsecurity=False)
+        self.hash_algo = None
+        self.os_hash = None
+        if hash_algo in hashlib.algorithms_available:
+            self.hash_algo = hash_algo
+            self.os_hash = hashlib.new(hash_algo)
+
+    def update(self, data):
+        self.md5.update(data)
+        if self.os_hash is not None:
+            self.os_hash.update(data)
+
+    def verify(self, checksum, hash_value=None):
+        _verify_checksum(self.md5, checksum)
+        if self.os_hash is not None and hash_value:
+            digest = self.os_hash.hexdigest()
+            if digest != hash_value:
+                raise exceptions.InvalidResponse(
+                    "%s mismatch: %s != %s" % (
+                        self.hash_algo, hash_value, digest))
+
+
+def _iter_into(resp, view):
+    """Read the body of a response into a buffer.
+
+    Yields the part of the buffer filled by every read, which is valid until
+    the next one.
+    """
+    raw = getattr(resp, 'raw', None)
+    if not isinstance(raw, io.IOBase):
+        # Not backed by an urllib3 response, the chunks are new objects
+        yield from resp.iter_content(chunk_size=len(view))
+        return
+    raw.decode_content = True
+    while True:
+        size = raw.readinto(view)
+        if not size:
+            return
+        yield view[:size]
+
+
+def _write(resp, view, output, hashes):
+    """Write and hash the body of a response, return the size written."""
+    size = 0
+    for data in _iter_into(resp, view):
+        output.write(data)
+        hashes.update(data)
+        size += len(data)
+    return size
+
+
+def _read_part(resp, view):
+    """Fill a buffer with the body of a response, return the size read."""
+    raw = getattr(resp, 'raw', None)
+    size = 0
+    if not isinstance(raw, io.IOBase):
+        for chunk in resp.iter_content(chunk_size=len(view)):
+            if size + len(chunk) > len(view):
+                raise exceptions.SDKException(
+                    "Response exceeds the requested range")
+            view[size:size + len(chunk)] = chunk
+            size += len(chunk)
+        return size
+    raw.decode_content = True
+    while size < len(view):
+        read = raw.readinto(view[size:])
+        if not read:
+            break
+        size += read
+    return size
+
+
+class _ParallelDownload:
+    """Download parts of an image by parallel Range requests.
+
+    The parts are written to the file at their offset, and hashed in order
+    by the thread that downloaded them, so memory is bounded by one part per
+    thread.
+    """
+
+    def __init__(self, session, url, fd, size, hashes, parallel):
+        self.session = session
+        self.url = url
+        self.fd = fd
+        self.size = size
+        self.hashes = hashes
+        self.parallel = parallel
+        self._cond = threading.Condition()
+        self._next_part = 0
+        self._hashed = 0
+        self._failed = False
+
+    def _fail(self):
+        with self._cond:
+            self._failed = True
+            self._cond.notify_all()
+
+    def _write_part(self, index, view):
+        offset = index * _PART_SIZE
+        remaining = view
+        while remaining:
+            written = os.pwrite(self.fd, remaining, offset)
+            remaining = remaining[written:]
+            offset += written
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._hashed == index or self._failed)
+            if self._failed:
+                return
+            self.hashes.update(view)
+            self._hashed += 1
+            self._cond.notify_all()
+
+    def _next(self):
+        with self._cond:
+            index = self._next_part
+            self._next_part += 1
+        return index
 
+    def _download_parts(self):
+        view = memoryview(bytearray(min(_PART_SIZE, self.size)))
+        try:
+            while not self._failed:
+                index = self._next()
+                start = index * _PART_SIZE
+                if start >= self.size:
+                    return
+                length = min(_PART_SIZE, self.size - start)
+                resp = self.session.get(
+                    self.url, stream=True,
+                    headers={'Range': 'bytes=%d-%d' % (
+                        start, start + length - 1)})
+                if resp.status_code != 206:
+                    raise exceptions.SDKException(
+                        "Range request answered with %s" % resp.status_code)
+                if _read_part(resp, view[:length]) != length:
+                    raise exceptions.SDKException(
+                        "Incomplete part at offset %d" % start)
+                self._write_part(index, view[:length])
+        except Exception:
+            self._fail()
+            raise
+
+    def run(self, first_resp):
+        """Download the image, continuing after the first part."""
+        self._next_part = 1
+        # The first part is read by this thread meanwhile
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.parallel - 1) as executor:
+            futures = [
+                executor.submit(self._download_parts)
+                for _ in range(self.parallel - 1)]
+            view = memoryview(bytearray(min(_PART_SIZE, self.size)))
+            try:
+                if _read_part(first_resp, view) != len(view):
+                    raise exceptions.SDKException(
+                        "Incomplete part at offset 0")
+                self._write_part(0, view)
+            except Exception:
+                self._fail()
+                raise
+            for future in futures:
+                future.result()
+
+
+class DownloadMixin:
+
+    def _get_checksums(self, session, resp):
         # See the following bug report for details on why the checksum
         # code may sometimes depend on a second GET call.
         # https://storyboard.openstack.org/#!/story/1619675
         checksum = resp.headers.get("Content-MD5")
-
+        details = self
         if checksum is None:
             # If we don't receive the Content-MD5 header with the download,
             # make an additional call to get the image details and look at
             # the checksum attribute.
             details = self.fetch(session)
             checksum = details.checksum
+        return (
+            checksum,
+            getattr(details, 'hash_algo', None),
+            getattr(details, 'hash_value', None))
 
-        md5 = utils.md5(usedforsecurity=False)
-        if output:
-            try:
+    def _download_to_output(self, session, url, output, chunk_size, parallel):
+        start = time.monotonic()
+        ranged = (
+            parallel > 1
+            and not isinstance(output, io.IOBase)
+            and hasattr(os, 'pwrite'))
+        kwargs = {'stream': True}
+        if ranged:
+            kwargs['headers'] = {'Range': 'bytes=0-%d' % (_PART_SIZE - 1)}
+        resp = session.get(url, **kwargs)
+        checksum, hash_algo, hash_value = self._get_checksums(session, resp)
+        hashes = _ImageHashes(hash_algo)
+
+        try:
+            if ranged and resp.status_code == 206:
+                match = _CONTENT_RANGE.match(
+                    resp.headers.get('Content-Range', ''))
+                if not match:
+                    raise exceptions.SDKException(
+                        "No size in Content-Range of image %s" % self.id)
+                size = int(match.group(1))
+                with open(output, 'wb') as fd:
+                    _ParallelDownload(
+                        session, url, fd.fileno(), size, hashes, parallel,
+                    ).run(resp)
+            else:
+                # Not ranged, or the server ignored the Range
+                view = memoryview(bytearray(chunk_size or _BUFFER_SIZE))
                 if isinstance(output, io.IOBase):
-                    for chunk in resp.iter_content(chunk_size=chunk_size):
-                        output.write(chunk)
-                        md5.update(chunk)
+                    size = _write(resp, view, output, hashes)
                 else:
                     with open(output, 'wb') as fd:
-                        for chunk in resp.iter_content(
-                                chunk_size=chunk_size):
-                            fd.write(chunk)
-                            md5.update(chunk)
-                _verify_checksum(md5, checksum)
-
-                return resp
-            except Exception as e:
-                raise exceptions.SDKException(
-                    "Unable to download image: %s" % e)
+                        size = _write(resp, view, fd, hashes)
+            hashes.verify(checksum, hash_value)
+        except Exception as e:
+            raise exceptions.SDKException(
+                "Unable to download image: %s" % e)
+
+        self._report_download(session, size, time.monotonic() - start)
+        return resp
+
+    def _report_download(self, session, size, elapsed):
+        session.log.debug(
+            "Downloaded %d bytes of image %s in %.2f seconds (%.1f MiB/s)",
+            size, self.id, elapsed,
+            size / elapsed / 1024 / 1024 if elapsed else 0.0)
+        report_transfer = getattr(session, '_report_transfer', None)
+        if report_transfer is not None:
+            report_transfer('download', size, elapsed)
+
+    def download(
+        self, session, stream=False, output=None, chunk_size=None,
+        parallel=1,
+    ):
+        """Download the data contained in an image
+
+        :param session: The session to use for making this request.
+        :param bool stream: Return a streamed response.
+        :param output: Either a file object or a path to store data into.
+            The data is verified against the md5 checksum and the
+            ``os_hash_value`` of the image while it is written.
+        :param int chunk_size: Size in bytes of the buffer the data is read
+            into when writing it to ``output``. Defaults to 1 MiB.
+        :param int parallel: Amount of parallel Range requests downloading
+            parts of the image into the ``output`` path. Every request
+            holds a part of 16 MiB in memory.
+        """
+        url = utils.urljoin(self.base_path, self.id, 'file')
+        if output:
+            return self._download_to_output(
+                session, url, output, chunk_size, parallel)
+
+        resp = session.get(url, stream=stream)
+        checksum = self._get_checksums(session, resp)[0]
+
         # if we are returning the repsonse object, ensure that it
         # has the content-md5 header so that the caller doesn't
         # need to jump through the same hoops through which we
@@ -0,0 +1,255 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Import of several images into several stores at once.
+
+The imports are started concurrently and then awaited together: every
+interval a single listing of the images being imported, filtered by their
+IDs, reports the stores each image is still being imported to
+(``os_glance_importing_to_stores``) and the stores it failed for
+(``os_glance_failed_import``). The failed stores are imported again.
+"""
+
+import collections
+import time
+
+from openstack import exceptions
+from openstack.image.v2 import service_info as _si
+from openstack import utils
+
+# Amount of image IDs per listing, keeping the URL short
+_POLL_CHUNK = 50
+# Image statuses while the import has not finished
+_IMPORTING_STATUSES = ('importing', 'uploading', 'saving')
+
+PENDING = 'pending'
+IMPORTING = 'importing'
+SUCCESS = 'success'
+PARTIAL = 'partial'
+FAILED = 'failed'
+
+
+def _split(stores):
+    return set(s for s in (stores or '').split(',') if s)
+
+
+class ImportProgress(collections.namedtuple(
+        'ImportProgress',
+        ['total', 'succeeded', 'partial', 'failed', 'importing', 'elapsed'])):
+    """A named tuple describing the progress of a batch of image imports.
+
+    It is put into the ``status_queue`` of
+    :meth:`~openstack.image.v2._proxy.Proxy.import_images` every time the
+    amount of finished imports changes.
+
+    :ivar ~.total: Amount of images imported.
+    :ivar ~.succeeded: Amount of images imported into all stores.
+    :ivar ~.partial: Amount of images active, but not in all stores.
+    :ivar ~.failed: Amount of images whose import failed.
+    :ivar ~.importing: Amount of images still being imported.
+    :ivar ~.elapsed: Seconds since the imports started.
+    """
+    __slots__ = ()
+
+
+class ImageImport:
+    """The import of an image in a batch and its state.
+
+    :ivar image: The :class:`~openstack.image.v2.image.Image`, as of the
+        last poll.
+    :ivar str method: The import method.
+    :ivar str status: One of ``pending``, ``importing``, ``success``,
+        ``partial`` (the image is active, but the import failed for some
+        stores) or ``failed``.
+    :ivar set active_stores: Stores the image is available in.
+    :ivar set importing_stores: Stores the image is being imported to.
+    :ivar set failed_stores: Stores the import failed for.
+    :ivar int retries: Amount of times the failed stores were retried.
+    :ivar error: The exception starting the import raised, if any.
+    """
+
+    def __init__(self, image, method, uri=None, filename=None, data=None):
+        self.image = image
+        self.method = method
+        self.uri = uri
+        self.filename = filename
+        self.data = data
+        self.status = PENDING
+        self.active_stores = set()
+        self.importing_stores = set()
+        self.failed_stores = set()
+        self.retries = 0
+        self.error = None
+
+    def __repr__(self):
+        return '<ImageImport {id} {status}>'.format(
+            id=self.image.id, status=self.status)
+
+    def update(self, image):
+        """Update the state from the image as returned by the service."""
+        self.image = image
+        self.active_stores = _split(image.stores)
+        self.importing_stores = _split(image.importing_to_stores)
+        # NOTE: Stores retried successfully may still be listed as failed
+        self.failed_stores = (
+            _split(image.failed_import_stores) - self.active_stores)
+        if self.importing_stores or image.status in _IMPORTING_STATUSES:
+            self.status = IMPORTING
+        elif image.status == 'active':
+            self.status = PARTIAL if self.failed_stores else SUCCESS
+        else:
+            self.status = FAILED
+
+
+class BatchImport:
+    """Start and await the imports of several images.
+
+    :param proxy: The image :class:`~openstack.image.v2._proxy.Proxy`.
+    :param imports: List of :class:`ImageImport`.
+    :param stores: List of :class:`~openstack.image.v2.service_info.Store`
+        to import the images into.
+    :param bool all_stores: Import the images into all stores.
+    :param bool all_stores_must_succeed: Fail the import of an image
+        unless it succeeds for all stores.
+    :param int retries: Times the stores an image failed for are retried.
+    :param status_queue: Optional queue to put :class:`ImportProgress`
+        records into.
+    """
+
+    def __init__(
+        self, proxy, imports, stores=None, all_stores=None,
+        all_stores_must_succeed=None, retries=1, status_queue=None,
+    ):
+        self.proxy = proxy
+        self.imports = imports
+        self.stores = stores
+        self.all_stores = all_stores
+        self.all_stores_must_succeed = all_stores_must_succeed
+        self.retries = retries
+        self.status_queue = status_queue
+        self._start = None
+        self._last_reported = None
+
+    def _import(self, item, stores=None):
+        image = item.image
+        method = item.method
+        all_stores = self.all_stores
+        if stores is None:
+            stores = self.stores
+        else:
+            all_stores = None
+            if image.status == 'active':
+                # The data is in a store already
+                method = 'copy-image'
+        try:
+            if method == 'glance-direct':
+                if item.filename:
+                    image.data = open(item.filename, 'rb')
+                else:
+                    image.data = item.data
+                image.stage(self.proxy)
+            response = image.import_image(
+                self.proxy, method=method, uri=item.uri,
+                stores=stores, all_stores=all_stores,
+                all_stores_must_succeed=self.all_stores_must_succeed)
+            exceptions.raise_from_response(response)
+        except Exception as e:
+            self.proxy.log.debug(
+                "Cannot import image %s", image.id, exc_info=True)
+            item.error = e
+            item.status = FAILED
+        else:
+            item.status = IMPORTING
+
+    def _can_retry(self, item):
+        if (item.status not in (PARTIAL, FAILED)
+                or not item.failed_stores
+                or item.retries >= self.retries):
+            return False
+        # Staged data is gone after a failed import, and data from a
+        # stream cannot be read again.
+        return (
+            item.image.status == 'active'
+            or item.method == 'web-download'
+            or (item.method == 'glance-direct' and item.filename))
+
+    def _run_all(self, calls):
+        """Run the calls concurrently in the executor of the connection."""
+        executor = self.proxy._connection._pool_executor
+        futures = [executor.submit(*call) for call in calls]
+        for future in futures:
+            future.result()
+
+    def start(self):
+        """Start the imports of all images concurrently."""
+        self._start = time.monotonic()
+        self._run_all([(self._import, item) for item in self.imports])
+        self._report()
+
+    def poll(self):
+        """Update the state of all images being imported.
+
+        :returns: True if any image is still being imported.
+        """
+        pending = {
+            item.image.id: item for item in self.imports
+            if item.status == IMPORTING}
+        ids = list(pending)
+        for i in range(0, len(ids), _POLL_CHUNK):
+            chunk = ids[i:i + _POLL_CHUNK]
+            for image in self.proxy.images(id='in:' + ','.join(chunk)):
+                item = pending.pop(image.id, None)
+                if item is not None:
+                    item.update(image)
+        # Images not listed, i.e. hidden ones
+        for item in pending.values():
+            item.update(item.image.fetch(self.proxy))
+
+        retry = [item for item in self.imports if self._can_retry(item)]
+        for item in retry:
+            item.retries += 1
+        self._run_all([
+            (self._import, item, [
+                self.proxy._get_resource(_si.Store, store)
+                for store in sorted(item.failed_stores)])
+            for item in retry])
+        self._report()
+        return any(item.status == IMPORTING for item in self.imports)
+
+    def get_progress(self):
+        """Get the :class:`ImportProgress` of the imports."""
+        counts = collections.Counter(item.status for item in self.imports)
+        return ImportProgress(
+            len(self.imports), counts[SUCCESS], counts[PARTIAL],
+            counts[FAILED], counts[IMPORTING] + counts[PENDING],
+            time.monotonic() - self._start)
+
+    def _report(self):
+        progress = self.get_progress()
+        if self.status_queue is not None and (
+                progress[:5] != self._last_reported):
+            self.status_queue.put(progress)
+        self._last_reported = progress[:5]
+
+    def wait(self, interval=2, timeout=3600):
+        """Poll the imports until none is in progress any more.
+
+        :raises: :class:`~openstack.exceptions.ResourceTimeout` if images are
+            still being imported after ``timeout`` seconds.
+        """
+        for count in utils.iterate_timeout(
+                timeout,
+                "Timeout waiting for the import of {count} images".format(
+                    count=len(self.imports)),
+                wait=interval):
+            if not self.poll():
+                return
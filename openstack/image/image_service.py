@@ -10,8 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.image.v1 import _proxy as _proxy_v1
-from openstack.image.v2 import _proxy as _proxy_v2
 from openstack import service_description
 
 
@@ -19,6 +17,6 @@ class ImageService(service_description.ServiceDescription):
     """The image service."""
 
     supported_versions = {
-        '1': _proxy_v1.Proxy,
-        '2': _proxy_v2.Proxy,
+        '1': 'openstack.image.v1._proxy.Proxy',
+        '2': 'openstack.image.v2._proxy.Proxy',
     }
@@ -48,6 +48,7 @@ class Proxy(_base_proxy.BaseImageProxy):
         stores=None,
         all_stores=None,
         all_stores_must_succeed=None,
+        hash_while_uploading=False,
         **image_kwargs,
     ):
         if use_import:
@@ -56,6 +57,9 @@ class Proxy(_base_proxy.BaseImageProxy):
         if stores or all_stores or all_stores_must_succeed:
             raise exceptions.InvalidRequest(
                 "Glance v1 does not support stores")
+        if hash_while_uploading:
+            raise exceptions.InvalidRequest(
+                "Glance v1 does not support hashing while uploading")
         # NOTE(mordred) wait and timeout parameters are unused, but
         # are present for ease at calling site.
         if filename and not data:
@@ -112,6 +116,12 @@ class Proxy(_base_proxy.BaseImageProxy):
         self._connection.list_images.invalidate(self._connection)
         return True
 
+    def _import_image_copy(
+        self, source, image, name, meta, wait, timeout, **image_kwargs
+    ):
+        # Glance v1 cannot import image data from a URL
+        return None
+
     def _existing_image(self, **kwargs):
         return _image.Image.existing(connection=self._connection, **kwargs)
 
@@ -181,7 +191,7 @@ class Proxy(_base_proxy.BaseImageProxy):
         return self._update(_image.Image, image, **attrs)
 
     def download_image(self, image, stream=False, output=None,
-                       chunk_size=1024):
+                       chunk_size=None, parallel=1):
         """Download an image
 
         This will download an image to memory when ``stream=False``, or allow
@@ -208,7 +218,10 @@ class Proxy(_base_proxy.BaseImageProxy):
             contents of the response.
         :param output: Either a file object or a path to store data into.
         :param int chunk_size: size in bytes to read from the wire and buffer
-            at one time. Defaults to 1024
+            at one time when writing to ``output``. Defaults to 1 MiB
+        :param int parallel: Amount of parallel Range requests downloading
+            parts of the image when ``output`` is a path. Every request
+            buffers a part of 16 MiB.
 
         :returns: When output is not given - the bytes comprising the given
             Image when stream is False, otherwise a :class:`requests.Response`
@@ -219,4 +232,5 @@ class Proxy(_base_proxy.BaseImageProxy):
         image = self._get_resource(_image.Image, image)
 
         return image.download(
-            self, stream=stream, output=output, chunk_size=chunk_size)
+            self, stream=stream, output=output, chunk_size=chunk_size,
+            parallel=parallel)
@@ -11,10 +11,12 @@
 # under the License.
 
 import time
+from urllib import parse
 import warnings
 
 from openstack import exceptions
 from openstack.image import _base_proxy
+from openstack.image import _import
 from openstack.image.v2 import image as _image
 from openstack.image.v2 import member as _member
 from openstack.image.v2 import metadef_namespace as _metadef_namespace
@@ -30,6 +32,8 @@ from openstack import utils
 _IMAGE_ERROR_396 = "Image cannot be imported. Error code: '396'"
 _INT_PROPERTIES = ('min_disk', 'min_ram', 'size', 'virtual_size')
 _RAW_PROPERTIES = ('is_protected', 'protected', 'tags')
+# Seconds the data of an image reused from the object store is available for
+_COPY_URL_SECONDS = 24 * 60 * 60
 
 
 class Proxy(_base_proxy.BaseImageProxy):
@@ -43,6 +47,10 @@ class Proxy(_base_proxy.BaseImageProxy):
         "task": _task.Task
     }
 
+    # Hashes calculated while uploading: the owner_specified ones and the
+    # default os_hash_algo of Glance
+    _UPLOAD_HASH_ALGORITHMS = ('md5', 'sha256', 'sha512')
+
     # ====== IMAGES ======
     def _create_image(self, **kwargs):
         """Create image resource from attributes
@@ -129,6 +137,85 @@ class Proxy(_base_proxy.BaseImageProxy):
             all_stores_must_succeed=all_stores_must_succeed,
         )
 
+    def import_images(
+        self, images, method='copy-image',
+        stores=None,
+        all_stores=None,
+        all_stores_must_succeed=None,
+        retries=1,
+        wait=True,
+        interval=2,
+        timeout=3600,
+        status_queue=None,
+    ):
+        """Import several images into several stores concurrently
+
+        The data of the images is staged and the imports are started
+        concurrently. The imports are then awaited together, by listing all
+        the images being imported once per interval. The stores an image
+        failed to be imported into are retried, as ``copy-image`` when the
+        image is active already.
+
+        :param images: List of images to import. Each can be the ID of an
+            image, a :class:`~openstack.image.v2.image.Image` instance or a
+            dict with the ``image`` and either the ``filename`` or ``data``
+            to stage and import with ``glance-direct``, or the ``uri`` to
+            import with ``web-download``.
+        :param method: Method to import the images given without data or
+            URI with. Defaults to ``copy-image``, which imports active images
+            into further stores.
+        :param stores: List of stores to import the images into. List values
+            can be the id of a store or a
+            :class:`~openstack.image.v2.service_info.Store` instance.
+        :param all_stores: Import the images into all available stores.
+            Mutually exclusive with ``stores``.
+        :param all_stores_must_succeed: Fail the import of an image when it
+            fails for any store.
+        :param int retries: Times the failed stores of an image are
+            retried.
+        :param bool wait: Wait for the imports to finish. Defaults to True.
+        :param interval: Seconds between the listings of the images.
+        :param timeout: Seconds to wait for the imports to finish.
+        :param queue status_queue: Optional queue to put
+            :class:`~openstack.image._import.ImportProgress` records into.
+
+        :returns: A list of :class:`~openstack.image._import.ImageImport`
+            with the state of the import of every image, in the order of
+            ``images``.
+        :raises: :class:`~openstack.exceptions.ResourceTimeout` if images
+            are still being imported after ``timeout`` seconds.
+        """
+        if all_stores and stores:
+            raise exceptions.InvalidRequest(
+                "all_stores is mutually exclusive with stores")
+        stores = [self._get_resource(_si.Store, s) for s in stores or []]
+
+        imports = []
+        for item in images:
+            if not isinstance(item, dict):
+                item = {'image': item}
+            if item.get('filename') or item.get('data'):
+                item_method = 'glance-direct'
+            elif item.get('uri'):
+                item_method = 'web-download'
+            else:
+                item_method = method
+            imports.append(_import.ImageImport(
+                self._get_resource(_image.Image, item['image']),
+                item_method,
+                uri=item.get('uri'),
+                filename=item.get('filename'),
+                data=item.get('data')))
+
+        batch = _import.BatchImport(
+            self, imports, stores=stores, all_stores=all_stores,
+            all_stores_must_succeed=all_stores_must_succeed,
+            retries=retries, status_queue=status_queue)
+        batch.start()
+        if wait:
+            batch.wait(interval=interval, timeout=timeout)
+        return imports
+
     def stage_image(self, image, filename=None, data=None):
         """Stage binary image data
 
@@ -212,6 +299,7 @@ class Proxy(_base_proxy.BaseImageProxy):
         stores=None,
         all_stores=None,
         all_stores_must_succeed=None,
+        hash_while_uploading=False,
         **kwargs
     ):
         # We can never have nice things. Glance v1 took "is_public" as a
@@ -245,6 +333,7 @@ class Proxy(_base_proxy.BaseImageProxy):
                     stores=stores,
                     all_stores=all_stores,
                     all_stores_must_succeed=all_stores_must_succeed,
+                    hash_while_uploading=hash_while_uploading,
                     **kwargs)
         except exceptions.SDKException:
             self.log.debug("Image creation failed", exc_info=True)
@@ -274,12 +363,16 @@ class Proxy(_base_proxy.BaseImageProxy):
         stores=None,
         all_stores=None,
         all_stores_must_succeed=None,
+        hash_while_uploading=False,
         **image_kwargs,
     ):
         if filename and not data:
             image_data = open(filename, 'rb')
         else:
             image_data = data
+        if hash_while_uploading:
+            image_data = utils._HashingReader(
+                image_data, algorithms=self._UPLOAD_HASH_ALGORITHMS)
 
         properties = image_kwargs.pop('properties', {})
 
@@ -308,6 +401,10 @@ class Proxy(_base_proxy.BaseImageProxy):
                 image.stage(self)
                 image.import_image(self)
 
+            if hash_while_uploading:
+                image = self._set_uploaded_hashes(
+                    image, image_data, validate_checksum)
+
             # image_kwargs are flat here
             md5 = image_kwargs.get(self._IMAGE_MD5_KEY)
             sha256 = image_kwargs.get(self._IMAGE_SHA256_KEY)
@@ -328,6 +425,28 @@ class Proxy(_base_proxy.BaseImageProxy):
 
         return image
 
+    def _set_uploaded_hashes(self, image, reader, validate_checksum):
+        # Set the hashes calculated while uploading, Glance returns the ones
+        # it calculated in the same response.
+        md5 = reader.hexdigest('md5')
+        # NOTE: Properties not passed to the update are removed
+        img_props = image.properties.copy()
+        img_props[self._IMAGE_MD5_KEY] = md5
+        img_props[self._IMAGE_SHA256_KEY] = reader.hexdigest('sha256')
+        image = self.update_image(image, **img_props)
+        if not validate_checksum:
+            return image
+        # NOTE: The import API calculates the hashes asynchronously, they
+        # may not be there yet.
+        valid = not image.checksum or image.checksum == md5
+        if (image.hash_algo in self._UPLOAD_HASH_ALGORITHMS
+                and image.hash_value):
+            valid = valid and (
+                image.hash_value == reader.hexdigest(image.hash_algo))
+        if not valid:
+            raise Exception('Image checksum verification failed')
+        return image
+
     def _upload_image_task(
             self, name, filename, data,
             wait, timeout, meta, **image_kwargs):
@@ -419,11 +538,90 @@ class Proxy(_base_proxy.BaseImageProxy):
         self._connection.list_images.invalidate(self._connection)
         return True
 
+    def find_images_by_content(self, md5=None, sha256=None, hash_value=None):
+        # Let Glance filter the images on the hashes, and only look through
+        # all of them when it does not allow that
+        queries = []
+        if hash_value:
+            queries.append({'hash_value': hash_value})
+        if sha256:
+            queries.append({self._IMAGE_SHA256_KEY: sha256})
+        try:
+            for query in queries:
+                images = [
+                    image for image in self.images(status='active', **query)
+                    if self._has_content(
+                        image, md5=md5, sha256=sha256, hash_value=hash_value)
+                ]
+                if images:
+                    return images
+        except exceptions.BadRequestException:
+            self.log.debug(
+                "Filtering images on their hashes failed, looking through "
+                "all images", exc_info=True)
+            return super().find_images_by_content(
+                md5=md5, sha256=sha256, hash_value=hash_value)
+        return []
+
+    def _get_copy_url(self, source, image):
+        # Temporary URL of the copy of the image data kept in the object
+        # store of the source cloud, if there is one
+        props = image.properties or {}
+        path = props.get(
+            self._IMAGE_OBJECT_KEY, props.get(self._SHADE_IMAGE_OBJECT_KEY))
+        if (not path or '/' not in path
+                or not source.has_service('object-store')):
+            return None
+        container, name = path.split('/', 1)
+        try:
+            source.object_store.get_object_metadata(name, container)
+            endpoint = parse.urlparse(source.object_store.get_endpoint())
+            temp_url = source.object_store.generate_temp_url(
+                '/'.join([endpoint.path.rstrip('/'), container, name]),
+                _COPY_URL_SECONDS, 'GET')
+        except (exceptions.SDKException, ValueError):
+            self.log.debug(
+                "No temporary URL for the data of image %s", image.id,
+                exc_info=True)
+            return None
+        temp_path, query = temp_url.split('?', 1)
+        return '{scheme}://{netloc}{path}?{query}'.format(
+            scheme=endpoint.scheme, netloc=endpoint.netloc,
+            path=parse.quote(temp_path), query=query)
+
+    def _import_image_copy(
+        self, source, image, name, meta, wait, timeout, **image_kwargs
+    ):
+        uri = self._get_copy_url(source, image)
+        if not uri:
+            return None
+        try:
+            import_methods = self.get_import_info().import_methods or {}
+        except exceptions.ResourceNotFound:
+            return None
+        if 'web-download' not in import_methods.get('value', []):
+            return None
+
+        properties = image_kwargs.pop('properties', {})
+        image_kwargs.update(self._make_v2_image_params(meta, properties))
+        image_kwargs['name'] = name
+        new_image = self._create(_image.Image, **image_kwargs)
+        result = self.import_images(
+            [{'image': new_image, 'uri': uri}], retries=0,
+            wait=wait, timeout=timeout)[0]
+        if result.status == _import.FAILED:
+            self.log.debug(
+                "Importing image %(name)s from the data of image %(id)s "
+                "failed", {'name': name, 'id': image.id})
+            self.delete_image(new_image.id)
+            return None
+        return result.image
+
     def _existing_image(self, **kwargs):
         return _image.Image.existing(connection=self._connection, **kwargs)
 
     def download_image(self, image, stream=False, output=None,
-                       chunk_size=1024):
+                       chunk_size=None, parallel=1):
         """Download an image
 
         This will download an image to memory when ``stream=False``, or allow
@@ -450,7 +648,10 @@ class Proxy(_base_proxy.BaseImageProxy):
             contents of the response.
         :param output: Either a file object or a path to store data into.
         :param int chunk_size: size in bytes to read from the wire and buffer
-            at one time. Defaults to 1024
+            at one time when writing to ``output``. Defaults to 1 MiB
+        :param int parallel: Amount of parallel Range requests downloading
+            parts of the image when ``output`` is a path. Every request
+            buffers a part of 16 MiB.
 
         :returns: When output is not given - the bytes comprising the given
             Image when stream is False, otherwise a :class:`requests.Response`
@@ -461,7 +662,8 @@ class Proxy(_base_proxy.BaseImageProxy):
         image = self._get_resource(_image.Image, image)
 
         return image.download(
-            self, stream=stream, output=output, chunk_size=chunk_size)
+            self, stream=stream, output=output, chunk_size=chunk_size,
+            parallel=parallel)
 
     def delete_image(self, image, *, store=None, ignore_missing=True):
         """Delete an image
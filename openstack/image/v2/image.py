@@ -50,7 +50,10 @@ class Image(resource.Resource, tag.TagMixin, _download.DownloadMixin):
         "tag",
         "created_at",
         "updated_at",
+        # NOTE: Glance filters on any image property
+        "owner_specified.openstack.sha256",
         is_hidden="os_hidden",
+        hash_value="os_hash_value",
     )
 
     # NOTE: Do not add "self" support here. If you've used Python before,
@@ -116,6 +119,13 @@ class Image(resource.Resource, tag.TagMixin, _download.DownloadMixin):
     #: marked default. Valid values are: file, s3, rbd, swift, cinder,
     #: gridfs, sheepdog, or vsphere.
     store = resource.Body('store')
+    #: Comma separated list of the stores the image data is available in,
+    #: when multiple stores are enabled.
+    stores = resource.Body('stores')
+    #: Comma separated list of the stores the image is being imported to.
+    importing_to_stores = resource.Body('os_glance_importing_to_stores')
+    #: Comma separated list of the stores the import of the image failed for.
+    failed_import_stores = resource.Body('os_glance_failed_import')
     #: The image status.
     status = resource.Body('status')
     #: The date and time when the image was updated.
@@ -301,7 +311,10 @@ class Image(resource.Resource, tag.TagMixin, _download.DownloadMixin):
     def import_image(self, session, method='glance-direct', uri=None,
                      store=None, stores=None, all_stores=None,
                      all_stores_must_succeed=None):
-        """Import Image via interoperable image import process"""
+        """Import Image via interoperable image import process
+
+        :returns: The server response
+        """
         if all_stores and (store or stores):
             raise exceptions.InvalidRequest(
                 "all_stores is mutually exclusive with"
@@ -335,7 +348,7 @@ class Image(resource.Resource, tag.TagMixin, _download.DownloadMixin):
         # Backward compat
         if store is not None:
             headers = {'X-Image-Meta-Store': store.id}
-        session.post(url, json=json, headers=headers)
+        return session.post(url, json=json, headers=headers)
 
     def _consume_header_attrs(self, attrs):
         self.image_import_methods = []
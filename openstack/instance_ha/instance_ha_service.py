@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from openstack.instance_ha.v1 import _proxy
 from openstack import service_description
 
 
@@ -20,5 +19,5 @@ class InstanceHaService(service_description.ServiceDescription):
     """The HA service."""
 
     supported_versions = {
-        '1': _proxy.Proxy,
+        '1': 'openstack.instance_ha.v1._proxy.Proxy',
     }
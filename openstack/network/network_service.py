@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.network.v2 import _proxy
 from openstack import service_description
 
 
@@ -18,5 +17,5 @@ class NetworkService(service_description.ServiceDescription):
     """The network service."""
 
     supported_versions = {
-        '2': _proxy.Proxy,
+        '2': 'openstack.network.v2._proxy.Proxy',
     }
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+
 from openstack import exceptions
 from openstack.network.v2 import address_group as _address_group
 from openstack.network.v2 import address_scope as _address_scope
@@ -69,6 +71,14 @@ from openstack.network.v2 import vpn_ipsec_site_connection as \
 from openstack.network.v2 import vpn_service as _vpn_service
 from openstack import proxy
 
+_ROUTER_INTERFACE_OWNERS = (
+    'network:router_interface',
+    'network:router_interface_distributed',
+    'network:ha_router_replicated_interface',
+)
+# Amount of IDs passed in a single filter query during the cleanup
+_CLEANUP_FILTER_CHUNK = 50
+
 
 class Proxy(proxy.Proxy):
     _resource_registry = {
@@ -5135,29 +5145,95 @@ class Proxy(proxy.Proxy):
     def _get_cleanup_dependencies(self):
         return {
             'network': {
-                'before': ['identity']
+                'before': ['identity'],
+                # Ports, subnets and networks wait only for the servers
+                # plugged into them
+                'per_resource': ['compute'],
             }
         }
 
+    def _get_cleanup_snapshot(self, project_id):
+        """Fetch all resources of the project relevant for the cleanup.
+
+        All resource types are listed concurrently, once per project, so
+        that the cleanup decisions can be taken without further requests.
+        Ports without project (i.e. router gateway ports) are additionally
+        fetched for the routers of the project.
+
+        :returns: dict with lists of ``networks``, ``ports``, ``subnets``,
+            ``routers``, ``ips`` and ``security_groups``.
+        """
+        listings = {
+            'networks': self.networks,
+            'ports': self.ports,
+            'subnets': self.subnets,
+            'routers': self.routers,
+            'ips': self.ips,
+            'security_groups': self.security_groups,
+        }
+
+        def _list(fn):
+            return list(fn(project_id=project_id))
+
+        executor = self._connection._pool_executor
+        futures = {
+            key: executor.submit(_list, fn) for key, fn in listings.items()}
+        snapshot = {}
+        for key, future in futures.items():
+            # The cleanup itself runs in the executor, the listings not
+            # started yet are run here so that they cannot wait for it.
+            if future.cancel():
+                snapshot[key] = _list(listings[key])
+            else:
+                snapshot[key] = future.result()
+
+        known_ports = set(port.id for port in snapshot['ports'])
+        router_ids = [router.id for router in snapshot['routers']]
+        for i in range(0, len(router_ids), _CLEANUP_FILTER_CHUNK):
+            chunk = router_ids[i:i + _CLEANUP_FILTER_CHUNK]
+            for port in self.ports(device_id=chunk):
+                if port.id not in known_ports:
+                    known_ports.add(port.id)
+                    snapshot['ports'].append(port)
+        return snapshot
+
     def _service_cleanup(self, dry_run=True, client_status_queue=None,
                          identified_resources=None,
-                         filters=None, resource_evaluation_fn=None):
+                         filters=None, resource_evaluation_fn=None,
+                         cleanup_graph=None):
         project_id = self.get_project_id()
+        snapshot = self._get_cleanup_snapshot(project_id)
+        ports_by_network = collections.defaultdict(list)
+        ports_by_device = collections.defaultdict(list)
+        for port in snapshot['ports']:
+            ports_by_network[port.network_id].append(port)
+            ports_by_device[port.device_id].append(port)
+        subnets_by_network = collections.defaultdict(list)
+        for subnet in snapshot['subnets']:
+            subnets_by_network[subnet.network_id].append(subnet)
+        routers_by_id = {router.id: router for router in snapshot['routers']}
+        # Router interfaces which are going to be removed
+        removed_interfaces = set()
+
         # Delete floating_ips in the project if no filters defined OR all
         # filters are matching and port_id is empty
-        for obj in self.ips(project_id=project_id):
-            self._service_cleanup_del_res(
+        fips = []
+        for obj in snapshot['ips']:
+            if self._service_cleanup_del_res(
                 self.delete_ip,
                 obj,
                 dry_run=dry_run,
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=fip_cleanup_evaluation)
+                resource_evaluation_fn=fip_cleanup_evaluation,
+                cleanup_graph=cleanup_graph
+            ):
+                fips.append(obj.id)
 
         # Delete (try to delete) all security groups in the project
         # Let's hope we can't drop SG in use
-        for obj in self.security_groups(project_id=project_id):
+        for obj in snapshot['security_groups']:
             if obj.name != 'default':
                 self._service_cleanup_del_res(
                     self.delete_security_group,
@@ -5166,30 +5242,31 @@ class Proxy(proxy.Proxy):
                     client_status_queue=client_status_queue,
                     identified_resources=identified_resources,
                     filters=filters,
-                    resource_evaluation_fn=resource_evaluation_fn)
+                    resource_evaluation_fn=resource_evaluation_fn,
+                    cleanup_graph=cleanup_graph,
+                    depends_on=[cleanup_graph.barrier('compute')]
+                    if cleanup_graph is not None else None)
 
         # Networks are crazy, try to delete router+net+subnet
         # if there are no "other" ports allocated on the net
-        for net in self.networks(project_id=project_id):
+        for net in snapshot['networks']:
             network_has_ports_allocated = False
             router_if = list()
-            for port in self.ports(
-                project_id=project_id,
-                network_id=net.id
-            ):
+            unowned_ports = list()
+            # Devices (i.e. servers) plugged into the network
+            devices = set()
+            # Ports of the devices which are going to be deleted
+            device_ports = list()
+            for port in ports_by_network[net.id]:
                 self.log.debug('Looking at port %s' % port)
-                if port.device_owner in [
-                    'network:router_interface',
-                    'network:router_interface_distributed',
-                    'network:ha_router_replicated_interface'
-                ]:
+                if port.device_owner in _ROUTER_INTERFACE_OWNERS:
                     router_if.append(port)
                 elif port.device_owner == 'network:dhcp':
                     # we don't treat DHCP as a real port
                     continue
                 elif port.device_owner is None or port.device_owner == '':
                     # Nobody owns the port - go with it
-                    continue
+                    unowned_ports.append(port)
                 elif (
                     identified_resources
                     and port.device_id not in identified_resources
@@ -5197,6 +5274,13 @@ class Proxy(proxy.Proxy):
                     # It seems some no other service identified this resource
                     # to be deleted. We can assume it doesn't count
                     network_has_ports_allocated = True
+                else:
+                    devices.add(port.device_id)
+                    if (
+                        identified_resources
+                        and port.device_id in identified_resources
+                    ):
+                        device_ports.append(port)
             if network_has_ports_allocated:
                 # If some ports are on net - we cannot delete it
                 continue
@@ -5218,42 +5302,73 @@ class Proxy(proxy.Proxy):
             for port in router_if:
                 if client_status_queue:
                     client_status_queue.put(port)
+                removed_interfaces.add(port.id)
                 if not dry_run:
-                    try:
-                        self.remove_interface_from_router(
-                            router=port.device_id,
-                            port_id=port.id)
-                    except exceptions.SDKException:
-                        self.log.error('Cannot delete object %s' % obj)
+                    if cleanup_graph is not None:
+                        # Floating IPs may still require the router interface
+                        cleanup_graph.add(
+                            self.service_type, port,
+                            self._remove_router_interface_port,
+                            depends_on=fips)
+                    else:
+                        try:
+                            self._remove_router_interface_port(port)
+                        except exceptions.SDKException:
+                            self.log.error('Cannot delete object %s' % port)
+                router = routers_by_id.get(port.device_id)
+                if router is None:
+                    # Router of another project plugged into our network
+                    continue
+                interfaces = [
+                    p.id for p in ports_by_device[router.id]
+                    if p.device_owner in _ROUTER_INTERFACE_OWNERS]
+                if not removed_interfaces.issuperset(interfaces):
+                    # Router is still connected to some other network
+                    continue
                 # router disconnected, drop it
                 self._service_cleanup_del_res(
                     self.delete_router,
-                    self.get_router(port.device_id),
+                    router,
                     dry_run=dry_run,
                     client_status_queue=client_status_queue,
                     identified_resources=identified_resources,
                     filters=None,
-                    resource_evaluation_fn=None)
+                    resource_evaluation_fn=None,
+                    cleanup_graph=cleanup_graph,
+                    depends_on=interfaces)
             # Drop ports not belonging to anybody
-            for port in self.ports(
-                project_id=project_id,
-                network_id=net.id
-            ):
-                if port.device_owner is None or port.device_owner == '':
-                    self._service_cleanup_del_res(
-                        self.delete_port,
-                        port,
-                        dry_run=dry_run,
-                        client_status_queue=client_status_queue,
-                        identified_resources=identified_resources,
-                        filters=None,
-                        resource_evaluation_fn=None)
+            for port in unowned_ports:
+                self._service_cleanup_del_res(
+                    self.delete_port,
+                    port,
+                    dry_run=dry_run,
+                    client_status_queue=client_status_queue,
+                    identified_resources=identified_resources,
+                    filters=None,
+                    resource_evaluation_fn=None,
+                    cleanup_graph=cleanup_graph)
+
+            # Ports created by the user stay once their device is deleted,
+            # the ones created along with the device are gone by then
+            for port in device_ports:
+                self._service_cleanup_del_res(
+                    self.delete_port,
+                    port,
+                    dry_run=dry_run,
+                    client_status_queue=client_status_queue,
+                    identified_resources=identified_resources,
+                    filters=None,
+                    resource_evaluation_fn=None,
+                    cleanup_graph=cleanup_graph,
+                    depends_on=[port.device_id])
+
+            # Subnets and the network can only go once nothing is plugged in
+            net_depends_on = list(devices) + [
+                port.id for port in unowned_ports + router_if + device_ports]
 
             # Drop all subnets in the net (no further conditions)
-            for obj in self.subnets(
-                project_id=project_id,
-                network_id=net.id
-            ):
+            subnets = []
+            for obj in subnets_by_network[net.id]:
                 self._service_cleanup_del_res(
                     self.delete_subnet,
                     obj,
@@ -5261,7 +5376,10 @@ class Proxy(proxy.Proxy):
                     client_status_queue=client_status_queue,
                     identified_resources=identified_resources,
                     filters=None,
-                    resource_evaluation_fn=None)
+                    resource_evaluation_fn=None,
+                    cleanup_graph=cleanup_graph,
+                    depends_on=net_depends_on)
+                subnets.append(obj.id)
 
             # And now the network itself (we are here definitely only if we
             # need that)
@@ -5272,12 +5390,13 @@ class Proxy(proxy.Proxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=None,
-                resource_evaluation_fn=None)
+                resource_evaluation_fn=None,
+                cleanup_graph=cleanup_graph,
+                depends_on=net_depends_on + subnets)
 
         # It might happen, that we have routers not attached to anything
-        for obj in self.routers():
-            ports = list(self.ports(device_id=obj.id))
-            if len(ports) == 0:
+        for obj in snapshot['routers']:
+            if len(ports_by_device[obj.id]) == 0:
                 self._service_cleanup_del_res(
                     self.delete_router,
                     obj,
@@ -5285,7 +5404,12 @@ class Proxy(proxy.Proxy):
                     client_status_queue=client_status_queue,
                     identified_resources=identified_resources,
                     filters=None,
-                    resource_evaluation_fn=None)
+                    resource_evaluation_fn=None,
+                    cleanup_graph=cleanup_graph)
+
+    def _remove_router_interface_port(self, port):
+        self.remove_interface_from_router(
+            router=port.device_id, port_id=port.id)
 
 
 def fip_cleanup_evaluation(obj, identified_resources=None, filters=None):
@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from openstack.object_store.v1 import _proxy
 from openstack import service_description
 
 
@@ -18,5 +17,5 @@ class ObjectStoreService(service_description.ServiceDescription):
     """The object store service."""
 
     supported_versions = {
-        '1': _proxy.Proxy,
+        '1': 'openstack.object_store.v1._proxy.Proxy',
     }
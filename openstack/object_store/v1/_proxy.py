@@ -1032,7 +1032,8 @@ class Proxy(proxy.Proxy):
         client_status_queue=None,
         identified_resources=None,
         filters=None,
-        resource_evaluation_fn=None
+        resource_evaluation_fn=None,
+        cleanup_graph=None,
     ):
         is_bulk_delete_supported = False
         bulk_delete_max_per_request = None
@@ -1083,7 +1084,8 @@ class Proxy(proxy.Proxy):
                     client_status_queue=client_status_queue,
                     identified_resources=identified_resources,
                     filters=filters,
-                    resource_evaluation_fn=resource_evaluation_fn)
+                    resource_evaluation_fn=resource_evaluation_fn,
+                    cleanup_graph=cleanup_graph)
 
     def _bulk_delete(self, elements, dry_run=False):
         data = "\n".join([parse.quote(x) for x in elements])
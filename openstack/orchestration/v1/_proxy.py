@@ -497,7 +497,8 @@ class Proxy(proxy.Proxy):
 
     def _service_cleanup(self, dry_run=True, client_status_queue=None,
                          identified_resources=None,
-                         filters=None, resource_evaluation_fn=None):
+                         filters=None, resource_evaluation_fn=None,
+                         cleanup_graph=None):
         stacks = []
         for obj in self.stacks():
             need_delete = self._service_cleanup_del_res(
@@ -507,9 +508,14 @@ class Proxy(proxy.Proxy):
                 client_status_queue=client_status_queue,
                 identified_resources=identified_resources,
                 filters=filters,
-                resource_evaluation_fn=resource_evaluation_fn)
+                resource_evaluation_fn=resource_evaluation_fn,
+                cleanup_graph=cleanup_graph,
+                wait_list_fn=self.stacks)
             if not dry_run and need_delete:
                 stacks.append(obj)
 
+        if cleanup_graph is not None:
+            # Stacks are awaited by the cleanup graph
+            return
         for stack in stacks:
             self.wait_for_delete(stack)
@@ -11,6 +11,7 @@
 # under the License.
 
 import functools
+import time
 import urllib
 from urllib.parse import urlparse
 
@@ -23,11 +24,19 @@ except ImportError:
 import iso8601
 import jmespath
 from keystoneauth1 import adapter
+from keystoneauth1 import exceptions as ks_exc
+import requests
 
+from openstack import _adaptive_limit
+from openstack import _circuit_breaker
+from openstack import _http_pool
 from openstack import _log
 from openstack import exceptions
 from openstack import resource
 
+# Seconds between the reports of the HTTP pool utilisation to StatsD
+_POOL_STATS_INTERVAL = 10
+
 
 # The _check_resource decorator is used on Proxy methods to ensure that
 # the `actual` argument is in fact the type of the `expected` argument.
@@ -92,6 +101,9 @@ class Proxy(adapter.Adapter):
         prometheus_histogram=None,
         influxdb_config=None,
         influxdb_client=None,
+        http_pool_size=None,
+        adaptive_limiter=None,
+        circuit_breaker=None,
         *args,
         **kwargs
     ):
@@ -100,6 +112,12 @@ class Proxy(adapter.Adapter):
         kwargs.setdefault(
             'retriable_status_codes', self.retriable_status_codes
         )
+        if adaptive_limiter is not None:
+            # Retry throttled requests after their Retry-After, if status
+            # code retries are enabled.
+            kwargs['retriable_status_codes'] = sorted(
+                set(kwargs['retriable_status_codes'] or ())
+                | set(_adaptive_limit.THROTTLE_STATUS_CODES))
         super(Proxy, self).__init__(session=session, *args, **kwargs)
         self._statsd_client = statsd_client
         self._statsd_prefix = statsd_prefix
@@ -107,6 +125,13 @@ class Proxy(adapter.Adapter):
         self._prometheus_histogram = prometheus_histogram
         self._influxdb_client = influxdb_client
         self._influxdb_config = influxdb_config
+        self._http_pool_size = http_pool_size
+        self._http_pool_mounted = False
+        self._pool_stats_reported = None
+        self._adaptive_limiter = adaptive_limiter
+        self._discovered = (None, {})
+        self._circuit_breaker = circuit_breaker
+        self._circuit_breakers = {}
         if self.service_type:
             log_name = 'openstack.{0}'.format(self.service_type)
         else:
@@ -139,6 +164,11 @@ class Proxy(adapter.Adapter):
         *args,
         **kwargs
     ):
+        if self._http_pool_size and not self._http_pool_mounted:
+            self._mount_http_pool()
+        breaker = self._get_circuit_breaker(url)
+        if breaker is not None:
+            breaker.before_request()
         conn = self._get_connection()
         if not global_request_id:
             # Per-request setting should take precedence
@@ -156,6 +186,13 @@ class Proxy(adapter.Adapter):
             # Track cache key for invalidating possibility
             conn._api_cache_keys.add(key)
 
+        if self._adaptive_limiter is not None:
+            # Every attempt of the request goes through the limiter and
+            # its response adapts the limits.
+            kwargs.setdefault('rate_semaphore', self._adaptive_limiter)
+            kwargs['hooks'] = _adaptive_limit.add_response_hook(
+                kwargs.get('hooks'), self._adaptive_limiter.record)
+
         try:
             if conn.cache_enabled and not skip_cache and method == 'GET':
                 # Get the object expiration time from config
@@ -192,6 +229,8 @@ class Proxy(adapter.Adapter):
                     **kwargs
                 )
 
+            if breaker is not None:
+                breaker.record(response)
             for h in response.history:
                 self._report_stats(h)
             self._report_stats(response)
@@ -201,6 +240,8 @@ class Proxy(adapter.Adapter):
             # in case of exceptions as well, so that timeouts and connection
             # problems (especially when called from ansible) are being
             # generated as well.
+            if breaker is not None:
+                breaker.record(exc=e)
             self._report_stats(None, url, method, e)
             raise
 
@@ -297,6 +338,151 @@ class Proxy(adapter.Adapter):
 
         return name_parts
 
+    def _get_discovered(self, key, discover):
+        """Get a value derived from the version discovery of the service.
+
+        Values, like the negotiated microversions, are memoised until the
+        discovery is done again with the catalog of a new token or the
+        endpoint or default microversion of the proxy change.
+
+        :param key: Identifier of the value.
+        :param discover: Callable computing the value. None is not memoised.
+        """
+        auth = self.auth or getattr(self.session, 'auth', None)
+        discovery = (
+            getattr(auth, 'auth_ref', None),
+            self.endpoint_override,
+            self.default_microversion,
+        )
+        memo, values = self._discovered
+        if memo != discovery:
+            values = {}
+            self._discovered = (discovery, values)
+        try:
+            return values[key]
+        except KeyError:
+            value = discover()
+            if value is not None:
+                values[key] = value
+            return value
+
+    def _get_circuit_breaker(self, url):
+        """Get the circuit breaker of the endpoint serving the URL.
+
+        :returns: A :class:`~openstack._circuit_breaker.CircuitBreaker`, None
+            if circuit breakers are not enabled for the service.
+        """
+        if not self._circuit_breaker:
+            return None
+        if not urlparse(url).scheme:
+            try:
+                # NOTE: The identity proxy overrides get_endpoint
+                url = self._get_discovered(
+                    'endpoint', functools.partial(
+                        adapter.Adapter.get_endpoint, self))
+            except ks_exc.ClientException:
+                # The request fails the same way
+                return None
+            if not url:
+                return None
+        endpoint = _http_pool.get_endpoint_prefix(url)
+        breaker = self._circuit_breakers.get(endpoint)
+        if breaker is None:
+            threshold, reset_timeout = self._circuit_breaker
+            breaker = self._circuit_breakers.setdefault(
+                endpoint,
+                _circuit_breaker.CircuitBreaker(
+                    endpoint, threshold, reset_timeout,
+                    on_transition=self._report_circuit_transition))
+        return breaker
+
+    def _report_circuit_transition(self, endpoint, old_state, new_state):
+        if new_state == _circuit_breaker.OPEN:
+            self.log.warning(
+                'Circuit of endpoint %s is open, failing requests fast',
+                endpoint)
+        else:
+            self.log.info(
+                'Circuit of endpoint %s is %s', endpoint, new_state)
+        try:
+            if self._statsd_client:
+                key = '.'.join([
+                    self._statsd_prefix,
+                    normalize_metric_name(self.service_type),
+                    'circuit',
+                ])
+                with self._statsd_client.pipeline() as pipe:
+                    pipe.incr('%s.%s' % (key, new_state))
+                    pipe.gauge(
+                        '%s.open' % key,
+                        int(new_state != _circuit_breaker.CLOSED))
+            if self._influxdb_client:
+                measurement = (
+                    self._influxdb_config.get('measurement', 'openstack_api')
+                    if self._influxdb_config
+                    else 'openstack_api'
+                )
+                self._influxdb_client.write_points([dict(
+                    measurement='%s.%s' % (measurement, self.service_type),
+                    tags=dict(endpoint=endpoint, circuit=new_state),
+                    fields=dict(circuit_open=int(
+                        new_state != _circuit_breaker.CLOSED)),
+                )])
+        except Exception:
+            # We do not want errors in metric reporting ever break client
+            self.log.exception("Exception reporting metrics")
+
+    def _report_transfer(self, name, size, elapsed):
+        """Report the throughput of a transfer of data, i.e. a download.
+
+        :param str name: Name of the transfer in the metrics.
+        :param int size: Bytes transferred.
+        :param float elapsed: Seconds the transfer took.
+        """
+        rate = int(size / elapsed) if elapsed else 0
+        try:
+            if self._statsd_client:
+                key = '.'.join([
+                    self._statsd_prefix,
+                    normalize_metric_name(self.service_type),
+                    name,
+                ])
+                with self._statsd_client.pipeline() as pipe:
+                    pipe.timing(key, int(elapsed * 1000))
+                    pipe.incr('%s.bytes' % key, size)
+                    pipe.gauge('%s.rate' % key, rate)
+            if self._influxdb_client:
+                measurement = (
+                    self._influxdb_config.get('measurement', 'openstack_api')
+                    if self._influxdb_config
+                    else 'openstack_api'
+                )
+                self._influxdb_client.write_points([dict(
+                    measurement='%s.%s' % (measurement, self.service_type),
+                    tags=dict(transfer=name),
+                    fields=dict(bytes=size, duration=elapsed, rate=rate),
+                )])
+        except Exception:
+            # We do not want errors in metric reporting ever break client
+            self.log.exception("Exception reporting metrics")
+
+    def _mount_http_pool(self):
+        """Mount a connection pool of the configured size for the service.
+
+        The pool is mounted for the scheme and host of the endpoint, services
+        sharing a host share the pool of the first one mounted.
+        """
+        self._http_pool_mounted = True
+        requests_session = getattr(self.session, 'session', None)
+        if requests_session is None:
+            return
+        # NOTE: The identity proxy overrides get_endpoint
+        prefix = _http_pool.get_endpoint_prefix(
+            adapter.Adapter.get_endpoint(self))
+        if prefix not in requests_session.adapters:
+            connections, maxsize = self._http_pool_size
+            _http_pool.mount(requests_session, (prefix,), connections, maxsize)
+
     def _report_stats(self, response, url=None, method=None, exc=None):
         if self._statsd_client:
             self._report_stats_statsd(response, url, method, exc)
@@ -336,10 +522,49 @@ class Proxy(adapter.Adapter):
                 elif exc is not None:
                     pipe.incr('%s.failed' % key)
                 pipe.incr('%s.attempted' % key)
+                if response is not None:
+                    self._report_pool_stats_statsd(pipe, url)
+                    self._report_limit_stats_statsd(pipe)
         except Exception:
             # We do not want errors in metric reporting ever break client
             self.log.exception("Exception reporting metrics")
 
+    def _report_pool_stats_statsd(self, pipe, url):
+        requests_session = getattr(self.session, 'session', None)
+        if not isinstance(requests_session, requests.Session):
+            return
+        # NOTE: Getting the stats walks all pools, they are reported
+        # periodically rather than after every request.
+        now = time.monotonic()
+        if (
+            self._pool_stats_reported is not None
+            and now - self._pool_stats_reported < _POOL_STATS_INTERVAL
+        ):
+            return
+        self._pool_stats_reported = now
+        key = '.'.join([
+            self._statsd_prefix,
+            normalize_metric_name(self.service_type),
+            'pool',
+        ])
+        for stats in _http_pool.get_pool_stats(
+                requests_session, url).values():
+            pipe.gauge('%s.in_use' % key, stats['in_use'])
+            pipe.gauge('%s.maxsize' % key, stats['maxsize'])
+
+    def _report_limit_stats_statsd(self, pipe):
+        if self._adaptive_limiter is None:
+            return
+        key = '.'.join([
+            self._statsd_prefix,
+            normalize_metric_name(self.service_type),
+            'limit',
+        ])
+        stats = self._adaptive_limiter.get_stats()
+        for name in ('concurrency', 'rate', 'in_flight'):
+            if stats[name] is not None:
+                pipe.gauge('%s.%s' % (key, name), stats[name])
+
     def _report_stats_prometheus(
         self, response, url=None, method=None, exc=None
     ):
@@ -430,6 +655,12 @@ class Proxy(adapter.Adapter):
             self, '_connection', getattr(self.session, '_sdk_connection', None)
         )
 
+    def _invalidate_resolution_cache(self, resource_type):
+        """Forget the cached name resolutions of the resource type."""
+        cache = getattr(self._get_connection(), '_resolution_cache', None)
+        if cache is not None:
+            cache.invalidate(resource_type)
+
     def _get_resource(self, resource_type, value, **attrs):
         """Get a resource object to work on
 
@@ -528,6 +759,8 @@ class Proxy(adapter.Adapter):
             if ignore_missing:
                 return None
             raise
+        finally:
+            self._invalidate_resolution_cache(resource_type)
 
         return rv
 
@@ -554,7 +787,10 @@ class Proxy(adapter.Adapter):
         :rtype: :class:`~openstack.resource.Resource`
         """
         res = self._get_resource(resource_type, value, **attrs)
-        return res.commit(self, base_path=base_path)
+        try:
+            return res.commit(self, base_path=base_path)
+        finally:
+            self._invalidate_resolution_cache(resource_type)
 
     def _create(self, resource_type, base_path=None, **attrs):
         """Create a resource from attributes
@@ -578,7 +814,10 @@ class Proxy(adapter.Adapter):
         """
         conn = self._get_connection()
         res = resource_type.new(connection=conn, **attrs)
-        return res.create(self, base_path=base_path)
+        try:
+            return res.create(self, base_path=base_path)
+        finally:
+            self._invalidate_resolution_cache(resource_type)
 
     def _bulk_create(self, resource_type, data, base_path=None):
         """Create a resource from attributes
@@ -598,7 +837,10 @@ class Proxy(adapter.Adapter):
         :returns: A generator of Resource objects.
         :rtype: :class:`~openstack.resource.Resource`
         """
-        return resource_type.bulk_create(self, data, base_path=base_path)
+        try:
+            return resource_type.bulk_create(self, data, base_path=base_path)
+        finally:
+            self._invalidate_resolution_cache(resource_type)
 
     @_check_resource(strict=False)
     def _get(
@@ -608,6 +850,7 @@ class Proxy(adapter.Adapter):
         requires_id=True,
         base_path=None,
         skip_cache=False,
+        fields=None,
         **attrs
     ):
         """Fetch a resource
@@ -622,6 +865,8 @@ class Proxy(adapter.Adapter):
             :data:`~openstack.resource.Resource.base_path`.
         :param bool skip_cache: A boolean indicating whether optional API
             cache should be skipped for this invocation.
+        :param list fields: Names of the attributes to fetch, see
+            :meth:`~openstack.resource.Resource.fetch`.
         :param dict attrs: Attributes to be passed onto the
             :meth:`~openstack.resource.Resource.get`
             method. These should correspond
@@ -633,6 +878,9 @@ class Proxy(adapter.Adapter):
         :rtype: :class:`~openstack.resource.Resource`
         """
         res = self._get_resource(resource_type, value, **attrs)
+        kwargs = {}
+        if fields is not None:
+            kwargs['fields'] = fields
 
         return res.fetch(
             self,
@@ -642,6 +890,7 @@ class Proxy(adapter.Adapter):
             error_message="No {resource_type} found for {value}".format(
                 resource_type=resource_type.__name__, value=value
             ),
+            **kwargs
         )
 
     def _list(
@@ -671,6 +920,8 @@ class Proxy(adapter.Adapter):
             :meth:`~openstack.resource.Resource.list` method. These should
             correspond to either :class:`~openstack.resource.URI` values
             or appear in :data:`~openstack.resource.Resource._query_mapping`.
+            ``fields`` limits the attributes fetched, see
+            :meth:`~openstack.resource.Resource.list`.
 
         :returns: A generator of Resource objects.
         :raises: ``ValueError`` if ``value`` is a
@@ -721,6 +972,7 @@ class Proxy(adapter.Adapter):
         identified_resources=None,
         filters=None,
         resource_evaluation_fn=None,
+        cleanup_graph=None,
     ):
         return None
 
@@ -733,7 +985,21 @@ class Proxy(adapter.Adapter):
         identified_resources=None,
         filters=None,
         resource_evaluation_fn=None,
+        cleanup_graph=None,
+        depends_on=None,
+        wait_list_fn=None,
     ):
+        """Evaluate whether resource should be deleted and delete it.
+
+        When ``cleanup_graph`` (a
+        :class:`~openstack._cleanup.ResourceCleanupGraph`) is given the
+        resource is not deleted immediately, but registered in the graph
+        together with ``depends_on`` (IDs of resources which must be deleted
+        first) and ``wait_list_fn`` (callable listing resources of the same
+        kind used to wait for the deletion to complete).
+
+        :returns: Whether resource is going to be deleted.
+        """
         need_delete = False
         try:
             if resource_evaluation_fn and callable(resource_evaluation_fn):
@@ -762,7 +1028,13 @@ class Proxy(adapter.Adapter):
                     # identified
                     identified_resources[obj.id] = obj
                 if not dry_run:
-                    del_fn(obj)
+                    if cleanup_graph is not None:
+                        cleanup_graph.add(
+                            self.service_type, obj, del_fn,
+                            depends_on=depends_on,
+                            wait_list_fn=wait_list_fn)
+                    else:
+                        del_fn(obj)
         except Exception as e:
             self.log.exception('Cannot delete resource %s: %s', obj, str(e))
         return need_delete
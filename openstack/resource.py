@@ -33,6 +33,8 @@ and then returned to the caller.
 """
 
 import collections
+import copyreg
+import functools
 import inspect
 import itertools
 import operator
@@ -46,6 +48,7 @@ import munch
 from requests import structures
 
 from openstack import _log
+from openstack import _resolution_cache
 from openstack import exceptions
 from openstack import format
 from openstack import utils
@@ -514,6 +517,9 @@ class Resource(dict):
     _store_unknown_attrs_as_properties = False
     _allow_unknown_attrs_in_body = False
     _unknown_attrs_in_body = None
+    #: Names of the attributes fetched when only some of them were, see the
+    #: ``fields`` of :meth:`fetch` and :meth:`list`. None when complete.
+    _partial_fields = None
 
     # Placeholder for aliases as dict of {__alias__:__original}
     _attr_aliases = {}
@@ -587,6 +593,18 @@ class Resource(dict):
         # always False even if we override __len__ or __bool__.
         dict.update(self, self.to_dict())
 
+    def __reduce_ex__(self, protocol):
+        # NOTE: The dict items only mirror the attributes, so restore the
+        # instance state without them. The connection is not part of the
+        # state, copies and unpickled resources are detached from it.
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return (copyreg.__newobj__, (self.__class__,), state)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        dict.update(self, self.to_dict())
+
     @classmethod
     def _attributes_iterator(cls, components=tuple([Body, Header])):
         """Iterator over all Resource attributes"""
@@ -952,6 +970,65 @@ class Resource(dict):
                     return value.name
         return ""
 
+    @classmethod
+    def _get_fields(cls, fields):
+        """Return the names of the attributes to fetch
+
+        The ID is always fetched.
+
+        :param fields: List of attribute names, server-side names also work,
+            or a string of them separated by commas.
+        :returns: A tuple of the set of the attribute names and the list of
+            the server-side names.
+        """
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        server_names = {}
+        for attr, component in cls._attributes_iterator(components=(Body,)):
+            # Subclasses come first
+            server_names.setdefault(attr, component.name)
+        attr_names = {v: k for k, v in server_names.items()}
+
+        names = ['id'] + list(fields)
+        alternate_id = cls._alternate_id()
+        if alternate_id:
+            names.append(alternate_id)
+        attrs = set()
+        remote = []
+        for name in names:
+            if name in server_names:
+                attrs.add(name)
+                name = server_names[name]
+            else:
+                attrs.add(attr_names.get(name, name))
+            if name not in remote:
+                remote.append(name)
+        return attrs, remote
+
+    @classmethod
+    def _supports_fields(cls):
+        """Whether the service returns only the fields asked for"""
+        return 'fields' in cls._query_mapping._mapping
+
+    def _project(self, attrs, remote, previous=None):
+        """Only keep the given attributes of the body
+
+        :param set attrs: Attribute names to keep.
+        :param list remote: Server-side names to keep.
+        :param dict previous: Values of the body to restore instead of
+            dropping them.
+        """
+        body = self._body.attributes
+        for key in list(body):
+            if key in remote:
+                continue
+            if previous and key in previous:
+                body[key] = previous[key]
+            else:
+                del body[key]
+        self._partial_fields = frozenset(attrs)
+        dict.update(self, self.to_dict())
+
     @staticmethod
     def _get_id(value):
         """If a value is a Resource, return the canonical ID
@@ -1348,9 +1425,14 @@ class Resource(dict):
         if session.default_microversion:
             return session.default_microversion
 
-        return utils.maximum_supported_microversion(
-            session, cls._max_microversion
+        negotiate = functools.partial(
+            utils.maximum_supported_microversion,
+            session,
+            cls._max_microversion,
         )
+        if not hasattr(type(session), '_get_discovered'):
+            return negotiate()
+        return session._get_discovered((cls, action), negotiate)
 
     def _assert_microversion_for(
         self,
@@ -1606,6 +1688,7 @@ class Resource(dict):
         skip_cache=False,
         *,
         microversion=None,
+        fields=None,
         **params,
     ):
         """Get a remote resource based on this instance.
@@ -1621,6 +1704,11 @@ class Resource(dict):
         :param bool skip_cache: A boolean indicating whether optional API
             cache should be skipped for this invocation.
         :param str microversion: API version to override the negotiated one.
+        :param list fields: Names of the attributes to fetch, the ID always
+            is. When the service supports it, only these are returned,
+            otherwise the other attributes of the response are ignored.
+            Other attributes the resource had already are kept. The names
+            fetched are in ``_partial_fields`` afterwards.
         :param dict params: Additional parameters that can be consumed.
         :return: This :class:`Resource` instance.
         :raises: :exc:`~openstack.exceptions.MethodNotSupported` if
@@ -1637,6 +1725,13 @@ class Resource(dict):
         session = self._get_session(session)
         if microversion is None:
             microversion = self._get_microversion(session, action='fetch')
+        previous = None
+        if fields is not None:
+            attrs, remote = self._get_fields(fields)
+            if self._supports_fields():
+                params.update(self._query_mapping._transpose(
+                    {'fields': remote}, self.__class__))
+            previous = self._body.attributes.copy()
         response = session.get(
             request.url,
             microversion=microversion,
@@ -1649,6 +1744,8 @@ class Resource(dict):
 
         self.microversion = microversion
         self._translate_response(response, **kwargs)
+        if fields is not None:
+            self._project(attrs, remote, previous)
         return self
 
     def head(self, session, base_path=None, *, microversion=None):
@@ -1930,6 +2027,7 @@ class Resource(dict):
         allow_unknown_params=False,
         *,
         microversion=None,
+        fields=None,
         **params,
     ):
         """This method is a generator which yields resource objects.
@@ -1950,6 +2048,10 @@ class Resource(dict):
             passing everything known to the server. ``False`` will result in
             validation exception when unknown query parameters are passed.
         :param str microversion: API version to override the negotiated one.
+        :param list fields: Names of the attributes to fetch, the ID always
+            is. When the service supports it, only these are returned,
+            otherwise the other attributes of the responses are dropped.
+            The names fetched are in ``_partial_fields`` of every resource.
         :param dict params: These keyword arguments are passed through the
             :meth:`~openstack.resource.QueryParamter._transpose` method
             to find if any of them match expected query parameters to be sent
@@ -1977,6 +2079,13 @@ class Resource(dict):
 
         if base_path is None:
             base_path = cls.base_path
+        project = False
+        if fields is not None:
+            field_attrs, remote_fields = cls._get_fields(fields)
+            if cls._supports_fields():
+                params['fields'] = remote_fields
+            else:
+                project = True
         api_filters = cls._query_mapping._validate(
             params,
             base_path=base_path,
@@ -2073,6 +2182,10 @@ class Resource(dict):
                         break
 
                 if filters_matched:
+                    if project:
+                        value._project(field_attrs, remote_fields)
+                    elif fields is not None:
+                        value._partial_fields = frozenset(field_attrs)
                     yield value
                 total_yielded += 1
 
@@ -2220,10 +2333,42 @@ class Resource(dict):
             is found and ignore_missing is ``False``.
         """
         session = cls._get_session(session)
+        connection = session._get_connection()
+        cache = getattr(connection, '_resolution_cache', None)
+        cache_key = None
+        if cache is not None and cache.enabled:
+            cache_key = _resolution_cache.make_key(
+                name_or_id, list_base_path, microversion, **params
+            )
+            cached = cache.get(cls, cache_key)
+            if cached is _resolution_cache.MISSING:
+                if ignore_missing:
+                    return None
+                raise exceptions.ResourceNotFound(
+                    "No %s found for %s" % (cls.__name__, name_or_id)
+                )
+            elif cached is not None:
+                try:
+                    match = cls.existing(
+                        id=cached, connection=connection, **params
+                    ).fetch(session, microversion=microversion, **params)
+                except (
+                    exceptions.NotFoundException,
+                    exceptions.BadRequestException,
+                ):
+                    match = None
+                if match is not None and name_or_id in (
+                    match.id,
+                    getattr(match, 'name', None),
+                ):
+                    return match
+                # The resource is gone or renamed, resolve it again.
+                cache.discard(cls, cache_key)
+
         # Try to short-circuit by looking directly for a matching ID.
         try:
             match = cls.existing(
-                id=name_or_id, connection=session._get_connection(), **params
+                id=name_or_id, connection=connection, **params
             )
             return match.fetch(session, microversion=microversion, **params)
         except (exceptions.NotFoundException, exceptions.BadRequestException):
@@ -2244,8 +2389,12 @@ class Resource(dict):
 
         result = cls._get_one_match(name_or_id, data)
         if result is not None:
+            if cache_key is not None and result.id:
+                cache.set(cls, cache_key, result.id)
             return result
 
+        if cache_key is not None:
+            cache.set_missing(cls, cache_key)
         if ignore_missing:
             return None
         raise exceptions.ResourceNotFound(
@@ -11,6 +11,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import importlib
 import warnings
 
 import os_service_types
@@ -41,7 +42,9 @@ class _ServiceDisabledProxyShim:
 
 class ServiceDescription:
 
-    #: Dictionary of supported versions and proxy classes for that version
+    #: Dictionary of supported versions and proxy classes for that version.
+    #: Proxy classes can be given as import paths, in which case their
+    #: modules are only imported once a proxy of that version is needed.
     supported_versions = None
     #: main service_type to use to find this service in the catalog
     service_type = None
@@ -110,6 +113,16 @@ class ServiceDescription:
             instance._proxies[self.service_type] = proxy
         return instance._proxies[self.service_type]
 
+    def _get_proxy_class(self, version):
+        """Get the proxy class of the version, importing it on first use."""
+        proxy_class = self.supported_versions.get(version)
+        if isinstance(proxy_class, str):
+            module_name, class_name = proxy_class.rsplit('.', 1)
+            proxy_class = getattr(
+                importlib.import_module(module_name), class_name)
+            self.supported_versions[version] = proxy_class
+        return proxy_class
+
     def _set_override_from_catalog(self, config):
         override = config._get_endpoint_from_catalog(
             self.service_type,
@@ -174,7 +187,7 @@ class ServiceDescription:
         if endpoint_override and version_string:
             # Both endpoint override and version_string are set, we don't
             # need to do discovery - just trust the user.
-            proxy_class = self.supported_versions.get(version_string[0])
+            proxy_class = self._get_proxy_class(version_string[0])
             if proxy_class:
                 proxy_obj = config.get_session_client(
                     self.service_type,
@@ -194,7 +207,7 @@ class ServiceDescription:
                 self.service_type
             )
             api_version = temp_adapter.get_endpoint_data().api_version
-            proxy_class = self.supported_versions.get(str(api_version[0]))
+            proxy_class = self._get_proxy_class(str(api_version[0]))
             if proxy_class:
                 proxy_obj = config.get_session_client(
                     self.service_type,
@@ -276,7 +289,7 @@ class ServiceDescription:
                         service_type=self.service_type,
                         cloud=instance.name,
                         region_name=region_name))
-        proxy_class = self.supported_versions.get(str(found_version[0]))
+        proxy_class = self._get_proxy_class(str(found_version[0]))
         if proxy_class:
             return config.get_session_client(
                 self.service_type,
@@ -10,8 +10,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
 from unittest import mock
 
+import fixtures
+
 from openstack.baremetal.v1 import _proxy
 from openstack.baremetal.v1 import allocation
 from openstack.baremetal.v1 import chassis
@@ -297,6 +300,17 @@ class TestWaitForNodesProvisionState(base.TestCase):
         self.session = mock.Mock()
         self.proxy = _proxy.Proxy(self.session)
 
+    def _full_get(self, polled):
+        """Return the polled nodes, and full ones when fetched in full."""
+        polled = iter(polled)
+
+        def _get(_self, n, fields=None):
+            if fields is None:
+                return mock.Mock(spec=node.Node, id=n.id, full=True)
+            return next(polled)
+
+        return _get
+
     def test_success(self, mock_get):
         # two attempts, one node succeeds after the 1st
         nodes = [mock.Mock(spec=node.Node, id=str(i))
@@ -304,11 +318,14 @@ class TestWaitForNodesProvisionState(base.TestCase):
         for i, n in enumerate(nodes):
             # 1st attempt on 1st node, 2nd attempt on 2nd node
             n._check_state_reached.return_value = not (i % 2)
-            mock_get.side_effect = nodes
+        mock_get.side_effect = self._full_get(nodes)
 
         result = self.proxy.wait_for_nodes_provision_state(
             ['abcd', node.Node(id='1234')], 'fake state')
-        self.assertEqual([nodes[0], nodes[2]], result)
+        # The nodes are returned with all their fields
+        self.assertEqual(['0', '2'], [n.id for n in result])
+        self.assertTrue(all(n.full for n in result))
+        mock_get.assert_any_call(self.proxy, nodes[0])
 
         for n in nodes:
             n._check_state_reached.assert_called_once_with(
@@ -321,11 +338,12 @@ class TestWaitForNodesProvisionState(base.TestCase):
         for i, n in enumerate(nodes):
             # 1st attempt on 1st node, 2nd attempt on 2nd node
             n._check_state_reached.return_value = not (i % 2)
-            mock_get.side_effect = nodes
+        mock_get.side_effect = self._full_get(nodes)
 
         result = self.proxy.wait_for_nodes_provision_state(
             ['abcd', node.Node(id='1234')], 'fake state', fail=False)
-        self.assertEqual([nodes[0], nodes[2]], result.success)
+        self.assertEqual(['0', '2'], [n.id for n in result.success])
+        self.assertTrue(all(n.full for n in result.success))
         self.assertEqual([], result.failure)
         self.assertEqual([], result.timeout)
 
@@ -358,7 +376,7 @@ class TestWaitForNodesProvisionState(base.TestCase):
         self.assertEqual([], result.failure)
 
     def test_timeout_and_failures_not_fail(self, mock_get):
-        def _fake_get(_self, node):
+        def _fake_get(_self, node, fields=None):
             result = mock.Mock()
             result.id = getattr(node, 'id', node)
             if result.id == '1':
@@ -378,3 +396,221 @@ class TestWaitForNodesProvisionState(base.TestCase):
         self.assertEqual(['1'], [x.id for x in result.success])
         self.assertEqual(['3'], [x.id for x in result.timeout])
         self.assertEqual(['2'], [x.id for x in result.failure])
+
+    def test_sparse_fields(self, mock_get):
+        mock_get.return_value._check_state_reached.return_value = True
+
+        self.proxy.wait_for_nodes_provision_state(['abcd'], 'fake state')
+
+        self.assertEqual(
+            [mock.call(self.proxy, 'abcd', fields=_proxy._WAIT_FIELDS),
+             mock.call(self.proxy, mock_get.return_value)],
+            mock_get.call_args_list)
+
+    @mock.patch.object(_proxy.Proxy, 'nodes', autospec=True)
+    def test_many_nodes_listed(self, mock_nodes, mock_get):
+        count = _proxy._WAIT_LIST_THRESHOLD + 2
+        listed = [mock.Mock(spec=node.Node, id=str(i))
+                  for i in range(count)]
+        for i, n in enumerate(listed):
+            # NOTE: name is an argument of Mock itself
+            n.name = 'node%d' % i
+        # The first node only reaches the state on the 2nd attempt
+        listed[0]._check_state_reached.side_effect = [False, True]
+        for n in listed[1:]:
+            n._check_state_reached.return_value = True
+        mock_nodes.return_value = listed[1:]
+        mock_get.side_effect = self._full_get([listed[0]] * 2)
+        names = ['node%d' % i for i in range(count)]
+
+        result = self.proxy.wait_for_nodes_provision_state(
+            names, 'fake state')
+
+        self.assertEqual(
+            [str(i) for i in range(1, count)] + ['0'],
+            [n.id for n in result])
+        mock_nodes.assert_called_once_with(
+            self.proxy, fields=_proxy._WAIT_FIELDS,
+            limit=count * _proxy._WAIT_LIST_RATIO + 1)
+        # The node missing from the listing is fetched, also when only it
+        # is waited for any more
+        self.assertEqual(
+            [mock.call(self.proxy, 'node0', fields=_proxy._WAIT_FIELDS),
+             mock.call(self.proxy, listed[0], fields=_proxy._WAIT_FIELDS)],
+            mock_get.call_args_list[:2])
+
+    @mock.patch.object(_proxy.Proxy, 'nodes', autospec=True)
+    def test_many_nodes_large_deployment(self, mock_nodes, mock_get):
+        count = _proxy._WAIT_LIST_THRESHOLD + 2
+        limit = count * _proxy._WAIT_LIST_RATIO
+        # The listing returns many more nodes than are waited for
+        mock_nodes.return_value = (
+            mock.Mock(spec=node.Node, id='other%d' % i)
+            for i in range(limit * 10))
+        polled = mock.Mock(spec=node.Node, id='node')
+        polled._check_state_reached.side_effect = (
+            [False] * count + [True] * count)
+        mock_get.side_effect = self._full_get([polled] * count * 2)
+        names = ['node%d' % i for i in range(count)]
+
+        self.proxy.wait_for_nodes_provision_state(names, 'fake state')
+
+        # The listing is cut after the limit, and the nodes are then
+        # fetched one by one
+        mock_nodes.assert_called_once_with(
+            self.proxy, fields=_proxy._WAIT_FIELDS, limit=limit + 1)
+        self.assertEqual(limit + 1, self.proxy._node_list_size)
+        self.assertEqual(count * 3, mock_get.call_count)
+
+
+@mock.patch('time.sleep', lambda _sec: None)
+@mock.patch.object(_proxy.Proxy, '_poll_nodes', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'set_node_traits', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'create_port', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'validate_node', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'set_node_provision_state', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'create_node', autospec=True)
+class TestEnrollNodes(base.TestCase):
+
+    def setUp(self):
+        super(TestEnrollNodes, self).setUp()
+        self.session = mock.Mock()
+        self.proxy = _proxy.Proxy(self.session)
+        executor = concurrent.futures.ThreadPoolExecutor(4)
+        self.addCleanup(executor.shutdown)
+        self.proxy._connection = mock.Mock(_pool_executor=executor)
+
+    def _setup(self, mock_create, mock_provision, mock_poll, count=2):
+        self.nodes = {}
+
+        def _create(_self, name, **attrs):
+            result = node.Node(id='id-' + name, name=name,
+                               provision_state='enroll')
+            self.nodes[result.id] = result
+            return result
+
+        def _provision(_self, node, target, **kwargs):
+            return node
+
+        def _poll(_self, nodes):
+            return nodes
+
+        mock_create.side_effect = _create
+        mock_provision.side_effect = _provision
+        mock_poll.side_effect = _poll
+        self.useFixture(fixtures.MockPatchObject(
+            _proxy.Proxy, 'get_node', autospec=True,
+            side_effect=lambda _self, n: self.nodes[n.id]))
+        # Nodes reach the state of a stage on the first poll
+        self.mock_reached = self.useFixture(fixtures.MockPatchObject(
+            node.Node, '_check_state_reached', return_value=True)).mock
+        return [{'name': 'node%d' % i, 'driver': 'ipmi',
+                 'ports': ['aa:bb:cc:dd:ee:0%d' % i],
+                 'traits': ['CUSTOM_RACK']}
+                for i in range(count)]
+
+    def test_available(self, mock_create, mock_provision, mock_validate,
+                       mock_port, mock_traits, mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll)
+
+        result = self.proxy.enroll_nodes(nodes, interval=0)
+
+        self.assertEqual(['success', 'success'], [r.status for r in result])
+        self.assertEqual(['id-node0', 'id-node1'],
+                         [r.node.id for r in result])
+        self.assertEqual(
+            ['create', 'manage', 'validate', 'ports', 'traits', 'provide'],
+            list(result[0].durations))
+        mock_create.assert_any_call(
+            self.proxy, name='node0', driver='ipmi',
+            provision_state='enroll')
+        mock_validate.assert_any_call(
+            self.proxy, self.nodes['id-node0'], required=('power',))
+        mock_port.assert_any_call(
+            self.proxy, node_id='id-node1', address='aa:bb:cc:dd:ee:01')
+        mock_traits.assert_any_call(
+            self.proxy, self.nodes['id-node1'], ['CUSTOM_RACK'])
+        self.assertEqual(
+            ['manage', 'manage', 'provide', 'provide'],
+            sorted(c[0][2] for c in mock_provision.call_args_list))
+
+    def test_manageable(self, mock_create, mock_provision, mock_validate,
+                        mock_port, mock_traits, mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll, count=1)
+        del nodes[0]['traits']
+
+        result = self.proxy.enroll_nodes(
+            nodes, provision_state='manageable', interval=0)
+
+        self.assertEqual('success', result[0].status)
+        self.assertEqual(['create', 'manage', 'validate', 'ports'],
+                         list(result[0].durations))
+        mock_provision.assert_called_once_with(
+            self.proxy, self.nodes['id-node0'], 'manage')
+        self.assertFalse(mock_traits.called)
+
+    @mock.patch.object(_proxy.Proxy, 'wait_for_node_reservation',
+                       autospec=True)
+    def test_conflict_retried(self, mock_wait, mock_create, mock_provision,
+                              mock_validate, mock_port, mock_traits,
+                              mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll, count=1)
+        mock_port.side_effect = [exceptions.ConflictException(), None]
+        mock_wait.side_effect = lambda _self, node, timeout: node
+
+        result = self.proxy.enroll_nodes(nodes, interval=0, lock_timeout=5)
+
+        self.assertEqual('success', result[0].status)
+        self.assertEqual(2, mock_port.call_count)
+        mock_wait.assert_called_once_with(
+            self.proxy, self.nodes['id-node0'], timeout=5)
+
+    def test_stage_failure(self, mock_create, mock_provision, mock_validate,
+                           mock_port, mock_traits, mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll)
+
+        def _validate(_self, node, required):
+            if node.id == 'id-node0':
+                raise exceptions.ValidationException('boom')
+
+        mock_validate.side_effect = _validate
+
+        result = self.proxy.enroll_nodes(nodes, interval=0)
+
+        self.assertEqual(['failed', 'success'], [r.status for r in result])
+        self.assertEqual('validate', result[0].stage)
+        self.assertIsInstance(result[0].error,
+                              exceptions.ValidationException)
+        self.assertEqual(['create', 'manage'], list(result[0].durations))
+        mock_port.assert_called_once_with(
+            self.proxy, node_id='id-node1', address='aa:bb:cc:dd:ee:01')
+
+    def test_failed_state(self, mock_create, mock_provision, mock_validate,
+                          mock_port, mock_traits, mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll, count=1)
+        self.mock_reached.side_effect = [
+            False, exceptions.ResourceFailure('boom')]
+
+        result = self.proxy.enroll_nodes(nodes, interval=0)
+
+        self.assertEqual('failed', result[0].status)
+        self.assertEqual('manage', result[0].stage)
+        self.assertEqual(2, mock_poll.call_count)
+        self.assertFalse(mock_validate.called)
+
+    def test_timeout(self, mock_create, mock_provision, mock_validate,
+                     mock_port, mock_traits, mock_poll):
+        nodes = self._setup(mock_create, mock_provision, mock_poll, count=1)
+        self.mock_reached.return_value = False
+
+        result = self.proxy.enroll_nodes(nodes, interval=0, timeout=0.5)
+
+        self.assertEqual('failed', result[0].status)
+        self.assertEqual('manage', result[0].stage)
+        self.assertIsInstance(result[0].error, exceptions.ResourceTimeout)
+
+    def test_invalid_state(self, mock_create, mock_provision, mock_validate,
+                           mock_port, mock_traits, mock_poll):
+        self.assertRaises(ValueError, self.proxy.enroll_nodes,
+                          [{'driver': 'ipmi'}], provision_state='clean')
+        self.assertFalse(mock_create.called)
@@ -607,6 +607,38 @@ class TestBackup(TestVolumeProxy):
         )
 
 
+class TestCleanup(TestVolumeProxy):
+
+    @mock.patch.object(_proxy.Proxy, 'volumes', return_value=[])
+    @mock.patch.object(_proxy.Proxy, 'snapshots', return_value=[])
+    @mock.patch.object(_proxy.Proxy, 'backups')
+    def test_cleanup_graph_dependent_backups(self, mock_backups, *args):
+        # From the youngest to the oldest, the incremental backup of vol1
+        # is kept by the filters
+        mock_backups.return_value = [
+            backup.Backup(id='inc1', volume_id='vol1',
+                          created_at='2022-01-03T00:00:00'),
+            backup.Backup(id='full1', volume_id='vol1',
+                          has_dependent_backups=True,
+                          created_at='2020-01-01T00:00:00'),
+            backup.Backup(id='inc2', volume_id='vol2',
+                          created_at='2020-01-02T00:00:00'),
+            backup.Backup(id='full2', volume_id='vol2',
+                          has_dependent_backups=True,
+                          created_at='2020-01-01T00:00:00'),
+        ]
+        graph = mock.Mock()
+
+        self.proxy._service_cleanup(
+            dry_run=False, identified_resources={}, cleanup_graph=graph,
+            filters={'created_at': '2021-01-01T00:00:00'})
+
+        deps = {
+            c[0][1].id: c[1].get('depends_on')
+            for c in graph.add.call_args_list}
+        self.assertEqual({'inc2': [None], 'full2': ['inc2']}, deps)
+
+
 class TestSnapshot(TestVolumeProxy):
     def test_snapshot_get(self):
         self.verify_get(self.proxy.get_snapshot, snapshot.Snapshot)
@@ -17,6 +17,7 @@ from uuid import uuid4
 
 import testtools
 
+from openstack import _resolution_cache
 from openstack.cloud import _utils
 from openstack.cloud import exc
 from openstack.tests.unit import base
@@ -356,3 +357,45 @@ class TestUtils(base.TestCase):
         for r in resources:
             self.assertTrue(hasattr(self.cloud, 'get_%s_by_id' % r))
             self.assertTrue(hasattr(self.cloud, 'search_%ss' % r))
+
+    def test_get_entity_resolution_cache(self):
+        self.cloud._resolution_cache = _resolution_cache.ResolutionCache(
+            ttl=60)
+        image = dict(id=uuid4().hex, name='image1')
+        with mock.patch.object(
+                self.cloud, 'search_images', return_value=[image]
+        ) as search, mock.patch.object(
+                self.cloud, 'get_image_by_id', return_value=image
+        ) as get:
+            for _ in range(2):
+                self.assertEqual(
+                    image,
+                    _utils._get_entity(self.cloud, 'image', 'image1', {}))
+        search.assert_called_once_with('image1', {})
+        get.assert_called_once_with(image['id'])
+
+    def test_get_entity_resolution_cache_missing(self):
+        self.cloud._resolution_cache = _resolution_cache.ResolutionCache(
+            ttl=60)
+        with mock.patch.object(
+                self.cloud, 'search_images', return_value=[]) as search:
+            for _ in range(2):
+                self.assertIsNone(
+                    _utils._get_entity(self.cloud, 'image', 'image1', {}))
+        search.assert_called_once_with('image1', {})
+
+    def test_get_entity_resolution_cache_stale(self):
+        self.cloud._resolution_cache = _resolution_cache.ResolutionCache(
+            ttl=60)
+        old = dict(id=uuid4().hex, name='image1')
+        new = dict(id=uuid4().hex, name='image1')
+        with mock.patch.object(
+                self.cloud, 'search_images', side_effect=[[old], [new]]
+        ) as search, mock.patch.object(
+                self.cloud, 'get_image_by_id',
+                side_effect=exc.OpenStackCloudURINotFound('Not found')
+        ):
+            _utils._get_entity(self.cloud, 'image', 'image1', {})
+            self.assertEqual(
+                new, _utils._get_entity(self.cloud, 'image', 'image1', {}))
+        self.assertEqual(2, search.call_count)
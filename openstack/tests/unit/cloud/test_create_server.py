@@ -1012,3 +1012,132 @@ class TestCreateServer(base.TestCase):
             wait=False)
 
         self.assert_calls()
+
+
+class TestCreateServers(base.TestCase):
+
+    def setUp(self):
+        super(TestCreateServers, self).setUp()
+        self.image = {'id': 'image-id', 'name': 'image'}
+        self.flavor = {'id': 'flavor-id', 'name': 'flavor'}
+        self.network = {'id': 'net-id', 'name': 'net'}
+        for name, value in (
+                ('get_image', self.image), ('get_flavor', self.flavor),
+                ('get_network', self.network)):
+            patcher = mock.patch.object(
+                self.cloud, name, return_value=value)
+            setattr(self, 'mock_' + name, patcher.start())
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'openstack.utils.supports_microversion', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_create = mock.patch.object(
+            self.cloud.compute, 'create_server').start()
+        self.mock_servers = mock.patch.object(
+            self.cloud.compute, 'servers').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _spec(self, name='server-name', **kwargs):
+        spec = dict(name=name, image='image', flavor='flavor', network='net')
+        spec.update(kwargs)
+        return spec
+
+    def test_create_servers_resolve_once(self):
+        self.mock_create.side_effect = [
+            server.Server(id='1', admin_password='pass'),
+            server.Server(id='2', admin_password='pass')]
+        self.mock_servers.return_value = [
+            server.Server(**fakes.make_fake_server('1', 's1', 'BUILD')),
+            server.Server(**fakes.make_fake_server('2', 's2', 'ERROR')),
+        ]
+
+        with mock.patch.object(
+            meta, 'add_server_interfaces', side_effect=lambda c, s: s
+        ):
+            result = self.cloud.create_servers(
+                [self._spec('s1'), self._spec('s2')], wait=False)
+
+        self.mock_get_image.assert_called_once_with('image')
+        self.mock_get_flavor.assert_called_once_with(
+            'flavor', get_extra=False)
+        self.mock_get_network.assert_called_once_with('net')
+        self.assertEqual(2, self.mock_create.call_count)
+        for call in self.mock_create.call_args_list:
+            self.assertEqual('image-id', call[1]['imageRef'])
+            self.assertEqual('flavor-id', call[1]['flavorRef'])
+            self.assertEqual([{'uuid': 'net-id'}], call[1]['networks'])
+        self.mock_servers.assert_called_once_with(changes_since=mock.ANY)
+        self.assertEqual(['1'], [s.id for s in result.success])
+        self.assertEqual('pass', result.success[0].admin_password)
+        self.assertEqual(1, len(result.failure))
+        self.assertEqual('s2', result.failure[0][0]['name'])
+        self.assertIsInstance(
+            result.failure[0][1], exc.OpenStackCloudCreateException)
+
+    def test_create_servers_multiple_create(self):
+        self.mock_create.return_value = server.Server(reservation_id='r-1')
+        self.mock_servers.return_value = [
+            server.Server(id='1'), server.Server(id='2'),
+            server.Server(id='3')]
+
+        with mock.patch.object(
+            self.cloud, '_wait_for_servers',
+            return_value={
+                '1': server.Server(id='1'), '2': server.Server(id='2')}
+        ), mock.patch.object(
+            self.cloud, '_get_active_created_server',
+            side_effect=lambda s, spec, timeout: s
+        ):
+            result = self.cloud.create_servers(
+                [self._spec()] * 3 + [self._spec(min_count=1)], wait=True)
+
+        self.assertEqual(2, self.mock_create.call_count)
+        kwargs = self.mock_create.call_args_list[0][1]
+        self.assertEqual(3, kwargs['min_count'])
+        self.assertEqual(3, kwargs['max_count'])
+        self.assertTrue(kwargs['return_reservation_id'])
+        self.mock_servers.assert_called_once_with(reservation_id='r-1')
+        self.assertEqual(['1', '2'], [s.id for s in result.success])
+        # Third server of the group and the single server timed out
+        self.assertEqual(2, len(result.failure))
+        for spec, error in result.failure:
+            self.assertIsInstance(error, exc.OpenStackCloudTimeout)
+
+    def test_create_servers_create_failure(self):
+        self.mock_create.side_effect = [
+            exc.OpenStackCloudException('boom'), server.Server(id='2')]
+
+        with mock.patch.object(
+            self.cloud, '_wait_for_servers',
+            return_value={'2': server.Server(id='2', status='ACTIVE')}
+        ), mock.patch.object(
+            self.cloud, '_expand_server', side_effect=lambda s, **kw: s
+        ), mock.patch.object(
+            self.cloud, 'get_active_server',
+            side_effect=lambda s, **kwargs: s
+        ) as mock_active:
+            result = self.cloud.create_servers(
+                [self._spec('s1', auto_ip=False), self._spec('s2')],
+                concurrency=1)
+
+        self.assertEqual(['2'], [s.id for s in result.success])
+        self.assertEqual('s1', result.failure[0][0]['name'])
+        self.assertEqual(1, mock_active.call_count)
+
+    def test_wait_for_servers(self):
+        self.mock_servers.side_effect = [
+            [server.Server(id='1', status='BUILD'),
+             server.Server(id='2', status='ACTIVE'),
+             server.Server(id='3', status='ACTIVE')],
+            [server.Server(id='1', status='ERROR')],
+        ]
+        self.cloud._SERVER_AGE = 0
+
+        finished = self.cloud._wait_for_servers(
+            [server.Server(id='1'), server.Server(id='2')],
+            start=0, timeout=10)
+
+        self.assertEqual(['1', '2'], sorted(finished))
+        self.assertEqual('ERROR', finished['1'].status)
+        self.assertEqual(2, self.mock_servers.call_count)
@@ -0,0 +1,163 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import concurrent.futures
+import itertools
+from unittest import mock
+
+from openstack.cloud import _floating_ip_pool
+from openstack import exceptions
+from openstack.network.v2 import floating_ip
+from openstack.tests.unit import base
+
+NET_ID = 'ext-net'
+
+
+def _fip(fip_id, port_id=None, network_id=NET_ID, project_id='project'):
+    return floating_ip.FloatingIP(
+        id=fip_id, port_id=port_id, floating_network_id=network_id,
+        project_id=project_id, floating_ip_address='203.0.113.1')
+
+
+class TestFloatingIPPreallocation(base.TestCase):
+
+    def setUp(self):
+        super(TestFloatingIPPreallocation, self).setUp()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+        self.counter = itertools.count()
+        self.fake_cloud = mock.Mock()
+        self.fake_cloud._pool_executor = self.executor
+        self.fake_cloud._submit_create_fip.side_effect = (
+            lambda kwargs: _fip(
+                'fip%d' % next(self.counter),
+                network_id=kwargs['floating_network_id']))
+        self.fake_cloud._list_floating_ips.return_value = [
+            _fip('attached', port_id='port1'),
+            _fip('free'),
+            _fip('other-project', project_id='other'),
+        ]
+        self.sot = _floating_ip_pool.FloatingIPPool(self.fake_cloud, 3)
+
+    def test_acquire_empty_fills(self):
+        self.assertIsNone(self.sot.acquire(NET_ID))
+        self.sot.fill(NET_ID, wait=True)
+        self.assertEqual(3, self.fake_cloud._submit_create_fip.call_count)
+
+        fip = self.sot.acquire(NET_ID)
+        self.sot.fill(NET_ID, wait=True)
+
+        self.assertIsNotNone(fip)
+        # Taken IP is replaced
+        self.assertEqual(4, self.fake_cloud._submit_create_fip.call_count)
+        self.fake_cloud._submit_create_fip.assert_called_with(
+            {'floating_network_id': NET_ID})
+
+    def test_fill_failure(self):
+        self.fake_cloud._submit_create_fip.side_effect = Exception('quota')
+        self.sot.fill(NET_ID, wait=True)
+        self.assertIsNone(self.sot.acquire(NET_ID))
+
+    def test_release(self):
+        self.sot.fill(NET_ID, wait=True)
+        self.sot.release()
+        self.assertEqual(3, self.fake_cloud.network.delete_ip.call_count)
+        self.assertIsNone(self.sot.acquire(NET_ID))
+
+    def test_get_by_port(self):
+        self.assertEqual(
+            ['attached'], [f.id for f in self.sot.get_by_port('port1')])
+        self.assertEqual([], self.sot.get_by_port('port2'))
+
+        # Changes are reflected without listing again
+        self.sot.update(_fip('attached', port_id='port2'))
+        self.assertEqual(
+            ['attached'], [f.id for f in self.sot.get_by_port('port2')])
+        self.assertEqual([], self.sot.get_by_port('port1'))
+        self.sot.discard('attached')
+        self.assertEqual([], self.sot.get_by_port('port2'))
+        self.fake_cloud._list_floating_ips.assert_called_once_with()
+
+    def test_index_expires(self):
+        with mock.patch('time.monotonic', return_value=100):
+            self.sot.get_by_port('port1')
+        with mock.patch('time.monotonic', return_value=110):
+            self.sot.get_by_port('port1')
+        self.assertEqual(2, self.fake_cloud._list_floating_ips.call_count)
+
+    def test_get_unattached(self):
+        self.sot.get_by_port('port1')
+        self.sot.fill(NET_ID, wait=True)
+        self.assertEqual(
+            ['free'],
+            [f.id for f in self.sot.get_unattached(NET_ID, 'project')])
+        self.assertEqual(
+            [], self.sot.get_unattached('other-net', 'project'))
+
+
+class TestFloatingIPPreallocationCloud(base.TestCase):
+
+    def setUp(self):
+        super(TestFloatingIPPreallocationCloud, self).setUp()
+        self.pool = mock.Mock()
+        self.cloud._floating_ip_pool = self.pool
+
+    def test_available_floating_ip_from_pool(self):
+        fip = _fip('pooled')
+        self.pool.acquire.return_value = fip
+        with mock.patch.object(
+                self.cloud, '_get_floating_network_id', return_value=NET_ID):
+            self.assertEqual(
+                [fip], self.cloud._neutron_available_floating_ips())
+        self.pool.acquire.assert_called_once_with(NET_ID)
+        self.pool.get_unattached.assert_not_called()
+
+    def test_available_floating_ip_from_index(self):
+        fip = _fip('free')
+        self.pool.acquire.return_value = None
+        self.pool.get_unattached.return_value = [fip]
+        with mock.patch.object(
+                self.cloud, '_get_floating_network_id', return_value=NET_ID
+        ), mock.patch.object(self.cloud, '_list_floating_ips') as list_fips:
+            self.assertEqual(
+                [fip],
+                self.cloud._neutron_available_floating_ips(
+                    project_id='project'))
+        self.pool.get_unattached.assert_called_once_with(NET_ID, 'project')
+        list_fips.assert_not_called()
+
+    def test_create_floating_ip_on_port_from_pool(self):
+        fip = _fip('pooled')
+        attached = _fip('pooled', port_id='port1')
+        self.pool.acquire.return_value = fip
+        with mock.patch.object(
+                self.cloud.network, 'update_ip', return_value=attached
+        ) as update_ip, mock.patch.object(
+                self.cloud, '_submit_create_fip') as create_fip:
+            self.assertEqual(
+                attached,
+                self.cloud._neutron_create_floating_ip(
+                    network_id=NET_ID, port='port1'))
+        update_ip.assert_called_once_with(fip, port_id='port1')
+        create_fip.assert_not_called()
+        self.pool.update.assert_called_once_with(attached)
+
+    def test_fill_floating_ip_pool(self):
+        with mock.patch.object(
+                self.cloud, '_get_floating_network_id', return_value=NET_ID):
+            self.cloud.fill_floating_ip_pool()
+        self.pool.fill.assert_called_once_with(NET_ID, wait=True)
+
+    def test_fill_floating_ip_pool_not_configured(self):
+        self.cloud._floating_ip_pool = None
+        self.assertRaises(
+            exceptions.SDKException, self.cloud.fill_floating_ip_pool)
@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
 import io
 import operator
 import tempfile
@@ -1089,6 +1090,222 @@ class TestImage(BaseTestImage):
 
         self.assert_calls()
 
+    def _read_uploaded_data(self, request, context):
+        self.uploaded_data = b''.join(request.body)
+        return ''
+
+    def _get_hash_while_uploading_uris(self, uploaded_image):
+        created_image = dict(self.fake_image_dict)
+        created_image['owner_specified.openstack.md5'] = ''
+        created_image['owner_specified.openstack.sha256'] = ''
+        return [
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'image', append=['images'], base_url_append='v2'),
+                 json=created_image,
+                 validate=dict(
+                     json={
+                         u'container_format': u'bare',
+                         u'disk_format': u'qcow2',
+                         u'name': self.image_name,
+                         u'owner_specified.openstack.md5': '',
+                         u'owner_specified.openstack.object': self.object_name,
+                         u'owner_specified.openstack.sha256': '',
+                         u'visibility': u'private'})
+                 ),
+            dict(method='PUT',
+                 uri=self.get_mock_url(
+                     'image', append=['images', self.image_id, 'file'],
+                     base_url_append='v2'),
+                 request_headers={'Content-Type': 'application/octet-stream'},
+                 text=self._read_uploaded_data),
+            dict(method='PATCH',
+                 uri=self.get_mock_url(
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 validate=dict(
+                     json=sorted([
+                         {u'op': u'replace', u'value':
+                             self.fake_image_dict[
+                                 'owner_specified.openstack.md5'],
+                          u'path': u'/owner_specified.openstack.md5'},
+                         {u'op': u'replace', u'value':
+                             self.fake_image_dict[
+                                 'owner_specified.openstack.sha256'],
+                          u'path': u'/owner_specified.openstack.sha256'}],
+                         key=operator.itemgetter('path'))),
+                 json=uploaded_image),
+        ]
+
+    def test_create_image_put_v2_hash_while_uploading(self):
+        self.cloud.image_api_use_tasks = False
+        uploaded_image = dict(
+            self.fake_image_dict, os_hash_algo='sha512',
+            os_hash_value=hashlib.sha512(self.output).hexdigest())
+        self.register_uris(
+            self._get_hash_while_uploading_uris(uploaded_image))
+
+        image = self.cloud.create_image(
+            self.image_name, data=io.BytesIO(self.output),
+            is_public=False, allow_duplicates=True, validate_checksum=True,
+            hash_while_uploading=True)
+
+        self.assert_calls()
+        self.assertEqual(self.output, self.uploaded_data)
+        self.assertEqual(
+            uploaded_image['owner_specified.openstack.sha256'],
+            image.properties['owner_specified.openstack.sha256'])
+
+    def test_create_image_put_v2_hash_while_uploading_wrong_hash(self):
+        self.cloud.image_api_use_tasks = False
+        uploaded_image = dict(
+            self.fake_image_dict, os_hash_algo='sha512',
+            os_hash_value='wrong')
+        uris = self._get_hash_while_uploading_uris(uploaded_image)
+        uris.append(
+            dict(method='DELETE',
+                 uri='https://image.example.com/v2/images/{id}'.format(
+                     id=self.image_id)))
+        self.register_uris(uris)
+
+        self.assertRaises(
+            exceptions.SDKException,
+            self.cloud.create_image,
+            self.image_name, data=io.BytesIO(self.output),
+            is_public=False, allow_duplicates=True, validate_checksum=True,
+            hash_while_uploading=True)
+
+        self.assert_calls()
+
+    def _get_deduplicate_uris(self, existing_image):
+        return [
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images', self.image_name],
+                     base_url_append='v2'),
+                 status_code=404),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'],
+                     base_url_append='v2',
+                     qs_elements=['name=' + self.image_name]),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'],
+                     base_url_append='v2',
+                     qs_elements=['os_hidden=True']),
+                 json={'images': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'],
+                     base_url_append='v2',
+                     qs_elements=[
+                         'status=active',
+                         'os_hash_value=' + existing_image['os_hash_value'],
+                     ]),
+                 json={'images': [existing_image]}),
+        ]
+
+    def _make_existing_image(self):
+        existing_image = fakes.make_fake_image(
+            image_id=str(uuid.uuid4()), image_name='existing',
+            data=self.imagefile.name)
+        existing_image['os_hash_algo'] = 'sha512'
+        existing_image['os_hash_value'] = hashlib.sha512(
+            self.output).hexdigest()
+        return existing_image
+
+    def test_create_image_put_v2_deduplicate_existing(self):
+        self.cloud.image_api_use_tasks = False
+        endpoint = self.cloud._object_store_client.get_endpoint()
+        existing_image = self._make_existing_image()
+        uris = self._get_deduplicate_uris(existing_image)
+        uris.append(
+            dict(method='HEAD',
+                 uri='{endpoint}/images/existing'.format(endpoint=endpoint),
+                 status_code=404))
+        self.register_uris(uris)
+
+        image = self.cloud.create_image(
+            self.image_name, self.imagefile.name, deduplicate=True)
+
+        self.assert_calls()
+        self.assertEqual(existing_image['id'], image.id)
+
+    def test_create_image_put_v2_deduplicate_web_download(self):
+        self.cloud.image_api_use_tasks = False
+        endpoint = self.cloud._object_store_client.get_endpoint()
+        existing_image = self._make_existing_image()
+        created_image = dict(self.fake_image_dict, status='queued')
+        uris = self._get_deduplicate_uris(existing_image)
+        uris.extend([
+            dict(method='HEAD',
+                 uri='{endpoint}/images/existing'.format(endpoint=endpoint),
+                 headers={'Content-Length': '2'}),
+            dict(method='HEAD',
+                 uri=endpoint + '/',
+                 headers={'X-Account-Meta-Temp-Url-Key': 'secret'}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['info', 'import'],
+                     base_url_append='v2'),
+                 json={'import-methods': {
+                     'value': ['glance-direct', 'web-download']}}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'image', append=['images'], base_url_append='v2'),
+                 json=created_image,
+                 validate=dict(
+                     json={
+                         u'container_format': u'bare',
+                         u'disk_format': u'qcow2',
+                         u'name': self.image_name,
+                         u'owner_specified.openstack.md5':
+                             self.fake_image_dict[
+                                 'owner_specified.openstack.md5'],
+                         u'owner_specified.openstack.object': self.object_name,
+                         u'owner_specified.openstack.sha256':
+                             self.fake_image_dict[
+                                 'owner_specified.openstack.sha256']})),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'image', append=['images', self.image_id, 'import'],
+                     base_url_append='v2'),
+                 status_code=202),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'],
+                     base_url_append='v2',
+                     qs_elements=['id=in:' + self.image_id]),
+                 json={'images': [self.fake_image_dict]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'], base_url_append='v2'),
+                 complete_qs=True,
+                 json=self.fake_search_return),
+        ])
+        self.register_uris(uris)
+
+        image = self.cloud.create_image(
+            self.image_name, self.imagefile.name, deduplicate=True,
+            wait=True)
+
+        self.assert_calls()
+        self.assertEqual(self.image_id, image.id)
+        self.assertEqual('active', image.status)
+        method = self.adapter.request_history[-3].json()['method']
+        self.assertEqual('web-download', method['name'])
+        self.assertTrue(method['uri'].startswith(
+            '{endpoint}/images/existing?temp_url_sig='.format(
+                endpoint=endpoint)))
+
+    def test_create_image_deduplicate_stream(self):
+        self.assertRaises(
+            exceptions.SDKException,
+            self.cloud.create_image,
+            self.image_name, data=io.BytesIO(self.output), deduplicate=True)
+
     def test_create_image_put_bad_int(self):
         self.cloud.image_api_use_tasks = False
 
@@ -10,12 +10,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
 import datetime
+import itertools
 from unittest import mock
 import uuid
 import warnings
 
 from openstack.block_storage.v3 import volume
+from openstack.compute.v2 import _console
 from openstack.compute.v2 import _proxy
 from openstack.compute.v2 import aggregate
 from openstack.compute.v2 import availability_zone as az
@@ -36,7 +39,9 @@ from openstack.compute.v2 import server_remote_console
 from openstack.compute.v2 import service
 from openstack.compute.v2 import usage
 from openstack.compute.v2 import volume_attachment
+from openstack import exceptions
 from openstack import resource
+from openstack.tests.unit import base
 from openstack.tests.unit import test_proxy_base
 
 
@@ -1324,6 +1329,61 @@ class TestCompute(TestComputeProxy):
             },
         )
 
+    @mock.patch.object(usage.Usage, 'iter_pages', autospec=True)
+    def test_server_usages(self, mock_pages):
+        start = datetime.datetime(2022, 1, 1)
+        mock_pages.return_value = iter([
+            usage.Usage(server_usages=[{'instance_id': '1'}]),
+            usage.Usage(server_usages=[{'instance_id': '2'}]),
+        ])
+
+        result = self.proxy.server_usages('project', start=start, limit=1)
+
+        self.assertEqual(['1', '2'], [s.instance_id for s in result])
+        mock_pages.assert_called_once_with(
+            mock.ANY, self.proxy, limit=1, start=start.isoformat())
+        self.assertEqual('project', mock_pages.call_args[0][0].id)
+
+    @mock.patch.object(_proxy.Proxy, '_list', autospec=True)
+    def test_usage_totals(self, mock_list):
+        mock_list.return_value = iter([
+            usage.Usage(project_id='a', total_hours=1, total_vcpus_usage=2),
+            usage.Usage(project_id='b', total_hours=3),
+            usage.Usage(project_id='a', total_hours=4, total_vcpus_usage=1),
+        ])
+
+        result = self.proxy.usage_totals()
+
+        self.assertEqual({'a', 'b'}, set(result))
+        self.assertEqual(5, result['a'].total_hours)
+        self.assertEqual(3, result['a'].total_vcpus_usage)
+        self.assertEqual(3, result['b'].total_hours)
+        self.assertEqual(0, result['b'].total_memory_mb_usage)
+        mock_list.assert_called_once_with(
+            self.proxy, usage.Usage, detailed=False, limit=1000)
+
+    @mock.patch.object(usage.Usage, 'iter_pages', autospec=True)
+    def test_usage_totals_projects(self, mock_pages):
+        executor = concurrent.futures.ThreadPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        self.proxy._connection = mock.Mock(_pool_executor=executor)
+
+        def _pages(res, session, limit=None, **query):
+            return iter([
+                usage.Usage(project_id=res.id, total_hours=1),
+                usage.Usage(project_id=res.id, total_hours=2),
+            ])
+
+        mock_pages.side_effect = _pages
+
+        result = self.proxy.usage_totals(
+            ['a', 'b', 'c'], limit=10, concurrency=2)
+
+        self.assertEqual({'a', 'b', 'c'}, set(result))
+        for project_id in 'abc':
+            self.assertEqual(3, result[project_id].total_hours)
+        self.assertEqual(3, mock_pages.call_count)
+
     def test_create_server_remote_console(self):
         self.verify_create(
             self.proxy.create_server_remote_console,
@@ -1486,3 +1546,256 @@ class TestServerAction(TestComputeProxy):
             method_kwargs={'server': 'server_a'},
             expected_kwargs={'server_id': 'server_a'},
         )
+
+
+@mock.patch.object(_proxy.Proxy, 'servers', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'get_server', autospec=True)
+@mock.patch.object(_proxy.Proxy, 'reboot_server', autospec=True)
+class TestBatchAction(base.TestCase):
+
+    def setUp(self):
+        super(TestBatchAction, self).setUp()
+        self.session = mock.Mock()
+        self.proxy = _proxy.Proxy(self.session)
+        executor = concurrent.futures.ThreadPoolExecutor(4)
+        self.addCleanup(executor.shutdown)
+        self.proxy._connection = mock.Mock(_pool_executor=executor)
+        self.servers = [
+            server.Server(id=str(i), status='ACTIVE',
+                          compute_host='host%d' % (i // 3))
+            for i in range(4)]
+
+    def _finished(self, status='ACTIVE'):
+        return [
+            server.Server(id=s.id, status=status) for s in self.servers]
+
+    def test_reboot(self, mock_reboot, mock_get, mock_servers):
+        mock_servers.return_value = self._finished()
+
+        result = self.proxy.batch_action(self.servers, 'reboot', interval=0)
+
+        self.assertEqual(['0', '1', '2', '3'], [s.id for s in result.success])
+        self.assertEqual([], result.failure)
+        for s in self.servers:
+            mock_reboot.assert_any_call(self.proxy, s, reboot_type='SOFT')
+        self.assertFalse(mock_get.called)
+        mock_servers.assert_called_with(
+            self.proxy, changes_since=mock.ANY, all_projects=False)
+
+    def test_failures(self, mock_reboot, mock_get, mock_servers):
+        finished = self._finished()
+        finished[2].status = 'ERROR'
+        mock_servers.return_value = finished
+
+        def _reboot(_self, s, reboot_type):
+            if s.id == '1':
+                raise exceptions.ConflictException()
+
+        mock_reboot.side_effect = _reboot
+
+        result = self.proxy.batch_action(
+            self.servers, 'reboot', interval=0, reboot_type='HARD')
+
+        self.assertEqual(['0', '3'], [s.id for s in result.success])
+        self.assertEqual(['1', '2'], [s.id for s, e in result.failure])
+        self.assertIsInstance(result.failure[0][1],
+                              exceptions.ConflictException)
+        self.assertIsInstance(result.failure[1][1],
+                              exceptions.ResourceFailure)
+        mock_reboot.assert_any_call(self.proxy, self.servers[0],
+                                    reboot_type='HARD')
+
+    def test_deleted(self, mock_reboot, mock_get, mock_servers):
+        finished = self._finished()
+        finished[1].status = 'DELETED'
+        mock_servers.return_value = finished
+
+        result = self.proxy.batch_action(self.servers, 'reboot', interval=0)
+
+        self.assertEqual(['0', '2', '3'], [s.id for s in result.success])
+        self.assertEqual(['1'], [s.id for s, e in result.failure])
+        self.assertIsInstance(result.failure[0][1],
+                              exceptions.ResourceFailure)
+
+    @mock.patch.object(_proxy.Proxy, 'resize_server', autospec=True)
+    def test_back_to_previous(self, mock_resize, mock_reboot, mock_get,
+                              mock_servers):
+        polls = [
+            [server.Server(id='0', status='RESIZE', task_state='resize_prep'),
+             server.Server(id='1', status='ACTIVE', task_state='resize_prep'),
+             server.Server(id='2', status='VERIFY_RESIZE')],
+            [server.Server(id='0', status='ACTIVE'),
+             server.Server(id='1', status='ACTIVE',
+                           fault={'message': 'No valid host'})],
+        ]
+        mock_servers.side_effect = lambda *a, **kw: (
+            polls.pop(0) if polls else [])
+
+        result = self.proxy.batch_action(
+            self.servers[:3], 'resize', interval=0, timeout=0.5, flavor='f')
+
+        self.assertEqual(['2'], [s.id for s in result.success])
+        self.assertEqual(['0', '1'], [s.id for s, e in result.failure])
+        for s, e in result.failure:
+            self.assertIsInstance(e, exceptions.ResourceFailure)
+        mock_resize.assert_any_call(self.proxy, self.servers[0], flavor='f')
+
+    def test_all_projects(self, mock_reboot, mock_get, mock_servers):
+        self.session.get_project_id.return_value = 'mine'
+        self.servers[0].project_id = 'other'
+        mock_servers.return_value = self._finished()
+
+        self.proxy.batch_action(self.servers, 'reboot', interval=0)
+
+        mock_servers.assert_called_with(
+            self.proxy, changes_since=mock.ANY, all_projects=True)
+
+    def test_host_turns(self, mock_reboot, mock_get, mock_servers):
+        mock_servers.return_value = self._finished()
+
+        self.proxy.batch_action(
+            self.servers, 'reboot', concurrency=1, interval=0)
+
+        # host0 has servers 0 to 2 and host1 server 3
+        self.assertEqual(
+            ['0', '3', '1', '2'],
+            [c[0][1].id for c in mock_reboot.call_args_list])
+
+    def test_by_id(self, mock_reboot, mock_get, mock_servers):
+        def _get(_self, s):
+            if s.id == 'missing':
+                raise exceptions.ResourceNotFound()
+            return server.Server(id=s.id, status='ACTIVE')
+
+        mock_get.side_effect = _get
+
+        result = self.proxy.batch_action(
+            ['missing', '0'], 'reboot', wait=False)
+
+        self.assertEqual(['0'], [s.id for s in result.success])
+        self.assertEqual(['missing'], [s.id for s, e in result.failure])
+        self.assertEqual(1, mock_reboot.call_count)
+        self.assertFalse(mock_servers.called)
+
+    def test_timeout(self, mock_reboot, mock_get, mock_servers):
+        mock_servers.return_value = self._finished('REBOOT')
+
+        result = self.proxy.batch_action(
+            self.servers, 'reboot', interval=0, timeout=0.5)
+
+        self.assertEqual([], result.success)
+        self.assertEqual(4, len(result.failure))
+        for s, e in result.failure:
+            self.assertIsInstance(e, exceptions.ResourceTimeout)
+
+    def test_invalid(self, mock_reboot, mock_get, mock_servers):
+        self.assertRaises(ValueError, self.proxy.batch_action,
+                          self.servers, 'dance')
+        self.assertRaises(ValueError, self.proxy.batch_action,
+                          self.servers, 'reboot', concurrency=0)
+        self.assertFalse(mock_reboot.called)
+
+
+@mock.patch.object(_proxy.Proxy, 'get_server_console_output', autospec=True)
+class TestTailConsoleOutput(base.TestCase):
+
+    def setUp(self):
+        super(TestTailConsoleOutput, self).setUp()
+        self.session = mock.Mock()
+        self.proxy = _proxy.Proxy(self.session)
+        # Lines added to the log of every server before every poll
+        self.growth = {}
+        self.logs = {}
+
+    def _get_output(self, _self, server, length=None):
+        log = self.logs.setdefault(server.id, '')
+        growth = self.growth.get(server.id)
+        if growth:
+            log = self.logs[server.id] = log + growth.pop(0)
+        if length is not None:
+            # As the _tail_log of the compute service
+            log = '\n'.join(log.split('\n')[-length:]) if length else ''
+        return {'output': log}
+
+    def test_no_follow(self, mock_output):
+        mock_output.side_effect = self._get_output
+        self.growth['id'] = ['a\nb\nc']
+
+        result = list(self.proxy.tail_console_output('id', follow=False))
+
+        # The last line is incomplete
+        self.assertEqual(['a', 'b'], result)
+        mock_output.assert_called_once_with(self.proxy, mock.ANY, length=None)
+
+    def test_lines(self, mock_output):
+        mock_output.side_effect = self._get_output
+        self.growth['id'] = ['a\nb\nc\nd\n']
+
+        result = list(self.proxy.tail_console_output(
+            'id', follow=False, lines=2))
+
+        self.assertEqual(['c', 'd'], result)
+
+    def test_follow(self, mock_output):
+        mock_output.side_effect = self._get_output
+        self.growth['id'] = [
+            'boot\n' * 3,
+            'start\n',
+            '',
+            ''.join('line %d\n' % i for i in range(100)),
+            'done\n',
+        ]
+
+        result = list(itertools.islice(self.proxy.tail_console_output(
+            'id', interval=0, max_interval=0, lines=10), 105))
+
+        self.assertEqual(
+            ['boot'] * 3 + ['start']
+            + ['line %d' % i for i in range(100)] + ['done'],
+            result)
+        lengths = [c[1]['length'] for c in mock_output.call_args_list]
+        # Starts with the lines asked for, then enough lines to find the
+        # last ones seen, twice more when they are not found
+        self.assertEqual([11, 25, 25, 25, 50, 100, 200], lengths)
+
+    def test_log_cleared(self, mock_output):
+        mock_output.side_effect = self._get_output
+        self.growth['id'] = ['a\nb\n', '']
+
+        result = self.proxy.tail_console_output(
+            'id', interval=0, max_interval=0)
+        self.assertEqual(['a', 'b'], [next(result), next(result)])
+        self.logs['id'] = 'c\n'
+        self.assertEqual('c', next(result))
+
+    def test_backoff(self, mock_output):
+        mock_output.side_effect = self._get_output
+        tail = _console.ConsoleTail(
+            self.proxy, server.Server(id='id'), interval=2, max_interval=5)
+
+        self.growth['id'] = ['a\n', '', '', '', 'b\n']
+        intervals = []
+        for _ in range(5):
+            tail.poll()
+            intervals.append(tail.interval)
+
+        self.assertEqual([2, 3, 4.5, 5, 2], intervals)
+
+    def test_many_servers(self, mock_output):
+        mock_output.side_effect = self._get_output
+        self.growth['a'] = ['a1\n', 'a2\n']
+        self.growth['b'] = ['b1\n']
+
+        def _get_output(_self, server, length=None):
+            if server.id == 'b' and server.id in self.logs:
+                raise exceptions.ResourceNotFound()
+            return self._get_output(_self, server, length=length)
+
+        mock_output.side_effect = _get_output
+
+        result = self.proxy.tail_console_outputs(
+            ['a', 'b'], interval=0, max_interval=0)
+
+        self.assertEqual(
+            [('a', 'a1'), ('b', 'b1'), ('a', 'a2')],
+            [(s.id, line) for s, line in itertools.islice(result, 3)])
@@ -10,6 +10,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+from unittest import mock
+
+from keystoneauth1 import adapter
+
 from openstack.compute.v2 import usage
 from openstack.tests.unit import base
 
@@ -97,3 +102,51 @@ class TestUsage(base.TestCase):
         )
         self.assertEqual(EXAMPLE['server_usages'][0]['state'], ssot.state)
         self.assertEqual(EXAMPLE['server_usages'][0]['uptime'], ssot.uptime)
+
+    def test_iter_pages(self):
+        first = copy.deepcopy(EXAMPLE)
+        second = copy.deepcopy(EXAMPLE)
+        second['server_usages'][0]['instance_id'] = 'second'
+        second['total_hours'] = 1
+        responses = []
+        for body in (
+            {
+                'tenant_usage': first,
+                'tenant_usage_links': [{
+                    'rel': 'next',
+                    'href': 'http://compute/os-simple-tenant-usage/'
+                            'project?limit=1&marker=first',
+                }],
+            },
+            {'tenant_usage': second},
+        ):
+            response = mock.Mock(status_code=200)
+            response.json.return_value = body
+            responses.append(response)
+        seen = []
+
+        def _get(url, params=None, **kwargs):
+            # The params are updated for the next page
+            seen.append(dict(params))
+            return responses.pop(0)
+
+        sess = mock.Mock(spec=adapter.Adapter)
+        sess.default_microversion = '2.75'
+        sess._get_connection = mock.Mock(return_value=self.cloud)
+        sess.get.side_effect = _get
+
+        sot = usage.Usage(id='project')
+        pages = list(sot.iter_pages(sess, limit=1, start='2022-01-01'))
+
+        self.assertEqual(2, len(pages))
+        self.assertEqual(EXAMPLE['total_hours'], pages[0].total_hours)
+        self.assertEqual(1, pages[1].total_hours)
+        self.assertEqual(
+            'second', pages[1].server_usages[0].instance_id)
+        self.assertEqual(
+            [{'limit': 1, 'start': '2022-01-01'},
+             {'limit': 1, 'start': '2022-01-01', 'marker': 'first'}],
+            seen)
+        sess.get.assert_called_with(
+            'os-simple-tenant-usage/project', microversion='2.75',
+            params=mock.ANY)
@@ -0,0 +1,133 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import json
+import os
+import stat
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import fixture
+
+from openstack import config
+from openstack.config import auth_cache
+from openstack import exceptions
+from openstack.tests.unit.config import base
+
+
+def _state(expires_in):
+    token = fixture.V3Token(
+        expires=datetime.datetime.utcnow()
+        + datetime.timedelta(seconds=expires_in))
+    return json.dumps({'auth_token': 'token', 'body': token})
+
+
+class TestFileAuthCache(base.TestCase):
+
+    def setUp(self):
+        super(TestFileAuthCache, self).setUp()
+        self.cache_path = self.useFixture(fixtures.TempDir()).path
+        self.sot = auth_cache.FileAuthCache(self.cache_path)
+
+    def test_get_set(self):
+        state = _state(3600)
+        self.assertIsNone(self.sot.get('id'))
+        self.sot.set('id', state)
+        self.assertEqual(state, self.sot.get('id'))
+        self.assertIsNone(self.sot.get('other/id'))
+
+    def test_permissions(self):
+        self.sot.set('id', _state(3600))
+        path = self.sot._get_path('id')
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+        self.assertEqual(
+            0o700, stat.S_IMODE(os.stat(self.sot.directory).st_mode))
+
+    def test_expired(self):
+        self.sot.set('id', _state(10))
+        self.assertIsNone(self.sot.get('id'))
+        self.assertFalse(os.path.exists(self.sot._get_path('id')))
+
+    def test_invalid_state(self):
+        self.sot.set('id', 'garbage')
+        self.assertIsNone(self.sot.get('id'))
+
+    def test_delete(self):
+        self.sot.delete('id')
+        self.sot.set('id', _state(3600))
+        self.sot.delete('id')
+        self.assertIsNone(self.sot.get('id'))
+
+    def test_requires_path(self):
+        self.assertRaises(
+            exceptions.ConfigException, auth_cache.FileAuthCache, None)
+
+
+class FakeBackend(auth_cache.AuthCacheBackend):
+
+    def get(self, cache_id):
+        return None
+
+    def set(self, cache_id, state):
+        pass
+
+    def delete(self, cache_id):
+        pass
+
+
+class TestGetBackend(base.TestCase):
+
+    def test_file(self):
+        self.assertIsInstance(
+            auth_cache.get_backend('file', '/tmp'),
+            auth_cache.FileAuthCache)
+
+    def test_import_path(self):
+        backend = auth_cache.get_backend(
+            __name__ + '.FakeBackend', cache_path='/tmp')
+        self.assertIsInstance(backend, FakeBackend)
+        self.assertEqual('/tmp', backend.cache_path)
+
+    def test_abstract(self):
+        self.assertRaises(TypeError, auth_cache.AuthCacheBackend)
+
+    def test_unknown(self):
+        for name in ('memcached', 'openstack.config.Missing'):
+            self.assertRaises(
+                exceptions.ConfigException, auth_cache.get_backend, name)
+
+    @mock.patch('openstack.config.cloud_region.keyring')
+    def test_region(self, kr_mock):
+        cache_path = self.useFixture(fixtures.TempDir()).path
+        state = _state(3600)
+        with mock.patch(
+            'keystoneauth1.identity.base.BaseIdentityPlugin.get_auth_state',
+            return_value=state,
+        ):
+            region = self._get_region(cache_path)
+            region.set_auth_cache()
+        with mock.patch(
+            'keystoneauth1.identity.base.BaseIdentityPlugin.set_auth_state'
+        ) as set_state:
+            self._get_region(cache_path)
+        set_state.assert_called_once_with(state)
+        kr_mock.get_password.assert_not_called()
+        kr_mock.set_password.assert_not_called()
+
+    def _get_region(self, cache_path):
+        c = config.OpenStackConfig(
+            config_files=[self.cloud_yaml], secure_files=[])
+        c._cache_auth = True
+        c._cache_auth_backend = 'file'
+        c._cache_path = cache_path
+        return c.get_one('_test-cloud_')
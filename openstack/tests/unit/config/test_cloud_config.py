@@ -11,6 +11,7 @@
 # under the License.
 
 import copy
+import pickle
 from unittest import mock
 
 from keystoneauth1 import exceptions as ksa_exceptions
@@ -269,6 +270,65 @@ class TestCloudRegion(base.TestCase):
             exceptions.ConfigException,
             cc.get_session)
 
+    def test_get_http_pool_size(self):
+        cc = cloud_region.CloudRegion("test1", "region-al", {
+            'http_pool_maxsize': '20',
+            'object_store_http_pool_maxsize': 50,
+            'object_store_http_pool_connections': 2,
+        })
+        self.assertEqual((None, 20), cc.get_http_pool_size())
+        self.assertEqual((None, 20), cc.get_http_pool_size('compute'))
+        self.assertEqual((2, 50), cc.get_http_pool_size('object-store'))
+
+    def test_pool_defaults(self):
+        cc = cloud_region.CloudRegion("test1", "region-al", {})
+        self.assertEqual((None, None), cc.get_http_pool_size())
+        self.assertEqual(5, cc.get_pool_executor_size())
+        self.assertFalse(cc.get_share_pools())
+
+    def test_get_circuit_breaker(self):
+        cc = cloud_region.CloudRegion("test1", "region-al", {
+            'circuit_breaker_threshold': {'volume': '5'},
+        })
+        self.assertIsNone(cc.get_circuit_breaker('compute'))
+        self.assertEqual((5, 30.0), cc.get_circuit_breaker('volume'))
+
+    def test_get_token_refresh_margin(self):
+        cc = cloud_region.CloudRegion("test1", "region-al", {})
+        self.assertIsNone(cc.get_token_refresh_margin())
+        cc = cloud_region.CloudRegion(
+            "test1", "region-al", {'token_refresh_margin': '600'})
+        self.assertEqual(600.0, cc.get_token_refresh_margin())
+
+    def test_pickle(self):
+        config_dict = defaults.get_defaults()
+        config_dict.update(fake_services_dict)
+        config_dict['auth_type'] = 'password'
+        config_dict['auth'] = {
+            'auth_url': 'https://identity.example.com',
+            'username': 'user', 'password': 'secret'}
+        auth = mock.Mock()
+        auth.get_auth_state.return_value = '{"auth_token": "token"}'
+        cc = cloud_region.CloudRegion(
+            "test1", "region-al", config_dict, auth_plugin=auth,
+            session=mock.Mock(), password_callback=mock.Mock())
+
+        with mock.patch(
+            'keystoneauth1.identity.generic.password.Password.set_auth_state'
+        ) as set_auth_state:
+            copy = pickle.loads(pickle.dumps(cc))
+
+        self.assertEqual(cc, copy)
+        self.assertIsNone(copy._keystone_session)
+        self.assertEqual(
+            'https://identity.example.com', copy.get_auth().auth_url)
+        set_auth_state.assert_called_once_with('{"auth_token": "token"}')
+
+    def test_pickle_from_session(self):
+        cc = cloud_region.CloudRegion(
+            "test1", "region-al", {}, session=mock.Mock())
+        self.assertRaises(exceptions.SDKException, pickle.dumps, cc)
+
     @mock.patch.object(ksa_session, 'Session')
     def test_get_session(self, mock_session):
         config_dict = defaults.get_defaults()
@@ -0,0 +1,114 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import discover
+
+from openstack.config import _discovery_cache
+from openstack.config import cloud_region
+from openstack.tests.unit.config import base
+
+URL = 'https://compute.example.com'
+VERSIONS = [{
+    'id': 'v2.1',
+    'status': 'CURRENT',
+    'links': [{'href': URL + '/v2.1', 'rel': 'self'}],
+    'min_version': '2.1',
+    'version': '2.90',
+}]
+
+
+class TestDiscoveryCache(base.TestCase):
+
+    def setUp(self):
+        super(TestDiscoveryCache, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'sub', 'discovery.json')
+        self.disc = _discovery_cache._CachedDiscover(URL, VERSIONS)
+
+    def test_persisted(self):
+        sot = _discovery_cache.DiscoveryCache(self.path, 60)
+        self.assertIsNone(sot.get(URL))
+        sot[URL] = self.disc
+
+        # A new process reuses the document without fetching it
+        restored = _discovery_cache.DiscoveryCache(self.path, 60)[URL]
+        self.assertIsInstance(restored, discover.Discover)
+        self.assertEqual(
+            self.disc.version_data(), restored.version_data())
+        # No temporary file is left behind
+        self.assertEqual(
+            ['discovery.json'], os.listdir(os.path.dirname(self.path)))
+
+    def test_not_written_again(self):
+        sot = _discovery_cache.DiscoveryCache(self.path, 60)
+        sot[URL] = self.disc
+        with mock.patch.object(sot, '_write') as write:
+            sot[URL] = sot[URL]
+        write.assert_not_called()
+
+    def test_expired(self):
+        sot = _discovery_cache.DiscoveryCache(self.path, 60)
+        with mock.patch('time.time', return_value=1000):
+            sot[URL] = self.disc
+        with mock.patch('time.time', return_value=1061):
+            self.assertIsNone(
+                _discovery_cache.DiscoveryCache(self.path, 60).get(URL))
+        with mock.patch('time.time', return_value=10 ** 10):
+            self.assertIsNotNone(
+                _discovery_cache.DiscoveryCache(self.path, -1).get(URL))
+
+    def test_merges_entries(self):
+        first = _discovery_cache.DiscoveryCache(self.path, 60)
+        second = _discovery_cache.DiscoveryCache(self.path, 60)
+        first.get(URL)
+        second['https://image.example.com'] = self.disc
+        first[URL] = self.disc
+        with open(self.path) as f:
+            self.assertEqual(
+                {URL, 'https://image.example.com'},
+                set(json.load(f)['entries']))
+
+    def test_delete(self):
+        sot = _discovery_cache.DiscoveryCache(self.path, 60)
+        sot[URL] = self.disc
+        del sot[URL]
+        self.assertNotIn(URL, _discovery_cache.DiscoveryCache(self.path, 60))
+        self.assertRaises(KeyError, sot.__delitem__, URL)
+
+    def test_corrupted_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        sot = _discovery_cache.DiscoveryCache(self.path, 60)
+        self.assertIsNone(sot.get(URL))
+        sot[URL] = self.disc
+        self.assertIn(URL, _discovery_cache.DiscoveryCache(self.path, 60))
+
+    def test_cloud_region(self):
+        cache_path = os.path.dirname(self.path)
+        cc = cloud_region.CloudRegion(
+            'test1', 'region-al', {}, cache_path=cache_path,
+            cache_expirations={'discovery': 3600})
+        self.assertIsInstance(
+            cc._discovery_cache, _discovery_cache.DiscoveryCache)
+        self.assertEqual(
+            os.path.join(cache_path, 'discovery.json'),
+            cc._discovery_cache.path)
+
+        cc = cloud_region.CloudRegion(
+            'test1', 'region-al', {}, cache_path=cache_path)
+        self.assertIsNone(cc._discovery_cache)
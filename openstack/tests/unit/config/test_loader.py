@@ -15,6 +15,7 @@
 import os
 import tempfile
 import textwrap
+from unittest import mock
 
 from openstack.config import loader
 from openstack import exceptions
@@ -117,6 +118,51 @@ class TestLoader(base.TestCase):
             tested_files)
         self.assertEqual(None, path)
 
+    def test__load_yaml_json_file_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, 'clouds.yaml')
+            with open(fn, 'w') as fp:
+                fp.write(FILES['yaml'])
+            config = loader.OpenStackConfig()
+
+            with mock.patch.object(
+                    loader.yaml, 'safe_load', wraps=loader.yaml.safe_load
+            ) as safe_load:
+                _, first = config._load_yaml_json_file([fn])
+                # Callers get their own copy
+                first['foo'] = 'changed'
+                _, second = config._load_yaml_json_file([fn])
+                self.assertEqual('bar', second['foo'])
+                self.assertEqual(1, safe_load.call_count)
+
+                with open(fn, 'w') as fp:
+                    fp.write('foo: other\n')
+                _, third = config._load_yaml_json_file([fn])
+                self.assertEqual({'foo': 'other'}, third)
+                self.assertEqual(2, safe_load.call_count)
+
+    def test_get_all_reuses_templates(self):
+        c = loader.OpenStackConfig(
+            config_files=[self.cloud_yaml], vendor_files=[self.vendor_yaml],
+            secure_files=[])
+        with mock.patch.object(
+                c, '_expand_vendor_profile',
+                wraps=c._expand_vendor_profile) as expand:
+            c.get_one('_test_cloud_regions', region_name='region1')
+            c.get_one('_test_cloud_regions', region_name='region2')
+        expand.assert_called_once()
+
+    def test_plugin_loader_cached(self):
+        c = loader.OpenStackConfig(
+            config_files=[self.cloud_yaml], secure_files=[])
+        loader._auth_loaders.pop('password', None)
+        with mock.patch.object(
+                loader.loading, 'get_plugin_loader',
+                wraps=loader.loading.get_plugin_loader) as get_loader:
+            c.get_one('_test-cloud_')
+            c.get_one('_test-cloud_')
+        get_loader.assert_called_once_with('password')
+
 
 class TestFixArgv(base.TestCase):
     def test_no_changes(self):
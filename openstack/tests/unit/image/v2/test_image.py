@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
 import io
 import operator
 import tempfile
@@ -143,6 +144,7 @@ class TestImage(base.TestCase):
         self.assertDictEqual(
             {
                 'created_at': 'created_at',
+                'hash_value': 'os_hash_value',
                 'id': 'id',
                 'is_hidden': 'os_hidden',
                 'limit': 'limit',
@@ -150,6 +152,8 @@ class TestImage(base.TestCase):
                 'member_status': 'member_status',
                 'name': 'name',
                 'owner': 'owner',
+                'owner_specified.openstack.sha256':
+                    'owner_specified.openstack.sha256',
                 'protected': 'protected',
                 'size_max': 'size_max',
                 'size_min': 'size_min',
@@ -462,7 +466,8 @@ class TestImage(base.TestCase):
 
     def test_image_download_output_fd(self):
         output_file = io.BytesIO()
-        sot = image.Image(**EXAMPLE)
+        sot = image.Image(**dict(
+            EXAMPLE, os_hash_value=hashlib.sha512(b'0102').hexdigest()))
         response = mock.Mock()
         response.status_code = 200
         response.iter_content.return_value = [b'01', b'02']
@@ -476,7 +481,8 @@ class TestImage(base.TestCase):
         self.assertEqual(b'0102', output_file.read())
 
     def test_image_download_output_file(self):
-        sot = image.Image(**EXAMPLE)
+        sot = image.Image(**dict(
+            EXAMPLE, os_hash_value=hashlib.sha512(b'0102').hexdigest()))
         response = mock.Mock()
         response.status_code = 200
         response.iter_content.return_value = [b'01', b'02']
@@ -491,6 +497,77 @@ class TestImage(base.TestCase):
         output_file.seek(0)
         self.assertEqual(b'0102', output_file.read())
 
+    def test_image_download_output_hash_mismatch(self):
+        sot = image.Image(**EXAMPLE)
+        response = FakeResponse(
+            b'', headers={'Content-MD5': calculate_md5_checksum([b'0102'])})
+        response.raw = io.BytesIO(b'0102')
+        self.sess.get = mock.Mock(return_value=response)
+
+        self.assertRaises(
+            exceptions.SDKException,
+            sot.download, self.sess, output=io.BytesIO())
+
+    def _get_range(self, data, url, stream=False, headers=None):
+        start, end = headers['Range'][len('bytes='):].split('-')
+        part = data[int(start):int(end) + 1]
+        response = FakeResponse(b'', status_code=206, headers={
+            'Content-Range': 'bytes %s-%s/%d' % (start, end, len(data))})
+        response.raw = io.BytesIO(part)
+        return response
+
+    @mock.patch('openstack.image._download._PART_SIZE', 4)
+    def test_image_download_parallel(self):
+        data = b'abcdefghijklmnopqrstuvwxyz'
+        sot = image.Image(**dict(
+            EXAMPLE, checksum=calculate_md5_checksum([data]),
+            os_hash_value=hashlib.sha512(data).hexdigest()))
+        self.sess.get = mock.Mock(
+            side_effect=lambda *args, **kwargs: self._get_range(
+                data, *args, **kwargs))
+        sot.fetch = mock.Mock(return_value=sot)
+        with tempfile.NamedTemporaryFile() as output_file:
+            sot.download(self.sess, output=output_file.name, parallel=3)
+            self.assertEqual(data, output_file.read())
+        # One request per part of 4 bytes
+        self.assertEqual(7, self.sess.get.call_count)
+        self.sess.get.assert_any_call(
+            'images/IDENTIFIER/file', stream=True,
+            headers={'Range': 'bytes=24-25'})
+
+    @mock.patch('openstack.image._download._PART_SIZE', 4)
+    def test_image_download_parallel_hash_mismatch(self):
+        data = b'abcdefghijklmnopqrstuvwxyz'
+        sot = image.Image(**dict(
+            EXAMPLE, checksum=calculate_md5_checksum([data]),
+            os_hash_value=hashlib.sha512(b'other').hexdigest()))
+        self.sess.get = mock.Mock(
+            side_effect=lambda *args, **kwargs: self._get_range(
+                data, *args, **kwargs))
+        sot.fetch = mock.Mock(return_value=sot)
+        with tempfile.NamedTemporaryFile() as output_file:
+            self.assertRaises(
+                exceptions.SDKException,
+                sot.download, self.sess, output=output_file.name,
+                parallel=3)
+
+    def test_image_download_parallel_range_ignored(self):
+        data = b'abcdefghijklmnopqrstuvwxyz'
+        sot = image.Image(**dict(
+            EXAMPLE, os_hash_value=hashlib.sha512(data).hexdigest()))
+        response = FakeResponse(
+            b'', headers={'Content-MD5': calculate_md5_checksum([data])})
+        response.raw = io.BytesIO(data)
+        self.sess.get = mock.Mock(return_value=response)
+        with tempfile.NamedTemporaryFile() as output_file:
+            sot.download(
+                self.sess, output=output_file.name, chunk_size=4,
+                parallel=3)
+            self.assertEqual(data, output_file.read())
+        self.sess.get.assert_called_once_with(
+            'images/IDENTIFIER/file', stream=True,
+            headers={'Range': 'bytes=0-16777215'})
+
     def test_image_update(self):
         values = EXAMPLE.copy()
         del values['instance_uuid']
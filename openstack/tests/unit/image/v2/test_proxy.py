@@ -11,11 +11,14 @@
 # under the License.
 
 import io
+import queue
 from unittest import mock
 
+import fixtures
 import requests
 
 from openstack import exceptions
+from openstack.image import _import
 from openstack.image.v2 import _proxy
 from openstack.image.v2 import image as _image
 from openstack.image.v2 import member as _member
@@ -171,6 +174,7 @@ class TestImage(TestImageProxy):
             stores=None,
             all_stores=None,
             all_stores_must_succeed=None,
+            hash_while_uploading=False,
             wait=False,
         )
 
@@ -219,6 +223,7 @@ class TestImage(TestImageProxy):
             stores=None,
             all_stores=None,
             all_stores_must_succeed=None,
+            hash_while_uploading=False,
             wait=False,
         )
 
@@ -306,6 +311,7 @@ class TestImage(TestImageProxy):
                 'output': 'some_output',
                 'chunk_size': 1,
                 'stream': True,
+                'parallel': 1,
             },
         )
 
@@ -415,6 +421,112 @@ class TestImage(TestImageProxy):
         )
 
 
+class TestImportImages(TestImageProxy):
+
+    def setUp(self):
+        super(TestImportImages, self).setUp()
+        self.import_image = self.useFixture(fixtures.MockPatchObject(
+            _image.Image, 'import_image',
+            return_value=FakeResponse({}, status_code=202))).mock
+        self.stage = self.useFixture(fixtures.MockPatchObject(
+            _image.Image, 'stage')).mock
+        self.proxy.images = mock.Mock()
+        self.status_queue = queue.Queue()
+
+    def _image(self, id, status='active', stores='', importing='',
+               failed=''):
+        return _image.Image(
+            id=id, status=status, stores=stores,
+            os_glance_importing_to_stores=importing,
+            os_glance_failed_import=failed)
+
+    def _import_images(self, images, **kwargs):
+        return self.proxy.import_images(
+            images, interval=0, status_queue=self.status_queue, **kwargs)
+
+    def test_import_images_retry_failed_store(self):
+        self.proxy.images.side_effect = [
+            [self._image('a', stores='fast', importing='slow'),
+             self._image('b', stores='fast,slow')],
+            [self._image('a', stores='fast', failed='slow')],
+            [self._image('a', stores='fast,slow')],
+        ]
+
+        result = self._import_images(['a', 'b'], stores=['fast', 'slow'])
+
+        self.assertEqual(
+            [_import.SUCCESS, _import.SUCCESS],
+            [item.status for item in result])
+        self.assertEqual({'fast', 'slow'}, result[0].active_stores)
+        self.assertEqual(1, result[0].retries)
+        self.proxy.images.assert_has_calls([
+            mock.call(id='in:a,b'),
+            mock.call(id='in:a'),
+            mock.call(id='in:a'),
+        ])
+        self.assertEqual(3, self.import_image.call_count)
+        retry_call = self.import_image.call_args_list[2]
+        self.assertEqual('copy-image', retry_call[1]['method'])
+        self.assertEqual(
+            ['slow'], [store.id for store in retry_call[1]['stores']])
+        self.stage.assert_not_called()
+        progress = self.status_queue.get_nowait()
+        self.assertEqual((2, 0, 0, 0, 2), progress[:5])
+        progress = self.status_queue.get_nowait()
+        self.assertEqual((2, 1, 0, 0, 1), progress[:5])
+        progress = self.status_queue.get_nowait()
+        self.assertEqual((2, 2, 0, 0, 0), progress[:5])
+        self.assertTrue(self.status_queue.empty())
+
+    def test_import_images_retries_exhausted(self):
+        self.proxy.images.side_effect = [
+            [self._image('a', stores='fast', failed='slow')],
+            [self._image('a', stores='fast', failed='slow')],
+        ]
+
+        result = self._import_images(['a'], all_stores=True)
+
+        self.assertEqual(_import.PARTIAL, result[0].status)
+        self.assertEqual({'slow'}, result[0].failed_stores)
+        self.assertEqual(2, self.import_image.call_count)
+
+    def test_import_images_stage(self):
+        data = io.BytesIO(b'data')
+        self.proxy.images.side_effect = [
+            [self._image('a', status='queued', failed='fast')],
+        ]
+
+        result = self._import_images(
+            [{'image': 'a', 'data': data}], stores=['fast'])
+
+        self.assertEqual(_import.FAILED, result[0].status)
+        self.assertEqual('glance-direct', result[0].method)
+        self.stage.assert_called_once_with(self.proxy)
+        # The stream cannot be staged again
+        self.assertEqual(1, self.import_image.call_count)
+
+    def test_import_images_start_failed(self):
+        self.import_image.return_value = fake_image.FakeResponse(
+            b'', status_code=409, reason='Conflict')
+
+        result = self._import_images(
+            [{'image': 'a', 'uri': 'https://example.com/image'}])
+
+        self.assertEqual(_import.FAILED, result[0].status)
+        self.assertIsInstance(result[0].error, exceptions.ConflictException)
+        self.import_image.assert_called_once_with(
+            self.proxy, method='web-download',
+            uri='https://example.com/image', stores=[], all_stores=None,
+            all_stores_must_succeed=None)
+        self.proxy.images.assert_not_called()
+
+    def test_import_images_no_wait(self):
+        result = self._import_images(['a'], wait=False)
+
+        self.assertEqual(_import.IMPORTING, result[0].status)
+        self.proxy.images.assert_not_called()
+
+
 class TestMember(TestImageProxy):
     def test_member_create(self):
         self.verify_create(
@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
 from unittest import mock
 import uuid
 
@@ -1945,3 +1946,134 @@ class TestNetworkNDPProxy(TestNetworkProxy):
 
     def test_ndp_proxy_update(self):
         self.verify_update(self.proxy.update_ndp_proxy, ndp_proxy.NDPProxy)
+
+
+class TestNetworkCleanup(TestNetworkProxy):
+
+    def setUp(self):
+        super(TestNetworkCleanup, self).setUp()
+        executor = concurrent.futures.ThreadPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        self.proxy._connection = mock.Mock(_pool_executor=executor)
+        self.net = network.Network(id='net', project_id='p')
+        self.other_net = network.Network(id='other-net', project_id='p')
+        self.subnet = subnet.Subnet(id='subnet', network_id='net')
+        self.router = router.Router(id='router')
+        self.lonely_router = router.Router(id='lonely-router')
+        self.router_if = port.Port(
+            id='router-if', network_id='net', device_id='router',
+            device_owner='network:router_interface')
+        self.gw_port = port.Port(
+            id='gw-port', network_id='ext', device_id='lonely-router',
+            device_owner='network:router_gateway')
+        self.unowned = port.Port(
+            id='unowned', network_id='net', device_owner='')
+        self.vm_port = port.Port(
+            id='vm-port', network_id='other-net', device_id='foreign-vm',
+            device_owner='compute:nova')
+        self.listings = {
+            'networks': [self.net, self.other_net],
+            'ports': [self.router_if, self.unowned, self.vm_port],
+            'subnets': [self.subnet],
+            'routers': [self.router, self.lonely_router],
+            'ips': [],
+            'security_groups': [],
+        }
+        for name, value in self.listings.items():
+            if name == 'ports':
+                continue
+            patcher = mock.patch.object(
+                self.proxy, name, return_value=iter(value))
+            setattr(self, 'mock_' + name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        def _ports(**query):
+            if 'device_id' in query:
+                return iter([self.gw_port, self.router_if])
+            return iter(self.listings['ports'])
+
+        patcher = mock.patch.object(self.proxy, 'ports', side_effect=_ports)
+        self.mock_ports = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            self.proxy, 'get_project_id', return_value='p')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.deleted = []
+        for fn in ('delete_network', 'delete_subnet', 'delete_port',
+                   'delete_router', 'remove_interface_from_router',
+                   'get_router'):
+            patcher = mock.patch.object(
+                self.proxy, fn,
+                side_effect=lambda *args, _fn=fn, **kwargs:
+                    self.deleted.append(_fn))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_snapshot_listed_once(self):
+        self.proxy._service_cleanup(
+            dry_run=False, identified_resources={'vm': None})
+
+        for name in ('networks', 'subnets', 'routers', 'ips',
+                     'security_groups'):
+            getattr(self, 'mock_' + name).assert_called_once_with(
+                project_id='p')
+        self.mock_ports.assert_has_calls([
+            mock.call(project_id='p'),
+            mock.call(device_id=['router', 'lonely-router']),
+        ], any_order=True)
+        self.assertEqual(2, self.mock_ports.call_count)
+        self.assertNotIn('get_router', self.deleted)
+
+    def test_cleanup_decisions(self):
+        self.proxy._service_cleanup(
+            dry_run=False, identified_resources={'vm': None})
+
+        # Network with a foreign VM stays, the other one is dropped with its
+        # router, while the router having only a gateway is kept
+        self.assertEqual([
+            'remove_interface_from_router',
+            'delete_router',
+            'delete_port',
+            'delete_subnet',
+            'delete_network',
+        ], self.deleted)
+        self.proxy.delete_network.assert_called_once_with(self.net)
+        self.proxy.delete_router.assert_called_once_with(self.router)
+
+    def test_cleanup_graph(self):
+        graph = mock.Mock()
+        graph.barrier.return_value = 'service:compute'
+        self.proxy._service_cleanup(
+            dry_run=False, identified_resources={'vm': None},
+            cleanup_graph=graph)
+
+        self.assertEqual([], self.deleted)
+        deps = {
+            c[0][1].id: c[1].get('depends_on')
+            for c in graph.add.call_args_list}
+        self.assertEqual(['router-if'], deps['router'])
+        self.assertEqual(
+            sorted(['unowned', 'router-if']), sorted(deps['subnet']))
+        self.assertEqual(
+            sorted(['unowned', 'router-if', 'subnet']), sorted(deps['net']))
+
+    def test_cleanup_graph_server_ports(self):
+        server_port = port.Port(
+            id='server-port', network_id='net', device_id='vm',
+            device_owner='compute:nova')
+        self.listings['ports'].append(server_port)
+        graph = mock.Mock()
+        graph.barrier.return_value = 'service:compute'
+        self.proxy._service_cleanup(
+            dry_run=False, identified_resources={'vm': None},
+            cleanup_graph=graph)
+
+        deps = {
+            c[0][1].id: c[1].get('depends_on')
+            for c in graph.add.call_args_list}
+        # The port is deleted once its server is gone
+        self.assertEqual(['vm'], deps['server-port'])
+        self.assertEqual(
+            sorted(['vm', 'server-port', 'unowned', 'router-if']),
+            sorted(deps['subnet']))
@@ -0,0 +1,147 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import threading
+from unittest import mock
+
+from openstack import _adaptive_limit
+from openstack.tests.unit import base
+
+
+def _response(status_code=200, elapsed=0.1, headers=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.elapsed = datetime.timedelta(seconds=elapsed)
+    response.headers = headers or {}
+    return response
+
+
+class TestAdaptiveLimiter(base.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3.0, _adaptive_limit.parse_retry_after('3'))
+        self.assertIsNone(_adaptive_limit.parse_retry_after(None))
+        self.assertIsNone(_adaptive_limit.parse_retry_after('soon'))
+        with mock.patch('time.time', return_value=784111767):
+            self.assertEqual(
+                10.0,
+                _adaptive_limit.parse_retry_after(
+                    'Sun, 06 Nov 1994 08:49:37 GMT'))
+
+    def test_add_response_hook(self):
+        hook = mock.Mock()
+        other = mock.Mock()
+        self.assertEqual(
+            {'response': [hook]},
+            _adaptive_limit.add_response_hook(None, hook))
+        self.assertEqual(
+            {'response': [other, hook]},
+            _adaptive_limit.add_response_hook({'response': other}, hook))
+
+    def test_unlimited(self):
+        sot = _adaptive_limit.AdaptiveLimiter()
+        with sot:
+            self.assertEqual(1, sot.in_flight)
+            sot.record(_response())
+        stats = sot.get_stats()
+        self.assertIsNone(stats['concurrency'])
+        self.assertIsNone(stats['rate'])
+        self.assertEqual(0, stats['in_flight'])
+
+    def test_throttled_decreases(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_concurrency=8, max_rate=10)
+        with sot:
+            sot.record(_response(429))
+        stats = sot.get_stats()
+        self.assertEqual(4, stats['concurrency'])
+        self.assertEqual(5.0, stats['rate'])
+        self.assertEqual(1, stats['throttled'])
+
+    def test_throttled_without_limits(self):
+        sot = _adaptive_limit.AdaptiveLimiter()
+        sot.__enter__()
+        sot.__enter__()
+        sot.record(_response(503))
+        self.assertEqual(1, sot.get_stats()['concurrency'])
+        self.assertEqual(1.0, sot.get_stats()['rate'])
+
+    def test_decrease_once_per_window(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_concurrency=8)
+        sot.record(_response(429, elapsed=0))
+        # Sent before the first decrease
+        sot.record(_response(429, elapsed=10))
+        self.assertEqual(4, sot.get_stats()['concurrency'])
+        sot.record(_response(429, elapsed=0))
+        self.assertEqual(2, sot.get_stats()['concurrency'])
+
+    def test_latency_target(self):
+        sot = _adaptive_limit.AdaptiveLimiter(
+            max_concurrency=8, latency_target=1)
+        sot.record(_response(elapsed=0.5))
+        self.assertEqual(8, sot.get_stats()['concurrency'])
+        sot.record(_response(elapsed=2))
+        self.assertEqual(4, sot.get_stats()['concurrency'])
+
+    def test_increase_up_to_max(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_concurrency=4, max_rate=4)
+        sot.record(_response(429, elapsed=0))
+        self.assertEqual(2, sot.get_stats()['concurrency'])
+        for _ in range(3):
+            sot.record(_response())
+        self.assertEqual(3, sot.get_stats()['concurrency'])
+        for _ in range(20):
+            sot.record(_response())
+        self.assertEqual(4, sot.get_stats()['concurrency'])
+        self.assertEqual(4.0, sot.get_stats()['rate'])
+
+    def test_server_error_keeps_limits(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_concurrency=4)
+        sot.record(_response(429, elapsed=0))
+        sot.record(_response(500))
+        self.assertEqual(2, sot.get_stats()['concurrency'])
+
+    def test_retry_after_blocks(self):
+        sot = _adaptive_limit.AdaptiveLimiter()
+        sot.record(_response(429, headers={'Retry-After': '5'}))
+        self.assertGreater(sot.get_stats()['blocked'], 4)
+        with mock.patch('time.sleep') as sleep:
+            with sot:
+                pass
+        self.assertGreater(sleep.call_args[0][0], 4)
+
+    def test_rate(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_rate=2)
+        with mock.patch('time.sleep') as sleep:
+            for _ in range(3):
+                with sot:
+                    pass
+        # The second and third requests wait for half a second each
+        self.assertEqual(2, sleep.call_count)
+        self.assertAlmostEqual(1.0, sleep.call_args[0][0], places=1)
+
+    def test_concurrency(self):
+        sot = _adaptive_limit.AdaptiveLimiter(max_concurrency=1)
+        entered = threading.Event()
+
+        def request():
+            with sot:
+                entered.set()
+
+        sot.__enter__()
+        thread = threading.Thread(target=request)
+        thread.start()
+        self.assertFalse(entered.wait(0.1))
+        sot.__exit__(None, None, None)
+        self.assertTrue(entered.wait(5))
+        thread.join()
+        self.assertEqual(0, sot.in_flight)
@@ -0,0 +1,107 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+
+from keystoneauth1 import exceptions as ks_exc
+
+from openstack import _circuit_breaker
+from openstack import exceptions
+from openstack.tests.unit import base
+
+ENDPOINT = 'https://volume.example.com/'
+
+
+def _response(status_code):
+    response = mock.Mock()
+    response.status_code = status_code
+    return response
+
+
+class TestCircuitBreaker(base.TestCase):
+
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        self.on_transition = mock.Mock()
+        self.sot = _circuit_breaker.CircuitBreaker(
+            ENDPOINT, 2, reset_timeout=10, on_transition=self.on_transition)
+
+    def _open(self):
+        with mock.patch('time.monotonic', return_value=100):
+            self.sot.record(_response(503))
+            self.sot.record(exc=ks_exc.ConnectTimeout())
+
+    def test_opens_after_threshold(self):
+        self.sot.record(_response(500))
+        self.assertEqual(_circuit_breaker.CLOSED, self.sot.state)
+        self.sot.record(exc=ks_exc.ConnectFailure())
+        self.assertEqual(_circuit_breaker.OPEN, self.sot.state)
+        self.on_transition.assert_called_once_with(
+            ENDPOINT, _circuit_breaker.CLOSED, _circuit_breaker.OPEN)
+
+    def test_success_resets_failures(self):
+        self.sot.record(_response(500))
+        self.sot.record(_response(404))
+        self.sot.record(_response(500))
+        self.assertEqual(_circuit_breaker.CLOSED, self.sot.state)
+        self.on_transition.assert_not_called()
+
+    def test_other_exceptions_not_counted(self):
+        self.sot.record(exc=ValueError())
+        self.sot.record(exc=ks_exc.EndpointNotFound())
+        self.assertEqual(0, self.sot.failures)
+
+    def test_open_fails_fast(self):
+        self._open()
+        with mock.patch('time.monotonic', return_value=105):
+            exc = self.assertRaises(
+                exceptions.CircuitOpenException, self.sot.before_request)
+        self.assertEqual(ENDPOINT, exc.endpoint)
+        self.assertEqual(5, exc.retry_after)
+
+    def test_half_open_probe_success(self):
+        self._open()
+        with mock.patch('time.monotonic', return_value=111):
+            self.sot.before_request()
+            self.assertEqual(_circuit_breaker.HALF_OPEN, self.sot.state)
+            # Only one probe at a time
+            self.assertRaises(
+                exceptions.CircuitOpenException, self.sot.before_request)
+        self.sot.record(_response(200))
+        self.assertEqual(_circuit_breaker.CLOSED, self.sot.state)
+        self.sot.before_request()
+        self.assertEqual(
+            [mock.call(ENDPOINT, _circuit_breaker.CLOSED,
+                       _circuit_breaker.OPEN),
+             mock.call(ENDPOINT, _circuit_breaker.OPEN,
+                       _circuit_breaker.HALF_OPEN),
+             mock.call(ENDPOINT, _circuit_breaker.HALF_OPEN,
+                       _circuit_breaker.CLOSED)],
+            self.on_transition.call_args_list)
+
+    def test_half_open_probe_failure(self):
+        self._open()
+        with mock.patch('time.monotonic', return_value=111):
+            self.sot.before_request()
+            self.sot.record(_response(502))
+        self.assertEqual(_circuit_breaker.OPEN, self.sot.state)
+        with mock.patch('time.monotonic', return_value=115):
+            self.assertRaises(
+                exceptions.CircuitOpenException, self.sot.before_request)
+
+    def test_half_open_inconclusive_probe(self):
+        self._open()
+        with mock.patch('time.monotonic', return_value=111):
+            self.sot.before_request()
+            self.sot.record(exc=ValueError())
+            self.sot.before_request()
+        self.assertEqual(_circuit_breaker.HALF_OPEN, self.sot.state)
@@ -0,0 +1,209 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import queue
+import threading
+
+from openstack import _cleanup
+from openstack import resource
+from openstack.tests.unit import base
+
+
+class Res(resource.Resource):
+    pass
+
+
+class Other(resource.Resource):
+    pass
+
+
+class TestResourceCleanupGraph(base.TestCase):
+
+    def setUp(self):
+        super(TestResourceCleanupGraph, self).setUp()
+        self.sot = _cleanup.ResourceCleanupGraph()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+        self.addCleanup(self.executor.shutdown)
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def _del(self, obj):
+        with self._lock:
+            self.deleted.append(obj.id)
+
+    def _fail(self, obj):
+        raise Exception('boom')
+
+    def _run(self, **kwargs):
+        kwargs.setdefault('interval', 0.01)
+        return self.sot.run(self.executor, **kwargs)
+
+    def test_dependencies_order(self):
+        self.sot.add('network', Res(id='net'), self._del,
+                     depends_on=['subnet'])
+        self.sot.add('network', Res(id='subnet'), self._del,
+                     depends_on=['port1', 'port2'])
+        self.sot.add('network', Res(id='port1'), self._del,
+                     depends_on=['server'])
+        self.sot.add('network', Res(id='port2'), self._del,
+                     depends_on=['unknown'])
+        self.sot.add('compute', Res(id='server'), self._del)
+
+        result = self._run()
+
+        self.assertEqual(5, result.total)
+        self.assertEqual(5, result.deleted)
+        self.assertEqual(0, result.eta)
+        index = self.deleted.index
+        self.assertLess(index('server'), index('port1'))
+        self.assertLess(index('port1'), index('subnet'))
+        self.assertLess(index('port2'), index('subnet'))
+        self.assertLess(index('subnet'), index('net'))
+
+    def test_add_twice_extends_dependencies(self):
+        self.sot.add('network', Res(id='router'), self._del,
+                     depends_on=['if1'])
+        self.sot.add('network', Res(id='router'), self._del,
+                     depends_on=['if2'])
+        self.sot.add('network', Res(id='if1'), self._del)
+        self.sot.add('network', Res(id='if2'), self._del)
+
+        result = self._run()
+
+        self.assertEqual(3, result.total)
+        self.assertEqual('router', self.deleted[-1])
+
+    def test_concurrency_limit(self):
+        active = []
+        peak = []
+        event = threading.Event()
+
+        def _slow_del(obj):
+            with self._lock:
+                active.append(obj.id)
+                peak.append(len(active))
+            event.wait(0.05)
+            with self._lock:
+                active.remove(obj.id)
+
+        for i in range(8):
+            self.sot.add('compute', Res(id='s%d' % i), _slow_del)
+
+        result = self._run(concurrency={'compute': 2})
+
+        self.assertEqual(8, result.deleted)
+        self.assertEqual(2, max(peak))
+
+    def test_failure_skips_dependents(self):
+        self.sot.add('network', Res(id='subnet'), self._fail)
+        self.sot.add('network', Res(id='net'), self._del,
+                     depends_on=['subnet'])
+        self.sot.add('network', Res(id='other'), self._del)
+
+        result = self._run()
+
+        self.assertEqual(['other'], self.deleted)
+        self.assertEqual(1, result.deleted)
+        self.assertEqual(1, result.failed)
+        self.assertEqual(1, result.skipped)
+
+    def test_service_barrier(self):
+        self.sot.add('orchestration', Res(id='stack'), self._fail)
+        self.sot.add('compute', Res(id='server'), self._del)
+        self.sot.add_service_dependency('orchestration', 'compute')
+
+        result = self._run()
+
+        # Barrier is passed even if the service failed partially
+        self.assertEqual(['server'], self.deleted)
+        self.assertEqual(1, result.failed)
+
+    def test_wait_list_batched(self):
+        existing = {'s1': Res(id='s1'), 's2': Res(id='s2')}
+        list_calls = []
+        barrier = threading.Barrier(2)
+
+        def _del(obj):
+            # Both deletions complete together, long before the first poll
+            barrier.wait()
+            self._del(obj)
+
+        def _list():
+            list_calls.append(1)
+            # Resources disappear only on the second poll
+            if len(list_calls) > 1:
+                existing.clear()
+            return list(existing.values())
+
+        for res in list(existing.values()):
+            self.sot.add('compute', res, _del, wait_list_fn=_list)
+        self.sot.add('network', Res(id='port'), self._del,
+                     depends_on=['s1', 's2'])
+
+        result = self._run(interval=0.2)
+
+        self.assertEqual(3, result.deleted)
+        self.assertEqual('port', self.deleted[-1])
+        self.assertEqual(2, len(list_calls))
+
+    def test_wait_timeout(self):
+        res = Res(id='s1')
+        self.sot.add('compute', res, self._del, wait_list_fn=lambda: [res])
+        self.sot.add('network', Other(id='port'), self._del,
+                     depends_on=['s1'])
+
+        result = self._run(timeout=0.05)
+
+        self.assertEqual(1, result.failed)
+        self.assertEqual(1, result.skipped)
+        self.assertEqual(['s1'], self.deleted)
+
+    def test_hanging_deletion(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.sot.add('network', Res(id='hangs'), lambda obj: release.wait())
+        self.sot.add('network', Res(id='after'), self._del,
+                     depends_on=['hangs'])
+        self.sot.add('network', Res(id='other'), self._del)
+
+        result = self._run(timeout=0.1)
+
+        self.assertEqual(1, result.deleted)
+        self.assertEqual(1, result.failed)
+        self.assertEqual(1, result.skipped)
+        self.assertEqual(['other'], self.deleted)
+
+    def test_cycle(self):
+        self.sot.add('network', Res(id='a'), self._del, depends_on=['b'])
+        self.sot.add('network', Res(id='b'), self._del, depends_on=['a'])
+
+        result = self._run()
+
+        self.assertEqual([], self.deleted)
+        self.assertEqual(2, result.skipped)
+
+    def test_progress_reported(self):
+        status_queue = queue.Queue()
+        for i in range(3):
+            self.sot.add('compute', Res(id='s%d' % i), self._del)
+
+        self._run(status_queue=status_queue)
+
+        reports = []
+        while not status_queue.empty():
+            reports.append(status_queue.get())
+        self.assertTrue(reports)
+        for report in reports:
+            self.assertIsInstance(report, _cleanup.CleanupProgress)
+        self.assertEqual(3, reports[-1].processed)
+        self.assertEqual(0, reports[-1].eta)
@@ -11,12 +11,17 @@
 # under the License.
 
 import os
+import pickle
+import subprocess
+import sys
+import threading
 from unittest import mock
 
 import fixtures
 from keystoneauth1 import session
 from testtools import matchers
 
+from openstack import _http_pool
 import openstack.config
 from openstack import connection
 from openstack import proxy
@@ -264,6 +269,138 @@ class TestConnection(_TestConnectionBase):
         self.assertFalse(sot.session.verify)
 
 
+class TestPools(_TestConnectionBase):
+
+    def test_executor_size(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', pool_executor_size=3)
+        self.assertEqual(3, conn._pool_executor._max_workers)
+        conn.close()
+
+    def test_http_pool_size(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', http_pool_maxsize=50)
+        adapter = conn.session.session.adapters['https://']
+        self.assertEqual(50, adapter._pool_maxsize)
+        self.assertEqual(10, adapter._pool_connections)
+
+    def test_service_http_pool_size(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', compute_http_pool_maxsize=40)
+        self.assertEqual((None, 40), conn.compute._http_pool_size)
+        self.assertIsNone(conn.identity._http_pool_size)
+
+        conn.compute._mount_http_pool()
+
+        prefix = 'https://compute.example.com/'
+        self.assertEqual(
+            40, conn.session.session.adapters[prefix]._pool_maxsize)
+        self.assertEqual(
+            10, conn.session.session.adapters['https://']._pool_maxsize)
+
+    def test_identity_http_pool_size(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', identity_http_pool_maxsize=40)
+        conn.identity._mount_http_pool()
+        self.assertEqual(
+            40, conn.session.session.adapters[
+                'https://identity.example.com/']._pool_maxsize)
+
+    def test_share_pools(self):
+        self.useFixture(fixtures.MockPatchObject(
+            connection, '_shared_executors', {}))
+        self.useFixture(fixtures.MockPatchObject(
+            _http_pool, '_shared_sessions', {}))
+        first = connection.Connection(cloud='sample-cloud', share_pools=True)
+        second = connection.Connection(cloud='sample-cloud', share_pools=True)
+        other = connection.Connection(cloud='sample-cloud')
+        other_user = connection.Connection(
+            cloud='sample-cloud', share_pools=True,
+            auth=dict(first.config.config['auth'], username='other'))
+
+        executor = first._pool_executor
+        self.assertIs(executor, second._pool_executor)
+        self.assertIsNot(executor, other._pool_executor)
+        self.assertIs(first.session.session, second.session.session)
+        self.assertIsNot(first.session.session, other.session.session)
+        # The HTTP session keeps cookies, it is not shared across users
+        self.assertIs(executor, other_user._pool_executor)
+        self.assertIsNot(
+            first.session.session, other_user.session.session)
+
+        # A shared executor outlives the connections
+        first.close()
+        executor.submit(lambda: None).result()
+        other.close()
+        other_user.close()
+
+    def test_get_pool_stats(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', pool_executor_size=2)
+        self.assertEqual({}, conn.get_pool_stats()['executor'])
+        # Both workers and the test meet once the workers are busy
+        started = threading.Barrier(3)
+        release = threading.Event()
+
+        def _task():
+            if not release.is_set():
+                started.wait()
+            release.wait()
+
+        running = [conn._pool_executor.submit(_task) for _ in range(3)]
+        started.wait()
+        stats = conn.get_pool_stats()
+        self.assertEqual(
+            {'max_workers': 2, 'active': 2, 'pending': 1},
+            stats['executor'])
+        self.assertIsInstance(stats['http'], dict)
+        release.set()
+        for future in running:
+            future.result()
+        self.assertEqual(
+            {'max_workers': 2, 'active': 0, 'pending': 0},
+            conn.get_pool_stats()['executor'])
+        conn.close()
+
+    def test_get_pool_stats_cancelled(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', pool_executor_size=1)
+        release = threading.Event()
+        running = conn._pool_executor.submit(release.wait)
+        self.assertTrue(conn._pool_executor.submit(lambda: None).cancel())
+        release.set()
+        running.result()
+        self.assertEqual(0, conn.get_pool_stats()['executor']['pending'])
+        conn.close()
+
+    def test_adaptive_rate_limit(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', adaptive_rate_limit={'compute': True},
+            concurrency={'compute': 8}, adaptive_latency_target='10')
+        limiter = conn.compute._adaptive_limiter
+        self.assertEqual(8, limiter.max_concurrency)
+        self.assertEqual(10.0, limiter.latency_target)
+        # The fixed limit of keystoneauth is replaced
+        self.assertIsNone(conn.compute._rate_semaphore._concurrency)
+        self.assertIn(429, conn.compute.retriable_status_codes)
+        self.assertIsNone(conn.identity._adaptive_limiter)
+        self.assertEqual(
+            {'compute': limiter.get_stats()}, conn.get_rate_limits())
+
+    def test_circuit_breaker(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', circuit_breaker_threshold=3,
+            circuit_breaker_reset_after=60)
+        self.assertEqual((3, 60.0), conn.compute._circuit_breaker)
+        self.assertEqual({}, conn.get_circuit_breakers())
+        conn.compute._get_circuit_breaker(
+            'https://compute.example.com/v2.1/servers')
+        self.assertEqual(
+            {'compute': {'https://compute.example.com/': {
+                'state': 'closed', 'failures': 0}}},
+            conn.get_circuit_breakers())
+
+
 class TestOsloConfig(_TestConnectionBase):
     def test_from_conf(self):
         c1 = connection.Connection(cloud='sample-cloud')
@@ -336,6 +473,40 @@ class TestAuthorize(base.TestCase):
                           self.cloud.authorize)
 
 
+def _describe(conn, item):
+    return conn.config.name, item * 2
+
+
+class TestPickle(base.TestCase):
+
+    def test_pickle_connection(self):
+        token = self.cloud.authorize()
+        conn = pickle.loads(pickle.dumps(self.cloud))
+        self.assertIsNot(self.cloud, conn)
+        self.assertEqual(self.cloud.config.name, conn.config.name)
+        self.assertEqual(self.cloud.config.config, conn.config.config)
+        self.assertIsNone(conn.config._keystone_session)
+        # The token is reused without authenticating again
+        self.assertEqual(token, conn.config.get_auth().get_token(None))
+
+    def test_reset_after_fork(self):
+        executor = self.cloud._pool_executor
+        self.cloud.config.get_session()
+        with mock.patch.object(
+            self.cloud.session.session.adapters['https://'], 'close'
+        ) as close:
+            openstack.config.cloud_region._reset_regions_after_fork()
+        close.assert_called_with()
+        connection._reset_connections_after_fork()
+        self.assertIsNot(executor, self.cloud._pool_executor)
+        executor.shutdown()
+
+    def test_map_processes(self):
+        self.assertEqual(
+            [(self.cloud.config.name, 2), (self.cloud.config.name, 4)],
+            self.cloud.map_processes(_describe, [1, 2], max_workers=2))
+
+
 class TestNewService(base.TestCase):
 
     def test_add_service_v1(self):
@@ -403,6 +574,45 @@ class TestNewService(base.TestCase):
             conn.fake.__class__.__module__)
         self.assertFalse(conn.fake.dummy())
 
+    def test_add_service_lazy_proxy(self):
+        svc = self.os_fixture.v3_token.add_service('fake')
+        svc.add_endpoint(
+            interface='public',
+            region='RegionOne',
+            url='https://fake.example.com/v2/{0}'.format(fakes.PROJECT_ID),
+        )
+        self.use_keystone_v3()
+        conn = self.cloud
+
+        self.register_uris([
+            dict(method='GET',
+                 uri='https://fake.example.com',
+                 status_code=404),
+            dict(method='GET',
+                 uri='https://fake.example.com/v2/',
+                 status_code=404),
+            dict(method='GET',
+                 uri=self.get_mock_url('fake'),
+                 status_code=404),
+        ])
+
+        service = service_description.ServiceDescription(
+            'fake',
+            supported_versions={
+                '1': 'openstack.tests.unit.fake.v1._proxy.Proxy',
+                '2': 'openstack.tests.unit.fake.v2._proxy.Proxy',
+            })
+
+        conn.add_service(service)
+
+        self.assertEqual(
+            'openstack.tests.unit.fake.v2._proxy',
+            conn.fake.__class__.__module__)
+        self.assertFalse(conn.fake.dummy())
+        # Only the used version got resolved
+        self.assertIsInstance(service.supported_versions['2'], type)
+        self.assertIsInstance(service.supported_versions['1'], str)
+
     def test_replace_system_service(self):
         svc = self.os_fixture.v3_token.add_service('fake')
         svc.add_endpoint(
@@ -436,6 +646,27 @@ class TestNewService(base.TestCase):
         self.assertFalse(conn.dns.dummy())
 
 
+class TestImportTime(base.TestCase):
+
+    # Spawns a new interpreter which is slow on a loaded test node
+    TIMEOUT_SCALING_FACTOR = 6.0
+
+    def test_import_skips_proxies(self):
+        # Proxies and their resources are only imported on first use of the
+        # service. Use tools/import-time.py to measure the import time.
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import openstack'],
+            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        modules = [
+            line.rsplit('|', 1)[-1].strip()
+            for line in proc.stderr.splitlines()
+            if line.startswith('import time:')]
+        self.assertIn('openstack.connection', modules)
+        self.assertEqual(
+            [], [m for m in modules if m.endswith('._proxy')])
+        self.assertNotIn('openstack.version', modules)
+
+
 def vendor_hook(conn):
     setattr(conn, 'test', 'test_val')
 
@@ -0,0 +1,67 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+
+from openstack import _http_pool
+from openstack.tests.unit import base
+
+
+class TestHttpPool(base.TestCase):
+
+    def test_make_session(self):
+        sot = _http_pool.make_session(connections=4, maxsize=20)
+        adapter = sot.adapters['https://']
+        self.assertIs(adapter, sot.adapters['http://'])
+        self.assertEqual(4, adapter._pool_connections)
+        self.assertEqual(20, adapter._pool_maxsize)
+
+    def test_default_sizes(self):
+        adapter = _http_pool.make_adapter(maxsize=20)
+        self.assertEqual(10, adapter._pool_connections)
+        self.assertEqual(20, adapter._pool_maxsize)
+
+    def test_get_endpoint_prefix(self):
+        self.assertEqual(
+            'https://compute.example.com:8774/',
+            _http_pool.get_endpoint_prefix(
+                'https://compute.example.com:8774/v2.1/project'))
+
+    def test_get_pool_stats(self):
+        sot = _http_pool.make_session(maxsize=3)
+        pool = sot.adapters['https://'].poolmanager.connection_from_url(
+            'https://compute.example.com/v2.1')
+        conn = pool._get_conn()
+
+        expected = {'https://compute.example.com:443': {
+            'maxsize': 3, 'in_use': 1, 'created': 1, 'requests': 0}}
+        self.assertEqual(expected, _http_pool.get_pool_stats(sot))
+        self.assertEqual(
+            expected,
+            _http_pool.get_pool_stats(sot, 'https://compute.example.com/'))
+        self.assertEqual(
+            {}, _http_pool.get_pool_stats(sot, 'https://image.example.com/'))
+
+        pool._put_conn(conn)
+        self.assertEqual(
+            0, _http_pool.get_pool_stats(sot)[
+                'https://compute.example.com:443']['in_use'])
+
+    def test_shared_session(self):
+        factory = mock.Mock(side_effect=_http_pool.make_session)
+        with mock.patch.dict(_http_pool._shared_sessions, clear=True):
+            first = _http_pool.get_shared_session('cloud', factory)
+            self.assertIs(
+                first, _http_pool.get_shared_session('cloud', factory))
+            self.assertIsNot(
+                first, _http_pool.get_shared_session('other', factory))
+        self.assertEqual(2, factory.call_count)
@@ -14,9 +14,14 @@ import copy
 import queue
 from unittest import mock
 
+from keystoneauth1 import adapter
+from keystoneauth1 import exceptions as ks_exc
 import munch
+import requests
 from testscenarios import load_tests_apply_scenarios as load_tests  # noqa
 
+from openstack import _adaptive_limit
+from openstack import _http_pool
 from openstack import exceptions
 from openstack import proxy
 from openstack import resource
@@ -192,6 +197,189 @@ class TestProxyPrivate(base.TestCase):
         self.assertEqual(result, res)
 
 
+class TestProxyHttpPool(base.TestCase):
+
+    def setUp(self):
+        super(TestProxyHttpPool, self).setUp()
+        self.session = mock.Mock()
+        self.session.session = _http_pool.make_session()
+        self.sot = proxy.Proxy(
+            self.session, service_type='compute', statsd_prefix='openstack',
+            http_pool_size=(None, 30))
+
+    def test_mount_http_pool(self):
+        with mock.patch.object(
+            adapter.Adapter, 'get_endpoint',
+            return_value='https://compute.example.com/v2.1/project'
+        ):
+            self.sot._mount_http_pool()
+            transport = self.session.session.adapters[
+                'https://compute.example.com/']
+            self.assertEqual(30, transport._pool_maxsize)
+
+            # Mounted adapters are not replaced
+            self.sot._mount_http_pool()
+            self.assertIs(
+                transport,
+                self.session.session.adapters['https://compute.example.com/'])
+
+    def test_report_pool_stats(self):
+        url = 'https://compute.example.com/v2.1/servers'
+        adapter = self.session.session.adapters['https://']
+        adapter.poolmanager.connection_from_url(url)._get_conn()
+        pipe = mock.Mock()
+
+        self.sot._report_pool_stats_statsd(pipe, url)
+
+        pipe.gauge.assert_has_calls([
+            mock.call('openstack.compute.pool.in_use', 1),
+            mock.call('openstack.compute.pool.maxsize', 10),
+        ])
+
+        # The next report only comes after the interval
+        pipe.reset_mock()
+        self.sot._report_pool_stats_statsd(pipe, url)
+        self.assertFalse(pipe.gauge.called)
+        self.sot._pool_stats_reported -= proxy._POOL_STATS_INTERVAL
+        self.sot._report_pool_stats_statsd(pipe, url)
+        self.assertTrue(pipe.gauge.called)
+
+
+class TestProxyAdaptiveLimit(base.TestCase):
+
+    def setUp(self):
+        super(TestProxyAdaptiveLimit, self).setUp()
+        self.limiter = _adaptive_limit.AdaptiveLimiter(max_concurrency=4)
+        self.sot = proxy.Proxy(
+            self.cloud.session, service_type='compute',
+            statsd_prefix='openstack', adaptive_limiter=self.limiter)
+        self.sot._connection = self.cloud
+
+    def test_request_throttled(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri='https://compute.example.com/v2.1/servers',
+                 status_code=429,
+                 headers={'Retry-After': '0'}),
+        ])
+        response = self.sot.get(
+            'https://compute.example.com/v2.1/servers',
+            hooks={'response': []})
+        self.assertEqual(429, response.status_code)
+        stats = self.limiter.get_stats()
+        self.assertEqual(2, stats['concurrency'])
+        self.assertEqual(1, stats['throttled'])
+        self.assertEqual(0, stats['in_flight'])
+        self.assert_calls()
+
+    def test_report_limit_stats(self):
+        pipe = mock.Mock()
+        self.sot._report_limit_stats_statsd(pipe)
+        pipe.gauge.assert_has_calls([
+            mock.call('openstack.compute.limit.concurrency', 4),
+            mock.call('openstack.compute.limit.in_flight', 0),
+        ])
+        self.assertEqual(2, pipe.gauge.call_count)
+
+
+class TestProxyReportTransfer(base.TestCase):
+
+    def test_report_transfer(self):
+        statsd = mock.MagicMock()
+        pipe = statsd.pipeline.return_value.__enter__.return_value
+        sot = proxy.Proxy(
+            self.cloud.session, service_type='image',
+            statsd_prefix='openstack', statsd_client=statsd)
+
+        sot._report_transfer('download', 4096, 2.0)
+
+        pipe.timing.assert_called_once_with('openstack.image.download', 2000)
+        pipe.incr.assert_called_once_with(
+            'openstack.image.download.bytes', 4096)
+        pipe.gauge.assert_called_once_with(
+            'openstack.image.download.rate', 2048)
+
+
+class TestProxyCircuitBreaker(base.TestCase):
+
+    def setUp(self):
+        super(TestProxyCircuitBreaker, self).setUp()
+        self.statsd = mock.MagicMock()
+        self.pipe = self.statsd.pipeline.return_value.__enter__.return_value
+        self.sot = proxy.Proxy(
+            self.cloud.session, service_type='compute',
+            statsd_prefix='openstack', statsd_client=self.statsd,
+            circuit_breaker=(2, 30))
+        self.sot._connection = self.cloud
+        self.url = 'https://compute.example.com/v2.1/servers'
+
+    def test_open_after_failures(self):
+        self.register_uris([
+            dict(method='GET', uri=self.url, status_code=503),
+            dict(method='GET', uri=self.url,
+                 exc=requests.exceptions.ConnectTimeout),
+        ])
+        self.assertEqual(503, self.sot.get(self.url).status_code)
+        self.assertRaises(
+            ks_exc.ConnectTimeout, self.sot.get, self.url,
+            connect_retries=0)
+        self.assertRaises(
+            exceptions.CircuitOpenException, self.sot.get, self.url)
+        self.assert_calls()
+
+        self.pipe.incr.assert_any_call('openstack.compute.circuit.open')
+        self.pipe.gauge.assert_any_call('openstack.compute.circuit.open', 1)
+        breaker = self.sot._circuit_breakers['https://compute.example.com/']
+        self.assertEqual('open', breaker.state)
+        self.assertEqual(2, breaker.failures)
+
+    def test_relative_url(self):
+        with mock.patch.object(
+            adapter.Adapter, 'get_endpoint',
+            return_value='https://compute.example.com/v2.1'
+        ) as get_endpoint:
+            breaker = self.sot._get_circuit_breaker('/servers')
+            self.assertIs(breaker, self.sot._get_circuit_breaker('/flavors'))
+        self.assertEqual('https://compute.example.com/', breaker.endpoint)
+        get_endpoint.assert_called_once_with(self.sot)
+
+    def test_disabled(self):
+        sot = proxy.Proxy(self.cloud.session, service_type='compute')
+        self.assertIsNone(sot._get_circuit_breaker(self.url))
+
+
+class TestProxyDiscovered(base.TestCase):
+
+    def setUp(self):
+        super(TestProxyDiscovered, self).setUp()
+        self.session = mock.Mock()
+        self.sot = proxy.Proxy(self.session)
+        self.discover = mock.Mock(side_effect=['first', 'second'])
+
+    def test_memoised(self):
+        self.assertEqual('first', self.sot._get_discovered('k', self.discover))
+        self.assertEqual('first', self.sot._get_discovered('k', self.discover))
+        self.discover.assert_called_once_with()
+
+    def test_invalidated(self):
+        self.sot._get_discovered('k', self.discover)
+        self.session.auth.auth_ref = mock.Mock()
+        self.assertEqual(
+            'second', self.sot._get_discovered('k', self.discover))
+
+    def test_invalidated_by_default_microversion(self):
+        self.sot._get_discovered('k', self.discover)
+        self.sot.default_microversion = '2.1'
+        self.assertEqual(
+            'second', self.sot._get_discovered('k', self.discover))
+
+    def test_none_not_memoised(self):
+        self.discover.side_effect = [None, 'second']
+        self.assertIsNone(self.sot._get_discovered('k', self.discover))
+        self.assertEqual(
+            'second', self.sot._get_discovered('k', self.discover))
+
+
 class TestProxyDelete(base.TestCase):
 
     def setUp(self):
@@ -225,6 +413,12 @@ class TestProxyDelete(base.TestCase):
         rv = self.sot._delete(DeleteableResource, self.fake_id)
         self.assertEqual(rv, self.fake_id)
 
+    def test_delete_invalidates_resolution_cache(self):
+        with mock.patch.object(
+                self.cloud._resolution_cache, 'invalidate') as invalidate:
+            self.sot._delete(DeleteableResource, self.fake_id)
+        invalidate.assert_called_once_with(DeleteableResource)
+
     def test_delete_ignore_missing(self):
         self.res.delete.side_effect = exceptions.ResourceNotFound(
             message="test", http_status=404)
@@ -278,6 +472,12 @@ class TestProxyUpdate(base.TestCase):
         self.res._update.assert_called_once_with(**self.attrs)
         self.res.commit.assert_called_once_with(self.sot, base_path=None)
 
+    def test_update_invalidates_resolution_cache(self):
+        with mock.patch.object(
+                self.cloud._resolution_cache, 'invalidate') as invalidate:
+            self.sot._update(UpdateableResource, self.res, **self.attrs)
+        invalidate.assert_called_once_with(UpdateableResource)
+
     def test_update_resource_override_base_path(self):
         base_path = 'dummy'
         rv = self.sot._update(UpdateableResource, self.res,
@@ -320,6 +520,17 @@ class TestProxyCreate(base.TestCase):
             connection=self.cloud, **attrs)
         self.res.create.assert_called_once_with(self.sot, base_path=None)
 
+    def test_create_invalidates_resolution_cache(self):
+        CreateableResource.new = mock.Mock(return_value=self.res)
+        self.res.create.side_effect = exceptions.ConflictException()
+
+        with mock.patch.object(
+                self.cloud._resolution_cache, 'invalidate') as invalidate:
+            self.assertRaises(
+                exceptions.ConflictException,
+                self.sot._create, CreateableResource, x=1)
+        invalidate.assert_called_once_with(CreateableResource)
+
     def test_create_attributes_override_base_path(self):
         CreateableResource.new = mock.Mock(return_value=self.res)
 
@@ -417,6 +628,17 @@ class TestProxyGet(base.TestCase):
             error_message=mock.ANY)
         self.assertEqual(rv, self.fake_result)
 
+    def test_get_fields(self):
+        rv = self.sot._get(RetrieveableResource, self.fake_id,
+                           fields=['name'])
+
+        self.res.fetch.assert_called_with(
+            self.sot, requires_id=True, base_path=None,
+            skip_cache=mock.ANY,
+            error_message=mock.ANY,
+            fields=['name'])
+        self.assertEqual(rv, self.fake_result)
+
     def test_get_base_path(self):
         base_path = 'dummy'
         rv = self.sot._get(RetrieveableResource, self.fake_id,
@@ -845,3 +1067,31 @@ class TestProxyCleanup(base.TestCase):
             )
         )
         self.assertEqual(self.res, q.get_nowait())
+
+    def test_service_cleanup_graph(self):
+        graph = mock.Mock()
+        self.assertTrue(
+            self.sot._service_cleanup_del_res(
+                self.delete_mock,
+                self.res,
+                dry_run=False,
+                cleanup_graph=graph,
+                depends_on=['dep'],
+            )
+        )
+        self.delete_mock.assert_not_called()
+        graph.add.assert_called_once_with(
+            self.sot.service_type, self.res, self.delete_mock,
+            depends_on=['dep'], wait_list_fn=None)
+
+    def test_service_cleanup_graph_dry_run(self):
+        graph = mock.Mock()
+        self.assertTrue(
+            self.sot._service_cleanup_del_res(
+                self.delete_mock,
+                self.res,
+                dry_run=True,
+                cleanup_graph=graph,
+            )
+        )
+        graph.add.assert_not_called()
@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+
+from openstack import _resolution_cache
+from openstack import resource
+from openstack.tests.unit import base
+
+
+class Flavor(resource.Resource):
+    resource_key = 'flavor'
+
+
+class FlavorDetail(Flavor):
+    pass
+
+
+class SecurityGroup(resource.Resource):
+    pass
+
+
+class Snapshot(resource.Resource):
+    pass
+
+
+class TestResolutionCache(base.TestCase):
+
+    def setUp(self):
+        super(TestResolutionCache, self).setUp()
+        self.sot = _resolution_cache.ResolutionCache(ttl=60)
+        self.key = _resolution_cache.make_key('name', None, a=1)
+
+    def test_disabled(self):
+        sot = _resolution_cache.ResolutionCache()
+        self.assertFalse(sot.enabled)
+        sot.set(Flavor, self.key, 'id')
+        sot.set_missing(Flavor, self.key)
+        self.assertIsNone(sot.get(Flavor, self.key))
+
+    def test_make_key(self):
+        self.assertEqual(
+            _resolution_cache.make_key('name', None, a=1, b=2),
+            _resolution_cache.make_key('name', None, b=2, a=1))
+        self.assertNotEqual(
+            _resolution_cache.make_key('name', None, a=1),
+            _resolution_cache.make_key('name', None, a=2))
+
+    def test_get_set(self):
+        self.assertIsNone(self.sot.get(Flavor, self.key))
+        self.sot.set(Flavor, self.key, 'id')
+        self.assertEqual('id', self.sot.get(Flavor, self.key))
+        self.assertIsNone(self.sot.get(SecurityGroup, self.key))
+
+    def test_missing(self):
+        self.sot.set_missing(Flavor, self.key)
+        self.assertIs(
+            _resolution_cache.MISSING, self.sot.get(Flavor, self.key))
+
+    def test_expiration(self):
+        sot = _resolution_cache.ResolutionCache(ttl=10, negative_ttl=0)
+        with mock.patch('time.monotonic', return_value=100):
+            sot.set(Flavor, self.key, 'id')
+            sot.set_missing(SecurityGroup, self.key)
+        with mock.patch('time.monotonic', return_value=105):
+            self.assertEqual('id', sot.get(Flavor, self.key))
+            self.assertIsNone(sot.get(SecurityGroup, self.key))
+        with mock.patch('time.monotonic', return_value=111):
+            self.assertIsNone(sot.get(Flavor, self.key))
+
+    def test_never_expire(self):
+        sot = _resolution_cache.ResolutionCache(ttl=-1)
+        sot.set(Flavor, self.key, 'id')
+        with mock.patch('time.monotonic', return_value=10 ** 10):
+            self.assertEqual('id', sot.get(Flavor, self.key))
+
+    def test_discard(self):
+        self.sot.set(Flavor, self.key, 'id')
+        self.sot.discard(Flavor, self.key)
+        self.sot.discard(SecurityGroup, self.key)
+        self.assertIsNone(self.sot.get(Flavor, self.key))
+
+    def test_invalidate_related_classes(self):
+        self.sot.set(FlavorDetail, self.key, 'id')
+        self.sot.set(SecurityGroup, self.key, 'id')
+        self.sot.invalidate(Flavor)
+        self.assertIsNone(self.sot.get(FlavorDetail, self.key))
+        self.assertEqual('id', self.sot.get(SecurityGroup, self.key))
+
+    def test_invalidate_cloud_layer_names(self):
+        for name in ('flavor', 'security_group', 'volume_snapshot', 'image'):
+            self.sot.set(name, self.key, 'id')
+        self.sot.invalidate(Flavor)
+        self.sot.invalidate(SecurityGroup)
+        self.sot.invalidate(Snapshot)
+        self.assertIsNone(self.sot.get('flavor', self.key))
+        self.assertIsNone(self.sot.get('security_group', self.key))
+        self.assertIsNone(self.sot.get('volume_snapshot', self.key))
+        self.assertEqual('id', self.sot.get('image', self.key))
+
+    def test_invalidate_all(self):
+        self.sot.set(Flavor, self.key, 'id')
+        self.sot.set('image', self.key, 'id')
+        self.sot.invalidate()
+        self.assertIsNone(self.sot.get(Flavor, self.key))
+        self.assertIsNone(self.sot.get('image', self.key))
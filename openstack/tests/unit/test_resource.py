@@ -12,16 +12,20 @@
 
 import itertools
 import json
+import pickle
 from unittest import mock
 
 from keystoneauth1 import adapter
 import munch
 import requests
 
+from openstack import _resolution_cache
 from openstack import exceptions
 from openstack import format
+from openstack import proxy
 from openstack import resource
 from openstack.tests.unit import base
+from openstack import utils
 
 
 class FakeResponse:
@@ -35,6 +39,11 @@ class FakeResponse:
         return self.body
 
 
+class PicklableResource(resource.Resource):
+    foo = resource.Body('foo_remote')
+    bar = resource.Header('x-bar')
+
+
 class TestComponent(base.TestCase):
 
     class ExampleComponent(resource._BaseComponent):
@@ -919,6 +928,19 @@ class TestResource(base.TestCase):
         actual = json.dumps(res, sort_keys=True)
         self.assertEqual(expected, actual)
 
+    def test_pickle(self):
+        res = PicklableResource.existing(id='FAKE_ID', foo='FOO', bar='BAR')
+        res.foo = 'changed'
+        res._connection = object()
+
+        copy = pickle.loads(pickle.dumps(res))
+
+        self.assertEqual(res.to_dict(), copy.to_dict())
+        # The dict items are restored as well
+        self.assertEqual('changed', json.loads(json.dumps(copy))['foo'])
+        self.assertEqual({'foo_remote': 'changed'}, copy._body.dirty)
+        self.assertIsNone(copy._connection)
+
     def test_items(self):
         class Test(resource.Resource):
             foo = resource.Body('foo')
@@ -1659,18 +1681,63 @@ class TestResourceActions(base.TestCase):
         self.assertEqual(result, self.sot)
 
     def test_fetch_with_params(self):
-        result = self.sot.fetch(self.session, fields='a,b')
+        result = self.sot.fetch(self.session, answer='a,b')
 
         self.sot._prepare_request.assert_called_once_with(
             requires_id=True, base_path=None)
         self.session.get.assert_called_once_with(
-            self.request.url, microversion=None, params={'fields': 'a,b'},
+            self.request.url, microversion=None, params={'answer': 'a,b'},
             skip_cache=False)
 
         self.assertIsNone(self.sot.microversion)
         self.sot._translate_response.assert_called_once_with(self.response)
         self.assertEqual(result, self.sot)
 
+    def test_fetch_with_fields(self):
+        class Test(self.test_class):
+            _query_mapping = resource.QueryParameters('fields')
+            name = resource.Body('name')
+            size = resource.Body('remote_size')
+            other = resource.Body('other')
+
+        self.response.body = {'id': 'id', 'remote_size': 42}
+        sot = Test(id='id')
+        sot._prepare_request = mock.Mock(return_value=self.request)
+
+        result = sot.fetch(self.session, fields=['size'])
+
+        self.session.get.assert_called_once_with(
+            self.request.url, microversion=None,
+            params={'fields': ['id', 'remote_size']},
+            skip_cache=False)
+        self.assertEqual(result, sot)
+        self.assertEqual(42, sot.size)
+        self.assertEqual(frozenset({'id', 'size'}), sot._partial_fields)
+
+    def test_fetch_with_fields_client_side(self):
+        class Test(self.test_class):
+            name = resource.Body('name')
+            size = resource.Body('remote_size')
+            other = resource.Body('other')
+
+        self.response.body = {
+            'id': 'id', 'name': 'new', 'remote_size': 42, 'other': 'new'}
+        sot = Test(id='id', name='old')
+        sot._prepare_request = mock.Mock(return_value=self.request)
+
+        result = sot.fetch(self.session, fields=['remote_size'])
+
+        self.session.get.assert_called_once_with(
+            self.request.url, microversion=None, params={},
+            skip_cache=False)
+        self.assertEqual(result, sot)
+        self.assertEqual(42, sot.size)
+        # Not fetched, the known value is kept
+        self.assertEqual('old', sot.name)
+        self.assertIsNone(sot.other)
+        self.assertNotIn('other', sot._body.dirty)
+        self.assertEqual(frozenset({'id', 'size'}), sot._partial_fields)
+
     def test_fetch_with_microversion(self):
         class Test(resource.Resource):
             service = self.service_name
@@ -2453,6 +2520,64 @@ class TestResourceActions(base.TestCase):
         self.assertEqual(1, len(res))
         self.assertEqual("2", res[0].b)
 
+    def test_list_fields(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.links = {}
+        mock_response.json.return_value = {"resources": [
+            {"id": "1", "remote_a": "1"},
+        ]}
+
+        self.session.get.side_effect = [mock_response]
+
+        class Test(self.test_class):
+            _query_mapping = resource.QueryParameters('fields')
+            a = resource.Body("remote_a")
+            b = resource.Body("b")
+
+        res = list(Test.list(self.session, paginated=False, fields=['a']))
+
+        self.session.get.assert_called_once_with(
+            Test.base_path,
+            headers={'Accept': 'application/json'},
+            microversion=None,
+            params={'fields': ['id', 'remote_a']}
+        )
+        self.assertEqual(1, len(res))
+        self.assertEqual("1", res[0].a)
+        self.assertEqual(frozenset({'id', 'a'}), res[0]._partial_fields)
+
+    def test_list_fields_client_side(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.links = {}
+        mock_response.json.return_value = {"resources": [
+            {"id": "1", "remote_a": "1", "b": "1"},
+            {"id": "2", "remote_a": "2", "b": "2"},
+        ]}
+
+        self.session.get.side_effect = [mock_response]
+
+        class Test(self.test_class):
+            a = resource.Body("remote_a")
+            b = resource.Body("b")
+
+        res = list(Test.list(
+            self.session, paginated=False, fields=['a'], b='2'))
+
+        self.session.get.assert_called_once_with(
+            Test.base_path,
+            headers={'Accept': 'application/json'},
+            microversion=None,
+            params={}
+        )
+        # Client-side filters still apply to the fields not fetched
+        self.assertEqual(1, len(res))
+        self.assertEqual("2", res[0].a)
+        self.assertIsNone(res[0].b)
+        self.assertIsNone(res[0]['b'])
+        self.assertEqual(frozenset({'id', 'a'}), res[0]._partial_fields)
+
     def test_values_as_list_params(self):
         id = 1
         qp = "query param!"
@@ -3085,6 +3210,87 @@ class TestResourceFind(base.TestCase):
                 self.cloud.compute, base_path='/dummy/list')
 
 
+class TestResourceFindResolutionCache(base.TestCase):
+
+    def setUp(self):
+        super(TestResourceFindResolutionCache, self).setUp()
+        self.cloud._resolution_cache = _resolution_cache.ResolutionCache(
+            ttl=60)
+        self.existing = {'id1': 'name1'}
+        self.fetched = []
+        self.listed = []
+        test = self
+
+        class Test(resource.Resource):
+            _query_mapping = resource.QueryParameters('name')
+            name = resource.Body('name')
+
+            def fetch(self, session, **kwargs):
+                test.fetched.append(self.id)
+                if self.id not in test.existing:
+                    raise exceptions.ResourceNotFound('Not Found')
+                self.name = test.existing[self.id]
+                return self
+
+            @classmethod
+            def list(cls, session, **params):
+                test.listed.append(params)
+                return [
+                    cls(id=k, name=v) for k, v in test.existing.items()
+                    if v == params['name']]
+
+        self.res = Test
+
+    def test_find_name_cached(self):
+        result = self.res.find(self.cloud.compute, 'name1')
+        self.assertEqual('id1', result.id)
+        self.assertEqual(['name1'], self.fetched)
+        self.assertEqual(1, len(self.listed))
+
+        result = self.res.find(self.cloud.compute, 'name1')
+        self.assertEqual('id1', result.id)
+        # Second lookup only fetches by the resolved ID
+        self.assertEqual(['name1', 'id1'], self.fetched)
+        self.assertEqual(1, len(self.listed))
+
+    def test_find_missing_cached(self):
+        self.assertIsNone(self.res.find(self.cloud.compute, 'name2'))
+        self.assertIsNone(self.res.find(self.cloud.compute, 'name2'))
+        self.assertRaises(
+            exceptions.ResourceNotFound, self.res.find,
+            self.cloud.compute, 'name2', ignore_missing=False)
+        self.assertEqual(['name2'], self.fetched)
+        self.assertEqual(1, len(self.listed))
+
+    def test_find_stale_entry(self):
+        self.res.find(self.cloud.compute, 'name1')
+        # Resource got renamed
+        self.existing['id1'] = 'name2'
+        self.existing['id2'] = 'name1'
+
+        result = self.res.find(self.cloud.compute, 'name1')
+
+        self.assertEqual('id2', result.id)
+        self.assertEqual(['name1', 'id1', 'name1'], self.fetched)
+        self.assertEqual(2, len(self.listed))
+
+    def test_find_invalidated_by_proxy(self):
+        self.assertIsNone(self.res.find(self.cloud.compute, 'name2'))
+        self.existing['id2'] = 'name2'
+        self.cloud._resolution_cache.invalidate(self.res)
+
+        result = self.res.find(self.cloud.compute, 'name2')
+
+        self.assertEqual('id2', result.id)
+
+    def test_find_cache_disabled(self):
+        self.cloud._resolution_cache = _resolution_cache.ResolutionCache()
+        self.res.find(self.cloud.compute, 'name1')
+        self.res.find(self.cloud.compute, 'name1')
+        self.assertEqual(['name1', 'name1'], self.fetched)
+        self.assertEqual(2, len(self.listed))
+
+
 class TestWaitForStatus(base.TestCase):
 
     def test_immediate_status(self):
@@ -3281,3 +3487,38 @@ class TestAssertMicroversionFor(base.TestCase):
                                self.res._assert_microversion_for,
                                self.session, 'fetch', '1.6')
         mock_get_ver.assert_called_once_with(self.session, action='fetch')
+
+
+class TestGetMicroversion(base.TestCase):
+
+    class Res(resource.Resource):
+        _max_microversion = '1.42'
+
+    def setUp(self):
+        super(TestGetMicroversion, self).setUp()
+        self.session = mock.Mock()
+        self.adapter = proxy.Proxy(self.session)
+
+    def test_memoised(self):
+        with mock.patch.object(
+            utils, 'maximum_supported_microversion', return_value='1.42'
+        ) as negotiate:
+            for _ in range(3):
+                self.assertEqual(
+                    '1.42',
+                    self.Res._get_microversion(self.adapter, action='list'))
+            self.Res._get_microversion(self.adapter, action='fetch')
+            # A new token may come with another endpoint
+            self.session.auth.auth_ref = mock.Mock()
+            self.Res._get_microversion(self.adapter, action='list')
+        negotiate.assert_has_calls([
+            mock.call(self.adapter, '1.42'),
+            mock.call(self.adapter, '1.42'),
+            mock.call(self.adapter, '1.42'),
+        ])
+        self.assertEqual(3, negotiate.call_count)
+
+    def test_default_microversion(self):
+        self.adapter.default_microversion = '1.10'
+        self.assertEqual(
+            '1.10', self.Res._get_microversion(self.adapter, action='list'))
@@ -0,0 +1,149 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import threading
+from unittest import mock
+
+from openstack import _token_refresh
+from openstack import connection
+from openstack.tests.unit import base
+
+
+def _auth_ref(seconds):
+    auth_ref = mock.Mock()
+    auth_ref.expires = (
+        datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(seconds=seconds))
+    return auth_ref
+
+
+class TestTokenRefresher(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenRefresher, self).setUp()
+        self.session = mock.Mock()
+        self.auth = self.session.auth
+        self.auth.auth_ref = _auth_ref(3600)
+        self.on_refresh = mock.Mock()
+        self.sot = _token_refresh.TokenRefresher(
+            self.session, 300, on_refresh=self.on_refresh)
+
+    def test_get_delay(self):
+        self.assertAlmostEqual(3300, self.sot.get_delay(), delta=5)
+
+    def test_get_delay_no_token(self):
+        self.auth.auth_ref = None
+        self.assertEqual(
+            _token_refresh._IDLE_INTERVAL, self.sot.get_delay())
+
+    def test_get_delay_expired(self):
+        self.auth.auth_ref = _auth_ref(-10)
+        self.assertEqual(0, self.sot.get_delay())
+
+    def test_get_delay_within_margin(self):
+        self.auth.auth_ref = _auth_ref(100)
+        self.assertEqual(0, self.sot.get_delay())
+
+    def test_refresh(self):
+        new_ref = _auth_ref(3600)
+        self.auth.get_auth_ref.return_value = new_ref
+        self.sot.refresh()
+        self.auth.get_auth_ref.assert_called_once_with(self.session)
+        self.assertIs(new_ref, self.auth.auth_ref)
+        self.on_refresh.assert_called_once_with()
+        self.assertEqual(1, self.sot.refreshed)
+
+    def test_refresh_short_lived_token(self):
+        # A new token living shorter than the margin is refreshed halfway
+        self.auth.get_auth_ref.return_value = _auth_ref(200)
+        self.sot.refresh()
+        self.assertAlmostEqual(100, self.sot.get_delay(), delta=5)
+        # The time of the refresh does not move while the token gets older
+        with mock.patch.object(
+                _token_refresh.time, 'time',
+                return_value=_token_refresh.time.time() + 60):
+            self.assertAlmostEqual(100, self.sot.get_delay(), delta=5)
+
+    def test_refresh_without_token(self):
+        self.auth.auth_ref = None
+        self.sot.refresh()
+        self.auth.get_auth_ref.assert_not_called()
+
+    def test_background_refresh(self):
+        self.auth.auth_ref = _auth_ref(100)
+        refreshed = threading.Event()
+        self.auth.get_auth_ref.return_value = _auth_ref(3600)
+        self.on_refresh.side_effect = refreshed.set
+        self.sot.start()
+        self.addCleanup(self.sot.stop)
+        self.assertTrue(refreshed.wait(5))
+        self.assertEqual(1, self.sot.refreshed)
+
+    def test_background_refresh_short_lived_tokens(self):
+        # Every token lives shorter than the margin
+        self.auth.auth_ref = _auth_ref(100)
+        refreshed = threading.Event()
+        self.auth.get_auth_ref.side_effect = lambda session: _auth_ref(0.4)
+
+        def _on_refresh():
+            if self.sot.refreshed >= 3:
+                refreshed.set()
+
+        self.on_refresh.side_effect = _on_refresh
+        self.sot.start()
+        self.addCleanup(self.sot.stop)
+        self.assertTrue(refreshed.wait(5))
+
+    def test_background_refresh_failure(self):
+        self.auth.auth_ref = _auth_ref(100)
+        refreshed = threading.Event()
+        self.auth.get_auth_ref.side_effect = [
+            Exception('unavailable'), _auth_ref(3600)]
+        self.on_refresh.side_effect = refreshed.set
+        with mock.patch.object(_token_refresh, '_RETRY_INTERVAL', 0.01):
+            self.sot.start()
+            self.addCleanup(self.sot.stop)
+            self.assertTrue(refreshed.wait(5))
+        self.assertEqual(2, self.auth.get_auth_ref.call_count)
+
+    def test_stop(self):
+        self.sot.start()
+        self.sot.stop()
+        self.sot._thread.join(5)
+        self.assertFalse(self.sot._thread.is_alive())
+
+
+class TestConnectionTokenRefresh(base.TestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(self.cloud._token_refresher)
+
+    def test_started_with_session(self):
+        self.cloud_config.config['token_refresh_margin'] = '300'
+        conn = connection.Connection(config=self.cloud_config)
+        with mock.patch.object(
+                _token_refresh.TokenRefresher, 'start') as start:
+            conn.session
+            conn.session
+        start.assert_called_once_with()
+        self.assertEqual(300, conn._token_refresher.margin)
+        self.assertIs(conn.session, conn._token_refresher.session)
+
+        with mock.patch.object(
+                conn._token_refresher, 'wake') as wake:
+            conn.authorize()
+        wake.assert_called_once_with()
+
+        with mock.patch.object(conn._token_refresher, 'stop') as stop:
+            conn.close()
+        stop.assert_called_once_with()
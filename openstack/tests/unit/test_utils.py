@@ -14,6 +14,7 @@
 
 import concurrent.futures
 import hashlib
+import io
 import logging
 import sys
 from unittest import mock
@@ -24,6 +25,7 @@ import testtools
 
 import openstack
 from openstack import exceptions
+from openstack import proxy
 from openstack.tests.unit import base
 from openstack import utils
 
@@ -225,6 +227,45 @@ class TestMaximumSupportedMicroversion(base.TestCase):
                                                                '1.2'))
 
 
+class TestMicroversionMemo(base.TestCase):
+    def setUp(self):
+        super(TestMicroversionMemo, self).setUp()
+        self.session = mock.Mock()
+        self.session.auth.auth_ref = mock.Mock()
+        self.adapter = proxy.Proxy(self.session)
+        self.endpoint_data = mock.Mock(min_microversion='1.1',
+                                       max_microversion='1.99')
+        self.get_endpoint_data = self.useFixture(fixtures.MockPatchObject(
+            self.adapter, 'get_endpoint_data',
+            return_value=self.endpoint_data)).mock
+
+    def test_memoised(self):
+        for _ in range(3):
+            self.assertEqual(
+                '1.42',
+                utils.maximum_supported_microversion(self.adapter, '1.42'))
+            self.assertTrue(utils.supports_microversion(self.adapter, '1.2'))
+        self.get_endpoint_data.assert_called_once_with()
+
+    def test_new_token(self):
+        utils.supports_microversion(self.adapter, '1.2')
+        self.session.auth.auth_ref = mock.Mock()
+        self.endpoint_data.max_microversion = '1.10'
+        self.assertEqual(
+            '1.10',
+            utils.maximum_supported_microversion(self.adapter, '1.42'))
+        self.assertEqual(2, self.get_endpoint_data.call_count)
+
+    def test_no_endpoint_data_not_memoised(self):
+        self.get_endpoint_data.return_value = None
+        self.assertIsNone(
+            utils.maximum_supported_microversion(self.adapter, '1.42'))
+        self.get_endpoint_data.return_value = self.endpoint_data
+        self.assertEqual(
+            '1.42',
+            utils.maximum_supported_microversion(self.adapter, '1.42'))
+
+
 class TestOsServiceTypesVersion(base.TestCase):
     def test_ost_version(self):
         ost_version = '2019-05-01T19:53:21.498745'
@@ -385,3 +426,41 @@ class Test_md5(base.TestCase):
                 ValueError, utils.md5, None, usedforsecurity=True)
         self.assertRaises(
             TypeError, utils.md5, None, usedforsecurity=False)
+
+
+class TestHashingReader(base.TestCase):
+
+    def setUp(self):
+        super(TestHashingReader, self).setUp()
+        self.data = b'Openstack forever' * 100
+
+    def test_read(self):
+        reader = utils._HashingReader(
+            io.BytesIO(self.data), algorithms=('md5', 'sha512'))
+        self.assertEqual(len(self.data), reader.len)
+
+        self.assertEqual(self.data, reader.read(10) + reader.read())
+        self.assertEqual(len(self.data), reader.bytes_read)
+        self.assertEqual(
+            utils._calculate_data_hashes(self.data)[0],
+            reader.hexdigest('md5'))
+        self.assertEqual(
+            hashlib.sha512(self.data).hexdigest(),
+            reader.hexdigest('sha512'))
+
+    def test_iter(self):
+        reader = utils._HashingReader(self.data, chunk_size=64)
+
+        self.assertEqual(self.data, b''.join(reader))
+        self.assertEqual(
+            utils._calculate_data_hashes(self.data),
+            (reader.hexdigest('md5'), reader.hexdigest('sha256')))
+
+    def test_len_unknown(self):
+        data = mock.Mock(spec=['read'])
+        data.read.return_value = b''
+
+        reader = utils._HashingReader(data)
+
+        self.assertIsNone(reader.len)
+        self.assertEqual([], list(reader))
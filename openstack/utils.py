@@ -11,6 +11,7 @@
 # under the License.
 
 import hashlib
+import io
 import queue
 import string
 import threading
@@ -95,6 +96,33 @@ def get_string_format_keys(fmt_string, old_style=True):
         return keys
 
 
+def _get_microversion_range(adapter):
+    """Get the minimum and maximum microversion supported by the service.
+
+    The range is memoised by :class:`~openstack.proxy.Proxy` adapters until
+    the version discovery is done again.
+
+    :param adapter: :class:`~keystoneauth1.adapter.Adapter` instance.
+    :returns: A tuple of the normalized minimum and maximum microversions,
+        None for the ones the service does not announce. None if there is
+        no endpoint data.
+    """
+    def discover_range():
+        endpoint_data = adapter.get_endpoint_data()
+        if endpoint_data is None:
+            return None
+        return tuple(
+            discover.normalize_version_number(version) if version else None
+            for version in (
+                endpoint_data.min_microversion,
+                endpoint_data.max_microversion))
+
+    if not hasattr(type(adapter), '_get_discovered'):
+        # A plain keystoneauth Adapter
+        return discover_range()
+    return adapter._get_discovered('microversions', discover_range)
+
+
 def supports_microversion(adapter, microversion, raise_exception=False):
     """Determine if the given adapter supports the given microversion.
 
@@ -114,13 +142,12 @@ def supports_microversion(adapter, microversion, raise_exception=False):
         microversion is not supported.
     """
 
-    endpoint_data = adapter.get_endpoint_data()
-    if (endpoint_data.min_microversion
-            and endpoint_data.max_microversion
+    server_min, server_max = (
+        _get_microversion_range(adapter) or (None, None))
+    if (server_min
+            and server_max
             and discover.version_between(
-                endpoint_data.min_microversion,
-                endpoint_data.max_microversion,
-                microversion)):
+                server_min, server_max, microversion)):
         if adapter.default_microversion is not None:
             # If default_microversion is set - evaluate
             # whether it match the expectation
@@ -206,26 +233,23 @@ def maximum_supported_microversion(adapter, client_maximum):
     # NOTE(dtantsur): if we cannot determine supported microversions, fall back
     # to the default one.
     try:
-        endpoint_data = adapter.get_endpoint_data()
+        microversions = _get_microversion_range(adapter)
     except keystoneauth1.exceptions.discovery.DiscoveryFailure:
-        endpoint_data = None
+        microversions = None
 
-    if endpoint_data is None:
+    if microversions is None:
         log = _log.setup_logging('openstack')
         log.warning('Cannot determine endpoint data for service %s',
                     adapter.service_type or adapter.service_name)
         return None
 
-    if not endpoint_data.max_microversion:
+    server_min, server_max = microversions
+    if not server_max:
         return None
 
     client_max = discover.normalize_version_number(client_maximum)
-    server_max = discover.normalize_version_number(
-        endpoint_data.max_microversion)
 
-    if endpoint_data.min_microversion:
-        server_min = discover.normalize_version_number(
-            endpoint_data.min_microversion)
+    if server_min:
         if client_max < server_min:
             # NOTE(dtantsur): we may want to raise in this case, but this keeps
             # the current behavior intact.
@@ -295,6 +319,59 @@ def _get_file_hashes(filename):
     return (_md5, _sha256)
 
 
+class _HashingReader:
+    """File-like object hashing the data while it is read.
+
+    Lets the data be hashed while it is uploaded instead of reading it once
+    more beforehand.
+
+    :param data: Bytes or a binary file-like object.
+    :param algorithms: Names of the hashlib algorithms to compute.
+    :param int chunk_size: Size of the chunks when iterating.
+    """
+
+    def __init__(
+        self, data, algorithms=('md5', 'sha256'), chunk_size=65536,
+    ):
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        self._data = data
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self._hashes = {}
+        for name in algorithms:
+            if name == 'md5':
+                self._hashes[name] = md5(usedforsecurity=False)
+            else:
+                self._hashes[name] = hashlib.new(name)
+        # NOTE: requests sets the Content-Length from the len attribute and
+        # sends the data in chunks when it is unknown.
+        self.len = self._get_remaining()
+
+    def _get_remaining(self):
+        try:
+            position = self._data.tell()
+            end = self._data.seek(0, io.SEEK_END)
+            self._data.seek(position)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return end - position
+
+    def read(self, size=-1):
+        chunk = self._data.read(size)
+        for _hash in self._hashes.values():
+            _hash.update(chunk)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        return iter(lambda: self.read(self.chunk_size), b'')
+
+    def hexdigest(self, algorithm):
+        """Get the hash of the data read so far."""
+        return self._hashes[algorithm].hexdigest()
+
+
 class TinyDAG:
     """Tiny DAG
 
@@ -0,0 +1,83 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the time needed to import openstacksdk.
+
+Runs ``python -X importtime -c 'import openstack'`` a number of times and
+prints the median of the total import time together with the slowest
+modules of the median run::
+
+    python tools/import-time.py [--runs 5] [--top 20] [--module openstack]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def measure(module):
+    """Import the module in a fresh interpreter.
+
+    :returns: A list of (self time, cumulative time, module name) tuples,
+        times are in microseconds.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            entries.append(
+                (int(fields[0]), int(fields[1]), fields[2].strip()))
+        except ValueError:
+            # Header line
+            continue
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--module', default='openstack')
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        entries = measure(args.module)
+        total = next(e[1] for e in entries if e[2] == args.module)
+        runs.append((total, entries))
+    runs.sort(key=lambda run: run[0])
+    total, entries = runs[len(runs) // 2]
+
+    sdk_modules = [e for e in entries if e[2].split('.')[0] == 'openstack']
+    print('Import of %s: median %.1f ms (min %.1f ms, max %.1f ms)' % (
+        args.module, total / 1000.0, runs[0][0] / 1000.0,
+        runs[-1][0] / 1000.0))
+    print('Modules imported: %d (%d of openstacksdk)' % (
+        len(entries), len(sdk_modules)))
+    print('Stdev of the runs: %.1f ms' % (
+        statistics.pstdev(run[0] for run in runs) / 1000.0))
+    print()
+    print('%10s %10s  %s' % ('self [ms]', 'cumul [ms]', 'module'))
+    for self_us, cumulative_us, name in sorted(
+            entries, key=lambda e: e[0], reverse=True)[:args.top]:
+        print('%10.1f %10.1f  %s' % (
+            self_us / 1000.0, cumulative_us / 1000.0, name))
+
+
+if __name__ == '__main__':
+    main()